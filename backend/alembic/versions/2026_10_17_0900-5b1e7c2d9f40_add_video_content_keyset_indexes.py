@@ -0,0 +1,26 @@
+"""Add video content keyset pagination indexes
+
+Revision ID: 5b1e7c2d9f40
+Revises: a4b348d907dd
+Create Date: 2026-10-17 09:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c2d9f40'
+down_revision = 'a4b348d907dd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_video_content_created_at_id', 'video_content', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_video_content_moderation_status_created_at_id', 'video_content', ['moderation_status', 'created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_content_moderation_status_created_at_id', table_name='video_content')
+    op.drop_index('ix_video_content_created_at_id', table_name='video_content')
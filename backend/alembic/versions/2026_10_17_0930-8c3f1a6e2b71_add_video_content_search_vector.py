@@ -0,0 +1,41 @@
+"""Add video content full-text search vector
+
+Revision ID: 8c3f1a6e2b71
+Revises: 5b1e7c2d9f40
+Create Date: 2026-10-17 09:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3f1a6e2b71'
+down_revision = '5b1e7c2d9f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Generated tsvector + GIN index; other databases use the in-process index
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("""
+        ALTER TABLE video_content ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_video_content_search_vector
+            ON video_content USING GIN (search_vector)
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_video_content_search_vector")
+    op.execute("ALTER TABLE video_content DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,73 @@
+"""Add video_tags table and backfill it from video_content.tags
+
+Revision ID: d2a94f0b7c15
+Revises: 8c3f1a6e2b71
+Create Date: 2026-10-17 10:00:00.000000+00:00
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a94f0b7c15'
+down_revision = '8c3f1a6e2b71'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _parse_tags(raw):
+    try:
+        tags = json.loads(raw)
+    except (TypeError, json.JSONDecodeError):
+        return []
+    if not isinstance(tags, list):
+        return []
+
+    normalized = []
+    for tag in tags:
+        tag = str(tag).strip()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+def upgrade() -> None:
+    video_tags = op.create_table('video_tags',
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['video_id'], ['video_content.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id', 'tag')
+    )
+    op.create_index('ix_video_tags_tag_video_id', 'video_tags', ['tag', 'video_id'], unique=False)
+
+    # Backfill from the JSON tags column in keyset-ordered batches
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, tags FROM video_content "
+            "WHERE id > :last_id AND tags IS NOT NULL "
+            "ORDER BY id LIMIT :batch_size"
+        ), {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        tag_rows = [
+            {"video_id": video_id, "tag": tag, "position": position}
+            for video_id, raw in rows
+            for position, tag in enumerate(_parse_tags(raw))
+        ]
+        if tag_rows:
+            op.bulk_insert(video_tags, tag_rows)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_tags_tag_video_id', table_name='video_tags')
+    op.drop_table('video_tags')
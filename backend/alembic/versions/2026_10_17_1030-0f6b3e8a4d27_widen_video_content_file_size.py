@@ -0,0 +1,26 @@
+"""Widen video_content.file_size to BIGINT for multi-GB uploads
+
+Revision ID: 0f6b3e8a4d27
+Revises: d2a94f0b7c15
+Create Date: 2026-10-17 10:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f6b3e8a4d27'
+down_revision = 'd2a94f0b7c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('video_content') as batch_op:
+        batch_op.alter_column('file_size', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('video_content') as batch_op:
+        batch_op.alter_column('file_size', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=True)
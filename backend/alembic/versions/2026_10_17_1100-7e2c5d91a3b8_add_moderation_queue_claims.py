@@ -0,0 +1,33 @@
+"""Add moderation queue claim leases and unreviewed partial index
+
+Revision ID: 7e2c5d91a3b8
+Revises: 0f6b3e8a4d27
+Create Date: 2026-10-17 11:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2c5d91a3b8'
+down_revision = '0f6b3e8a4d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('video_content', sa.Column('claimed_by', sa.Integer(), nullable=True))
+    op.add_column('video_content', sa.Column('claim_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_video_content_unreviewed_queue', 'video_content', ['created_at', 'id'], unique=False,
+        postgresql_where=sa.text("moderation_status = 'unreviewed'"),
+        sqlite_where=sa.text("moderation_status = 'unreviewed'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_content_unreviewed_queue', table_name='video_content')
+    with op.batch_alter_table('video_content') as batch_op:
+        batch_op.drop_column('claim_expires_at')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,60 @@
+"""Add video_daily_stats rollup and build it from video_content
+
+Revision ID: 3a7d1c58e9f2
+Revises: 7e2c5d91a3b8
+Create Date: 2026-10-17 11:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7d1c58e9f2'
+down_revision = '7e2c5d91a3b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('video_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sport', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('uploads', sa.Integer(), nullable=False),
+    sa.Column('approved', sa.Integer(), nullable=False),
+    sa.Column('unreviewed', sa.Integer(), nullable=False),
+    sa.Column('flagged', sa.Integer(), nullable=False),
+    sa.Column('views', sa.BigInteger(), nullable=False),
+    sa.Column('likes', sa.BigInteger(), nullable=False),
+    sa.Column('shares', sa.BigInteger(), nullable=False),
+    sa.Column('duration_total', sa.BigInteger(), nullable=False),
+    sa.Column('duration_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'sport', 'category')
+    )
+
+    day = "CAST(created_at AS DATE)" if op.get_bind().dialect.name == "postgresql" else "DATE(created_at)"
+    op.execute(f"""
+        INSERT INTO video_daily_stats (
+            day, sport, category, uploads, approved, unreviewed, flagged,
+            views, likes, shares, duration_total, duration_count
+        )
+        SELECT
+            {day}, sport, category,
+            COUNT(id),
+            COUNT(CASE WHEN status = 'approved' THEN 1 END),
+            COUNT(CASE WHEN moderation_status = 'unreviewed' THEN 1 END),
+            COUNT(CASE WHEN status = 'flagged' THEN 1 END),
+            COALESCE(SUM(view_count), 0),
+            COALESCE(SUM(like_count), 0),
+            COALESCE(SUM(share_count), 0),
+            COALESCE(SUM(duration), 0),
+            COUNT(duration)
+        FROM video_content
+        WHERE created_at IS NOT NULL
+        GROUP BY {day}, sport, category
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('video_daily_stats')
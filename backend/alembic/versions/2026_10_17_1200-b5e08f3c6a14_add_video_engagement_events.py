@@ -0,0 +1,39 @@
+"""Add monthly partitioned video_engagement_events log
+
+Revision ID: b5e08f3c6a14
+Revises: 3a7d1c58e9f2
+Create Date: 2026-10-17 12:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e08f3c6a14'
+down_revision = '3a7d1c58e9f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # On PostgreSQL the monthly partitions are created by the application
+    # (app.services.engagement_event_service.maintain_event_partitions)
+    op.create_table('video_engagement_events',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index(
+        'ix_video_engagement_events_video_user_created_at', 'video_engagement_events',
+        ['video_id', 'user_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_engagement_events_video_user_created_at', table_name='video_engagement_events')
+    op.drop_table('video_engagement_events')
@@ -0,0 +1,31 @@
+"""Add video_related table for precomputed related videos
+
+Revision ID: c91f4e2d7a63
+Revises: b5e08f3c6a14
+Create Date: 2026-10-17 12:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c91f4e2d7a63'
+down_revision = 'b5e08f3c6a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by build_related_videos.py
+    op.create_table('video_related',
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('neighbors', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['video_content.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('video_related')
@@ -0,0 +1,28 @@
+"""Add trending_score to video_content
+
+Revision ID: 4d8b2f6e1c90
+Revises: c91f4e2d7a63
+Create Date: 2026-10-17 13:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8b2f6e1c90'
+down_revision = 'c91f4e2d7a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by the trending score updater within one recompute interval
+    op.add_column('video_content', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.create_index('ix_video_content_trending_score_id', 'video_content', ['trending_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_content_trending_score_id', table_name='video_content')
+    with op.batch_alter_table('video_content') as batch_op:
+        batch_op.drop_column('trending_score')
@@ -0,0 +1,46 @@
+"""Add video_import_jobs and video_import_errors for bulk video imports
+
+Revision ID: 6a1f9c3e5b27
+Revises: 4d8b2f6e1c90
+Create Date: 2026-10-17 13:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1f9c3e5b27'
+down_revision = '4d8b2f6e1c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('video_import_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('source_path', sa.String(), nullable=False),
+    sa.Column('format', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('rows_imported', sa.Integer(), nullable=False),
+    sa.Column('rows_failed', sa.Integer(), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('video_import_errors',
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('row_number', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['video_import_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'row_number')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('video_import_errors')
+    op.drop_table('video_import_jobs')
@@ -0,0 +1,28 @@
+"""Add content_hash to video_content
+
+Revision ID: 8e3c5a7d2f14
+Revises: 6a1f9c3e5b27
+Create Date: 2026-10-17 14:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3c5a7d2f14'
+down_revision = '6a1f9c3e5b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing videos are hashed by backfill_content_hashes.py
+    op.add_column('video_content', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_video_content_content_hash', 'video_content', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_content_content_hash', table_name='video_content')
+    with op.batch_alter_table('video_content') as batch_op:
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,41 @@
+"""Add analytics_export_jobs for background analytics exports
+
+Revision ID: 3b7d9e1f4a62
+Revises: 8e3c5a7d2f14
+Create Date: 2026-10-17 14:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d9e1f4a62'
+down_revision = '8e3c5a7d2f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('analytics_export_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('format', sa.String(), nullable=False),
+    sa.Column('filters', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('rows_total', sa.Integer(), nullable=True),
+    sa.Column('rows_written', sa.Integer(), nullable=False),
+    sa.Column('file_path', sa.String(), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_export_jobs_created_by_status', 'analytics_export_jobs', ['created_by', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analytics_export_jobs_created_by_status', table_name='analytics_export_jobs')
+    op.drop_table('analytics_export_jobs')
@@ -0,0 +1,26 @@
+"""Index users.updated_at and users.created_at for the user dimension cube
+
+Revision ID: c4e8a2f6b913
+Revises: 3b7d9e1f4a62
+Create Date: 2026-10-17 15:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a2f6b913'
+down_revision = '3b7d9e1f4a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'], unique=False)
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_index('ix_users_updated_at', table_name='users')
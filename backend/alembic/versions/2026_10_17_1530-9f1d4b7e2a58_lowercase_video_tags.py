@@ -0,0 +1,75 @@
+"""Lowercase video tags so tag filters are case-insensitive
+
+Revision ID: 9f1d4b7e2a58
+Revises: c4e8a2f6b913
+Create Date: 2026-10-17 15:30:00.000000+00:00
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f1d4b7e2a58'
+down_revision = 'c4e8a2f6b913'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _lowercase_tags(tags):
+    normalized = []
+    for tag in tags:
+        tag = str(tag).strip().lower()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+def upgrade() -> None:
+    # Rewrite the tags of every video carrying an uppercase tag, in keyset-ordered
+    # batches; tags differing only in case collapse into one
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, tags FROM video_content "
+            "WHERE id > :last_id AND tags IS NOT NULL "
+            "ORDER BY id LIMIT :batch_size"
+        ), {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        current = {}
+        for video_id, tag in bind.execute(sa.text(
+            "SELECT video_id, tag FROM video_tags "
+            "WHERE video_id > :last_id AND video_id <= :batch_end "
+            "ORDER BY video_id, position"
+        ), {"last_id": last_id, "batch_end": rows[-1][0]}):
+            current.setdefault(video_id, []).append(tag)
+
+        for video_id, current_tags in current.items():
+            tags = _lowercase_tags(current_tags)
+            if tags == current_tags:
+                continue
+
+            bind.execute(sa.text("DELETE FROM video_tags WHERE video_id = :video_id"), {"video_id": video_id})
+            if tags:
+                bind.execute(sa.text(
+                    "INSERT INTO video_tags (video_id, tag, position) VALUES (:video_id, :tag, :position)"
+                ), [
+                    {"video_id": video_id, "tag": tag, "position": position}
+                    for position, tag in enumerate(tags)
+                ])
+            bind.execute(sa.text(
+                "UPDATE video_content SET tags = :tags WHERE id = :video_id"
+            ), {"tags": json.dumps(tags) if tags else None, "video_id": video_id})
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    # The original case of the tags is not kept
+    pass
@@ -0,0 +1,31 @@
+"""Order ix_video_content_created_at_id like the default video listing
+
+Revision ID: e7a3c1f9b254
+Revises: 9f1d4b7e2a58
+Create Date: 2026-10-17 16:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c1f9b254'
+down_revision = '9f1d4b7e2a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The listing orders by created_at DESC NULLS LAST, id DESC; a plain btree
+    # read backwards yields NULLS FIRST on PostgreSQL and needs a sort
+    op.drop_index('ix_video_content_created_at_id', table_name='video_content')
+    op.create_index(
+        'ix_video_content_created_at_id', 'video_content', ['created_at', 'id'], unique=False,
+        postgresql_ops={'created_at': 'DESC NULLS LAST', 'id': 'DESC'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_content_created_at_id', table_name='video_content')
+    op.create_index('ix_video_content_created_at_id', 'video_content', ['created_at', 'id'], unique=False)
@@ -5,24 +5,39 @@ Admin analytics endpoints
 from datetime import datetime, timedelta
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from app.models.database import get_db
 from app.models.models import AdminUser
 from app.schemas.analytics import (
     UserAnalytics,
+    UserBreakdown,
     SportAnalytics,
     EngagementMetrics,
     SystemMetrics,
     AnalyticsSummary,
-    AnalyticsRequest
+    AnalyticsRequest,
+    AnalyticsExportJobResponse
 )
 from app.services.analytics_service import (
     get_user_analytics,
+    get_user_breakdown,
     get_sport_analytics,
     get_engagement_metrics,
-    get_system_metrics
+    get_system_metrics,
+    compute_analytics_summary
 )
+from app.services.analytics_export_service import (
+    EXPORT_FORMATS,
+    ExportLimitExceeded,
+    analytics_export_format,
+    analytics_export_runner,
+    create_analytics_export,
+    export_filename,
+    get_analytics_export
+)
+from app.services.analytics_cache import analytics_cache_key, analytics_summary_cache
 from app.core.auth import get_current_admin_user, require_permissions
 
 router = APIRouter()
@@ -33,6 +48,7 @@ async def get_user_analytics_endpoint(
     start_date: Optional[datetime] = Query(None, description="Start date for analytics"),
     end_date: Optional[datetime] = Query(None, description="End date for analytics"),
     sports: Optional[List[str]] = Query(None, description="Filter by sports"),
+    granularity: str = Query("day", description="Registration trend buckets: hour, day, week or month"),
     db: Session = Depends(get_db),
     current_user: AdminUser = Depends(require_permissions([
         {"resource": "analytics", "actions": ["read"]}
@@ -46,7 +62,13 @@ async def get_user_analytics_endpoint(
             db=db,
             start_date=start_date,
             end_date=end_date,
-            sports=sports
+            sports=sports,
+            granularity=granularity
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except Exception as e:
         raise HTTPException(
@@ -55,6 +77,61 @@ async def get_user_analytics_endpoint(
         )
 
 
+@router.get("/users/breakdown", response_model=UserBreakdown)
+async def get_user_breakdown_endpoint(
+    group_by: List[str] = Query(
+        [],
+        description="Dimensions to group by: sport, city, state, experience, gender, profile_completed, is_active, created_at"
+    ),
+    granularity: str = Query("day", description="created_at buckets: hour, day, week or month"),
+    start_date: Optional[datetime] = Query(None, description="Registered at or after"),
+    end_date: Optional[datetime] = Query(None, description="Registered at or before"),
+    sports: Optional[List[str]] = Query(None, description="Filter by primary or secondary sport"),
+    cities: Optional[List[str]] = Query(None, description="Filter by city"),
+    states: Optional[List[str]] = Query(None, description="Filter by state"),
+    experience_levels: Optional[List[str]] = Query(None, description="Filter by experience level"),
+    genders: Optional[List[str]] = Query(None, description="Filter by gender"),
+    profile_completed: Optional[bool] = Query(None, description="Filter by profile completion"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    limit: int = Query(100, ge=1, le=10000, description="Number of groups to return"),
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "analytics", "actions": ["read"]}
+    ]))
+) -> UserBreakdown:
+    """
+    Count users by any combination of dimensions, for dashboard tiles
+    """
+    try:
+        return get_user_breakdown(
+            db=db,
+            group_by=group_by,
+            filters={
+                "sport": sports,
+                "city": cities,
+                "state": states,
+                "experience": experience_levels,
+                "gender": genders,
+                "profile_completed": [profile_completed] if profile_completed is not None else None,
+                "is_active": [is_active] if is_active is not None else None,
+            },
+            start_date=start_date,
+            end_date=end_date,
+            granularity=granularity,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve user breakdown: {str(e)}"
+        )
+
+
 @router.get("/sports", response_model=SportAnalytics)
 async def get_sport_analytics_endpoint(
     start_date: Optional[datetime] = Query(None, description="Start date for analytics"),
@@ -135,36 +212,24 @@ async def get_analytics_summary(
 ) -> AnalyticsSummary:
     """
     Get comprehensive analytics summary
+    
+    Served from the analytics cache; concurrent identical requests share one
+    computation, whose sections run concurrently. Sections that failed are
+    listed in section_errors. System metrics are always current.
     """
+    # The summary is computed on a session of its own; hand back the
+    # connection the permission check used instead of holding it while waiting
+    db.close()
     try:
-        user_analytics = get_user_analytics(
-            db=db,
-            start_date=start_date,
-            end_date=end_date,
-            sports=sports
-        )
-        
-        sport_analytics = get_sport_analytics(
-            db=db,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        engagement_metrics = get_engagement_metrics(
-            db=db,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        system_metrics = get_system_metrics()
-        
-        return AnalyticsSummary(
-            user_analytics=user_analytics,
-            sport_analytics=sport_analytics,
-            engagement_metrics=engagement_metrics,
-            system_metrics=system_metrics,
-            generated_at=datetime.utcnow()
+        key = analytics_cache_key(start_date, end_date, sports)
+        start, end, sport_filter = key
+        summary = await analytics_summary_cache.get(
+            key,
+            lambda: compute_analytics_summary(start, end, list(sport_filter) if sport_filter else None),
+            # Summaries missing a failed section are not kept
+            cacheable=lambda summary: not summary.section_errors
         )
+        return summary.model_copy(update={"system_metrics": get_system_metrics()})
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -172,23 +237,94 @@ async def get_analytics_summary(
         )
 
 
-@router.post("/export")
+@router.post("/export", response_model=AnalyticsExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def export_analytics_data(
     request: AnalyticsRequest,
-    format: str = Query("csv", description="Export format: csv, excel, pdf"),
+    format: str = Query("csv", description="Export format: csv, xlsx or parquet"),
     db: Session = Depends(get_db),
     current_user: AdminUser = Depends(require_permissions([
         {"resource": "analytics", "actions": ["export"]}
     ]))
-):
-    """
-    Export analytics data in various formats
-    """
-    # This would implement actual export functionality
-    # For now, return a mock response
-    return {
-        "message": "Export functionality will be implemented in task 16",
-        "format": format,
-        "request": request.model_dump(),
-        "status": "pending"
-    }
\ No newline at end of file
+) -> AnalyticsExportJobResponse:
+    """
+    Export the users matching the filters, with all profile fields
+    
+    The file is generated by a background worker; poll GET /exports/{job_id}
+    for progress and download it from GET /exports/{job_id}/download once the
+    export is completed.
+    """
+    try:
+        export_format = analytics_export_format(format)
+        job = create_analytics_export(db, request, export_format, current_user.id)
+        analytics_export_runner.submit(job.id)
+        return job
+    except ExportLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start analytics export: {str(e)}"
+        )
+
+
+@router.get("/exports/{job_id}", response_model=AnalyticsExportJobResponse)
+async def get_export_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "analytics", "actions": ["export"]}
+    ]))
+) -> AnalyticsExportJobResponse:
+    """
+    Get the status and progress of an analytics export
+    """
+    job = get_analytics_export(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    return job
+
+
+@router.get("/exports/{job_id}/download")
+async def download_export(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "analytics", "actions": ["export"]}
+    ]))
+) -> FileResponse:
+    """
+    Download the file of a completed analytics export
+    """
+    job = get_analytics_export(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    if job.status == "expired":
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export has expired, start a new one"
+        )
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status}"
+        )
+    
+    return FileResponse(
+        job.file_path,
+        media_type=EXPORT_FORMATS[job.format],
+        filename=export_filename(job)
+    )
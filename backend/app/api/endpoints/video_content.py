@@ -4,7 +4,9 @@ Video content management endpoints for admin dashboard
 
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, status, Depends, Query, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Depends, Query, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from sqlalchemy.orm import Session
 
 from app.models.database import get_db
@@ -19,7 +21,13 @@ from app.schemas.video_content import (
     PaginatedVideoResponse,
     VideoAnalytics,
     VideoEngagementUpdate,
-    VideoBulkAction
+    VideoEngagementStats,
+    VideoBulkAction,
+    VideoUploadSessionCreate,
+    VideoUploadSessionResponse,
+    VideoModerationClaimResponse,
+    VideoImportJobResponse,
+    VideoImportRowError
 )
 from app.services.video_content_service import (
     get_videos_with_filters,
@@ -30,9 +38,37 @@ from app.services.video_content_service import (
     moderate_video,
     get_video_analytics,
     update_video_engagement,
-    search_videos
+    search_videos,
+    claim_moderation_batch,
+    release_moderation_claims
+)
+from app.services.engagement_buffer import EngagementBufferFull
+from app.services.engagement_event_service import get_video_engagement_stats
+from app.services.video_upload_service import (
+    UploadOffsetMismatch,
+    create_upload_session,
+    get_upload_session,
+    append_upload_chunks,
+    complete_upload,
+    cancel_upload
+)
+from app.services.video_export_service import (
+    EXPORT_FORMATS,
+    check_export_format,
+    export_filename,
+    stream_video_export
+)
+from app.services.video_import_service import (
+    import_format_for,
+    import_resumable,
+    save_import_file,
+    create_video_import,
+    get_video_import,
+    get_video_import_errors,
+    run_video_import_job
 )
 from app.core.auth import get_current_admin_user, require_permissions
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -44,11 +80,13 @@ async def list_videos(
     search: Optional[str] = Query(None, description="Search by title or description"),
     sport: Optional[str] = Query(None, description="Filter by sport"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    status: Optional[str] = Query(None, description="Filter by status"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
     moderation_status: Optional[str] = Query(None, description="Filter by moderation status"),
     difficulty_level: Optional[str] = Query(None, description="Filter by difficulty level"),
-    sort_by: str = Query("created_at", description="Sort field"),
+    sort_by: str = Query("created_at", description="Sort field, or 'trending' for the decayed engagement score"),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Compute the total count"),
     db: Session = Depends(get_db),
     current_user: AdminUser = Depends(require_permissions([
         {"resource": "videos", "actions": ["read"]}
@@ -65,13 +103,20 @@ async def list_videos(
             search=search,
             sport=sport,
             category=category,
-            status=status,
+            status=status_filter,
             moderation_status=moderation_status,
             difficulty_level=difficulty_level,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total
         )
         return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -79,6 +124,49 @@ async def list_videos(
         )
 
 
+@router.get("/export")
+async def export_videos(
+    format: str = Query("csv", description="Export format: csv, ndjson or parquet"),
+    search: Optional[str] = Query(None, description="Search by title or description"),
+    sport: Optional[str] = Query(None, description="Filter by sport"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
+    moderation_status: Optional[str] = Query(None, description="Filter by moderation status"),
+    difficulty_level: Optional[str] = Query(None, description="Filter by difficulty level"),
+    sort_by: str = Query("created_at", description="Sort field, or 'trending' for the decayed engagement score"),
+    sort_order: str = Query("desc", description="Sort order: asc or desc"),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["export"]}
+    ]))
+) -> StreamingResponse:
+    """
+    Export every video matching the list filters, streamed as it is read
+    """
+    try:
+        check_export_format(format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        stream_video_export(
+            format=format,
+            search=search,
+            sport=sport,
+            category=category,
+            status=status_filter,
+            moderation_status=moderation_status,
+            difficulty_level=difficulty_level,
+            sort_by=sort_by,
+            sort_order=sort_order
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format)}"'}
+    )
+
+
 @router.get("/{video_id}", response_model=VideoContentResponse)
 async def get_video_details(
     video_id: int,
@@ -295,6 +383,11 @@ async def update_video_engagement_endpoint(
             )
         
         return {"message": f"Video {engagement_update.action} updated successfully"}
+    except EngagementBufferFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Engagement event not accepted: {str(e)}"
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -304,6 +397,37 @@ async def update_video_engagement_endpoint(
         )
 
 
+@router.get("/{video_id}/engagement", response_model=VideoEngagementStats)
+async def get_video_engagement_endpoint(
+    video_id: int,
+    start_date: Optional[datetime] = Query(None, description="Start of the period (default: 30 days ago)"),
+    end_date: Optional[datetime] = Query(None, description="End of the period (default: now)"),
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["read"]}
+    ]))
+) -> VideoEngagementStats:
+    """
+    Get counted engagement events and unique viewers of a video
+    """
+    try:
+        exists = db.query(VideoContent.id).filter(VideoContent.id == video_id).first()
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Video not found"
+            )
+        
+        return VideoEngagementStats(**get_video_engagement_stats(db, video_id, start_date, end_date))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve video engagement: {str(e)}"
+        )
+
+
 @router.post("/bulk-moderate")
 async def bulk_moderate_videos(
     video_ids: List[int],
@@ -345,6 +469,8 @@ async def bulk_moderate_videos(
 async def get_moderation_queue(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Compute the total count"),
     db: Session = Depends(get_db),
     current_user: AdminUser = Depends(require_permissions([
         {"resource": "videos", "actions": ["read"]}
@@ -360,9 +486,16 @@ async def get_moderation_queue(
             limit=limit,
             moderation_status="unreviewed",
             sort_by="created_at",
-            sort_order="asc"
+            sort_order="asc",
+            cursor=cursor,
+            include_total=include_total
         )
         return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -370,6 +503,50 @@ async def get_moderation_queue(
         )
 
 
+@router.post("/moderation/claim", response_model=VideoModerationClaimResponse)
+async def claim_moderation_videos(
+    limit: int = Query(10, ge=1, le=50, description="Number of videos to claim"),
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoModerationClaimResponse:
+    """
+    Claim the next batch of unreviewed videos for the current moderator
+    
+    Claimed videos are not handed to other moderators until they are moderated,
+    released, or the lease expires.
+    """
+    try:
+        return claim_moderation_batch(db, current_user.id, limit)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to claim videos: {str(e)}"
+        )
+
+
+@router.post("/moderation/release")
+async def release_moderation_videos(
+    video_ids: Optional[List[int]] = None,
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> Dict[str, Any]:
+    """
+    Return claimed videos to the moderation queue (all claims if no ids are given)
+    """
+    try:
+        released = release_moderation_claims(db, current_user.id, video_ids)
+        return {"message": "Claims released", "released": released}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to release claims: {str(e)}"
+        )
+
+
 @router.get("/categories/options")
 async def get_video_categories(
     current_user: AdminUser = Depends(require_permissions([
@@ -391,34 +568,285 @@ async def get_video_categories(
     }
 
 
-@router.post("/upload")
+async def _upload_file_chunks(file: UploadFile):
+    """Read a multipart upload in fixed-size chunks"""
+    while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+@router.post("/upload", response_model=VideoContentResponse)
 async def upload_video(
-    file: UploadFile = File(...),
+    request: Request,
+    filename: Optional[str] = Query(None, description="Original file name, used for the stored extension"),
     title: str = Query(...),
     sport: str = Query(...),
     category: str = Query(...),
     description: Optional[str] = Query(None),
     difficulty_level: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None),
     db: Session = Depends(get_db),
     current_user: AdminUser = Depends(require_permissions([
         {"resource": "videos", "actions": ["write"]}
     ]))
-) -> Dict[str, str]:
+) -> VideoContentResponse:
     """
-    Upload a new video file
+    Upload a new video file in a single request
+    
+    The raw request body is the file; it is streamed to disk once, without
+    being spooled first. Use POST /uploads for uploads that may need resuming.
     """
+    content_length = request.headers.get("content-length")
+    upload = create_upload_session(
+        VideoUploadSessionCreate(
+            title=title,
+            sport=sport,
+            category=category,
+            description=description,
+            difficulty_level=difficulty_level,
+            tags=tags,
+            filename=filename,
+            total_size=int(content_length) if content_length and content_length.isdigit() else None
+        ),
+        current_user.id
+    )
     try:
-        # This would implement actual file upload logic
-        # For now, return a mock response
-        return {
-            "message": "Video upload functionality will be implemented with file storage service",
-            "filename": file.filename,
-            "title": title,
-            "sport": sport,
-            "category": category
-        }
+        await append_upload_chunks(upload.upload_id, current_user.id, 0, request.stream())
+        return await complete_upload(db, upload.upload_id, current_user.id)
+    except ClientDisconnect:
+        cancel_upload(upload.upload_id, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload interrupted, send the file again"
+        )
+    except ValueError as e:
+        cancel_upload(upload.upload_id, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
+        cancel_upload(upload.upload_id, current_user.id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload video: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/uploads", response_model=VideoUploadSessionResponse)
+async def create_video_upload(
+    upload_data: VideoUploadSessionCreate,
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoUploadSessionResponse:
+    """
+    Start a resumable upload; send the file with PUT /uploads/{upload_id}
+    
+    Only the admin who started an upload can send, complete or cancel it.
+    """
+    return create_upload_session(upload_data, current_user.id)
+
+
+@router.get("/uploads/{upload_id}", response_model=VideoUploadSessionResponse)
+async def get_video_upload(
+    upload_id: str,
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoUploadSessionResponse:
+    """
+    Get the offset an interrupted upload should resume from
+    """
+    upload = get_upload_session(upload_id, current_user.id)
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+
+@router.put("/uploads/{upload_id}", response_model=VideoUploadSessionResponse)
+async def upload_video_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of the request body in the file"),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoUploadSessionResponse:
+    """
+    Append the raw request body to an upload at the given offset
+    
+    The body is streamed to disk; a chunk can be any size, up to the whole file.
+    On interruption, GET the upload and resume from its offset.
+    """
+    try:
+        upload = await append_upload_chunks(upload_id, current_user.id, offset, request.stream())
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ClientDisconnect:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload interrupted, resume from the upload's current offset"
+        )
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=VideoContentResponse)
+async def complete_video_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoContentResponse:
+    """
+    Finish an upload and create the video
+    """
+    try:
+        video = await complete_upload(db, upload_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to complete upload: {str(e)}"
+        )
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return video
+
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_video_upload(
+    upload_id: str,
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> Dict[str, str]:
+    """
+    Abort an upload and discard the received data
+    """
+    if not cancel_upload(upload_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return {"message": "Upload cancelled"}
+
+
+@router.post("/imports", response_model=VideoImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_videos(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; taken from the file extension if omitted"),
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoImportJobResponse:
+    """
+    Bulk import videos from a CSV or NDJSON file of video records
+    
+    The file is stored and imported in the background; poll GET /imports/{job_id}
+    for progress and GET /imports/{job_id}/errors for the rows that were rejected.
+    """
+    try:
+        import_format = import_format_for(file.filename, format)
+        source_path = await save_import_file(_upload_file_chunks(file), import_format)
+        job = create_video_import(db, source_path, import_format, current_user.id)
+        background_tasks.add_task(run_video_import_job, job.id)
+        return job
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start video import: {str(e)}"
+        )
+
+
+@router.get("/imports/{job_id}", response_model=VideoImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoImportJobResponse:
+    """
+    Get the status and progress of a video import
+    """
+    job = get_video_import(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+    return job
+
+
+@router.get("/imports/{job_id}/errors", response_model=List[VideoImportRowError])
+async def get_import_errors(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Number of errors to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of errors to return"),
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> List[VideoImportRowError]:
+    """
+    Get the rejected rows of a video import with their validation errors
+    """
+    if not get_video_import(db, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+    return get_video_import_errors(db, job_id, offset, limit)
+
+
+@router.post("/imports/{job_id}/resume", response_model=VideoImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_import_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: AdminUser = Depends(require_permissions([
+        {"resource": "videos", "actions": ["write"]}
+    ]))
+) -> VideoImportJobResponse:
+    """
+    Resume a failed or stalled video import after its last imported chunk
+    """
+    job = get_video_import(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+    if not import_resumable(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Import is already {job.status}"
+        )
+    background_tasks.add_task(run_video_import_job, job.id)
+    return job
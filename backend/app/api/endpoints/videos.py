@@ -0,0 +1,85 @@
+"""
+Public video endpoints for the mobile app
+"""
+
+import mimetypes
+import os
+from typing import List
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.range_response import RangeFileResponse
+from app.models.database import get_db
+from app.models.models import VideoContent
+from app.schemas.video_content import VideoContentListResponse
+from app.services.video_content_service import get_related_videos
+from app.services.video_upload_service import storage_path_for
+
+router = APIRouter()
+
+
+@router.api_route("/{video_id}/stream", methods=["GET", "HEAD"], response_class=RangeFileResponse)
+async def stream_video(
+    video_id: int,
+    db: Session = Depends(get_db)
+) -> RangeFileResponse:
+    """
+    Stream the file of an approved video, with HTTP Range support for seeking
+    """
+    file_url = db.query(VideoContent.file_url).filter(
+        VideoContent.id == video_id,
+        VideoContent.status == "approved"
+    ).scalar()
+    
+    path = storage_path_for(file_url)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+    
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video file not found"
+        )
+    
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return RangeFileResponse(
+        path,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=86400"},
+        stat_result=stat_result
+    )
+
+
+@router.get("/{video_id}/related", response_model=List[VideoContentListResponse])
+async def related_videos(
+    video_id: int,
+    limit: int = Query(10, ge=1, le=settings.RELATED_VIDEOS_TOP_K, description="Number of videos to return"),
+    db: Session = Depends(get_db)
+) -> List[VideoContentListResponse]:
+    """
+    Get approved videos similar to an approved video ("more like this")
+    """
+    try:
+        videos = get_related_videos(db, video_id, limit)
+        
+        if videos is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Video not found"
+            )
+        
+        return videos
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve related videos: {str(e)}"
+        )
@@ -4,7 +4,7 @@ Latest FastAPI patterns and best practices
 """
 
 from fastapi import APIRouter
-from app.api.endpoints import users, items, auth, admin_auth, admin_analytics, user_management, video_content
+from app.api.endpoints import users, items, auth, admin_auth, admin_analytics, user_management, video_content, videos
 
 # Create main API router
 api_router = APIRouter()
@@ -40,6 +40,12 @@ api_router.include_router(
     tags=["admin-video-content"]
 )
 
+api_router.include_router(
+    videos.router,
+    prefix="/videos",
+    tags=["videos"]
+)
+
 api_router.include_router(
     users.router,
     prefix="/users",
@@ -0,0 +1,141 @@
+"""
+Connection pool instrumentation
+
+Counts what the engine's pool does through its events (new connections,
+checkouts, check-ins, invalidations such as those after a failed
+pool_pre_ping) and times, in the log-bucketed histograms of request_metrics,
+how long callers waited to get a connection and how long they kept it
+checked out. Waiting is measured by InstrumentedQueuePool, which the engine
+uses instead of QueuePool; requests failing with a pool timeout are counted
+as exhaustion. Gauges (pool size, checked out, overflow) are read from the
+pool when a snapshot is taken. Metrics are per process.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.request_metrics import HISTOGRAM_BUCKETS, histogram_percentiles, latency_bucket
+
+# connection_record.info key holding the checkout time
+_CHECKED_OUT_AT = "pool_metrics_checked_out_at"
+
+
+class PoolMetrics:
+    """Counters and wait/hold time histograms of a connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engine = None
+        self._connects = 0
+        self._checkouts = 0
+        self._checkins = 0
+        self._invalidations = 0
+        self._soft_invalidations = 0
+        self._timeouts = 0
+        self._max_wait_us = 0.0
+        self._wait_total_us = 0.0
+        self._wait_histogram = [0] * HISTOGRAM_BUCKETS
+        self._hold_total_us = 0.0
+        self._hold_histogram = [0] * HISTOGRAM_BUCKETS
+
+    def instrument(self, engine) -> None:
+        """Listen to the pool events of an engine"""
+        self._engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self._connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info[_CHECKED_OUT_AT] = time.perf_counter()
+        with self._lock:
+            self._checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop(_CHECKED_OUT_AT, None)
+        with self._lock:
+            self._checkins += 1
+            if checked_out_at is not None:
+                held_us = (time.perf_counter() - checked_out_at) * 1_000_000
+                self._hold_total_us += held_us
+                self._hold_histogram[latency_bucket(held_us)] += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self._invalidations += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self._soft_invalidations += 1
+
+    def record_wait(self, waited_us: float, timed_out: bool) -> None:
+        with self._lock:
+            self._wait_total_us += waited_us
+            self._wait_histogram[latency_bucket(waited_us)] += 1
+            self._max_wait_us = max(self._max_wait_us, waited_us)
+            if timed_out:
+                self._timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Pool gauges, event counters and wait/hold percentiles (ms)"""
+        pool = self._engine.pool if self._engine is not None else None
+        gauges: Dict[str, Any] = {"pool_class": type(pool).__name__ if pool is not None else None}
+        if isinstance(pool, QueuePool):
+            gauges.update({
+                "pool_size": pool.size(),
+                "timeout_seconds": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        with self._lock:
+            waits = sum(self._wait_histogram)
+            holds = sum(self._hold_histogram)
+            return {
+                **gauges,
+                "connects": self._connects,
+                "checkouts": self._checkouts,
+                "checkins": self._checkins,
+                "invalidations": self._invalidations,
+                "soft_invalidations": self._soft_invalidations,
+                "timeouts": self._timeouts,
+                "wait": {
+                    "count": waits,
+                    "total_ms": round(self._wait_total_us / 1000, 2),
+                    "max_ms": round(self._max_wait_us / 1000, 2),
+                    **histogram_percentiles(self._wait_histogram),
+                },
+                "checkout_duration": {
+                    "count": holds,
+                    "total_ms": round(self._hold_total_us / 1000, 2),
+                    **histogram_percentiles(self._hold_histogram),
+                },
+            }
+
+
+# Metrics of the application engine, see app.models.database
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording how long each connection request waited"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_wait((time.perf_counter() - started) * 1_000_000, timed_out)
@@ -0,0 +1,92 @@
+"""
+Prometheus text exposition of the process metrics
+
+Renders the request telemetry and the connection pool metrics in the text
+format (version 0.0.4) served by GET /metrics to scrapers holding
+METRICS_TOKEN. Latency histograms are exposed as summaries with p50/p95/p99
+quantiles.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.pool_metrics import pool_metrics
+from app.core.request_metrics import request_metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Summary quantile label -> percentile key of the metrics snapshots
+QUANTILES = (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))
+
+Sample = Tuple[Dict[str, str], Optional[float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _metric(lines: List[str], name: str, kind: str, help: str, samples: List[Sample]) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {'NaN' if value is None else value}")
+
+
+def _summary(lines: List[str], name: str, help: str, series: List[Tuple[Dict[str, str], dict]]) -> None:
+    """Summary from percentile dicts in milliseconds with count and total_ms"""
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} summary")
+    for labels, stats in series:
+        for quantile, key in QUANTILES:
+            value = stats[key]
+            sample_labels = {**labels, "quantile": quantile}
+            lines.append(f"{name}{_labels(sample_labels)} {'NaN' if value is None else round(value / 1000, 6)}")
+        lines.append(f"{name}_sum{_labels(labels)} {round(stats['total_ms'] / 1000, 6)}")
+        lines.append(f"{name}_count{_labels(labels)} {stats['count']}")
+
+
+def render_metrics() -> str:
+    """Metrics of this process in the Prometheus text format"""
+    lines: List[str] = []
+
+    pool = pool_metrics.snapshot()
+    if "pool_size" in pool:
+        _metric(lines, "db_pool_size", "gauge", "Connections kept open by the pool", [({}, pool["pool_size"])])
+        _metric(lines, "db_pool_max_overflow", "gauge", "Connections allowed beyond the pool size",
+                [({}, settings.DB_MAX_OVERFLOW)])
+        _metric(lines, "db_pool_checked_out", "gauge", "Connections currently in use", [({}, pool["checked_out"])])
+        _metric(lines, "db_pool_checked_in", "gauge", "Idle connections in the pool", [({}, pool["checked_in"])])
+        _metric(lines, "db_pool_overflow", "gauge", "Connections open beyond the pool size", [({}, pool["overflow"])])
+    for key, help in (
+        ("connects", "New database connections opened"),
+        ("checkouts", "Connections handed out by the pool"),
+        ("checkins", "Connections returned to the pool"),
+        ("invalidations", "Connections invalidated, e.g. after a failed pre-ping"),
+        ("soft_invalidations", "Connections soft-invalidated"),
+        ("timeouts", "Connection requests that timed out on an exhausted pool"),
+    ):
+        _metric(lines, f"db_pool_{key}_total", "counter", help, [({}, pool[key])])
+    _summary(lines, "db_pool_wait_seconds", "Time spent waiting for a connection", [({}, pool["wait"])])
+    _summary(lines, "db_pool_checkout_duration_seconds", "Time connections stayed checked out",
+             [({}, pool["checkout_duration"])])
+
+    requests = request_metrics.snapshot()
+    _metric(lines, "http_requests_in_flight", "gauge", "Requests being processed",
+            [({}, requests["in_flight_requests"])])
+    _metric(lines, "http_requests_total", "counter", "Requests by route and status class", [
+        ({"route": route, "status": status_class}, count)
+        for route, stats in requests["routes"].items()
+        for status_class, count in stats["status_codes"].items()
+        if count
+    ])
+    _summary(lines, "http_request_duration_seconds", "Request latency by route", [
+        ({"route": route}, {**stats, "count": stats["requests"]})
+        for route, stats in requests["routes"].items()
+    ])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,247 @@
+"""
+HTTP Range aware file response for video playback
+
+Serves single and multi-range requests (206 / multipart/byteranges), answers
+conditional requests with 304 and unsatisfiable ranges with 416. Bodies are
+sent zero-copy through the ASGI ``http.response.zerocopy`` / ``pathsend``
+extensions when the server offers them, otherwise with positioned reads
+(``os.pread``) in a worker thread, so concurrent seeks never share a file offset.
+"""
+
+import os
+import re
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+_RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+# Requests asking for more ranges than this are answered with the full file
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a bytes Range header into sorted, merged [start, end) ranges
+
+    Returns None when the header is malformed or should be ignored (the full
+    file is served), and raises RangeNotSatisfiable when no range overlaps the
+    file.
+    """
+    unit, _, specs = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        match = _RANGE_SPEC.match(spec)
+        if not match or match.groups() == ("", ""):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            ranges.append((max(file_size - length, 0), file_size))
+            continue
+        start = int(first)
+        end = int(last) + 1 if last else file_size
+        if last and end <= start:
+            return None
+        if start < file_size:
+            ranges.append((start, min(end, file_size)))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _read_at(f, offset: int, size: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(f.fileno(), size, offset)
+    f.seek(offset)
+    return f.read(size)
+
+
+class RangeFileResponse(Response):
+    """Stream a file from disk honouring Range, If-Range and conditional headers"""
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        media_type: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        stat_result: Optional[os.stat_result] = None
+    ) -> None:
+        self.path = path
+        self.status_code = 200
+        self.media_type = media_type or "application/octet-stream"
+        self.background = None
+        self.init_headers(headers)
+        self.stat_result = stat_result or os.stat(path)
+
+        self.etag = f'"{self.stat_result.st_mtime_ns:x}-{self.stat_result.st_size:x}"'
+        self.last_modified = formatdate(self.stat_result.st_mtime, usegmt=True)
+        self.headers.setdefault("accept-ranges", "bytes")
+        self.headers.setdefault("etag", self.etag)
+        self.headers.setdefault("last-modified", self.last_modified)
+
+    def _not_modified(self, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat_result.st_mtime) <= since
+        return False
+
+    def _range_allowed(self, request_headers: Headers) -> bool:
+        if_range = request_headers.get("if-range")
+        return if_range is None or if_range in (self.etag, self.last_modified)
+
+    async def _start(self, send: Send, status_code: int, headers: List[Tuple[bytes, bytes]]) -> None:
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+
+    def _headers_with(self, **extra: str) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (key, value) for key, value in self.raw_headers
+            if key not in (b"content-length", b"content-type")
+        ]
+        for key, value in extra.items():
+            headers.append((key.replace("_", "-").encode("latin-1"), value.encode("latin-1")))
+        return headers
+
+    async def _send_range(self, send: Send, scope: Scope, f, start: int, end: int, more_body: bool) -> None:
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            await send({
+                "type": "http.response.zerocopy",
+                "file": f,
+                "offset": start,
+                "count": end - start,
+                "more_body": more_body
+            })
+            return
+
+        position = start
+        while position < end:
+            chunk = await anyio.to_thread.run_sync(_read_at, f, position, min(self.chunk_size, end - position))
+            if not chunk:
+                break  # File shrank underneath us
+            position += len(chunk)
+            await send({
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": more_body or position < end
+            })
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        send_body = scope.get("method", "GET").upper() != "HEAD"
+        file_size = self.stat_result.st_size
+
+        if self._not_modified(request_headers):
+            await self._start(send, 304, self._headers_with())
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        ranges = None
+        range_header = request_headers.get("range")
+        if range_header and self._range_allowed(request_headers):
+            try:
+                ranges = parse_range_header(range_header, file_size)
+            except RangeNotSatisfiable:
+                await self._start(send, 416, self._headers_with(
+                    content_range=f"bytes */{file_size}",
+                    content_length="0"
+                ))
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if ranges is None:
+            await self._start(send, 200, self._headers_with(
+                content_type=self.media_type,
+                content_length=str(file_size)
+            ))
+            if not send_body:
+                await send({"type": "http.response.body", "body": b""})
+            elif "http.response.pathsend" in scope.get("extensions", {}):
+                await send({"type": "http.response.pathsend", "path": str(self.path)})
+            else:
+                with open(self.path, "rb") as f:
+                    await self._send_range(send, scope, f, 0, file_size, more_body=False)
+                    if file_size == 0:
+                        await send({"type": "http.response.body", "body": b""})
+            return
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            await self._start(send, 206, self._headers_with(
+                content_type=self.media_type,
+                content_length=str(end - start),
+                content_range=f"bytes {start}-{end - 1}/{file_size}"
+            ))
+            if not send_body:
+                await send({"type": "http.response.body", "body": b""})
+                return
+            with open(self.path, "rb") as f:
+                await self._send_range(send, scope, f, start, end, more_body=False)
+            return
+
+        boundary = secrets.token_hex(16)
+        part_headers = [
+            (
+                f"--{boundary}\r\n"
+                f"Content-Type: {self.media_type}\r\n"
+                f"Content-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n"
+            ).encode("latin-1")
+            for start, end in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        content_length = (
+            sum(len(header) for header in part_headers)
+            + sum(end - start for start, end in ranges)
+            + 2 * (len(ranges) - 1)  # CRLF between parts
+            + len(closing)
+        )
+        await self._start(send, 206, self._headers_with(
+            content_type=f"multipart/byteranges; boundary={boundary}",
+            content_length=str(content_length)
+        ))
+        if not send_body:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with open(self.path, "rb") as f:
+            for index, ((start, end), header) in enumerate(zip(ranges, part_headers)):
+                prefix = header if index == 0 else b"\r\n" + header
+                await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                await self._send_range(send, scope, f, start, end, more_body=True)
+        await send({"type": "http.response.body", "body": closing})
@@ -0,0 +1,227 @@
+"""
+Request latency and error telemetry
+
+RequestMetricsMiddleware times every HTTP request from the moment it reaches
+the application until its response has been sent, and records it in
+RequestMetrics under the matched route template ("GET /api/v1/videos/{video_id}")
+with its status code. Latencies go into log-bucketed histograms: bucket i
+holds durations in [g^(i-1), g^i) microseconds with g = 1 + LATENCY_RELATIVE_ERROR,
+so percentiles are within that relative error and a histogram is a fixed-size
+list of counters whatever the traffic. Each route keeps one histogram since
+startup, and a ring of 24 hourly slots keeps the process-wide histogram and
+status counts of the last day for the trends.
+
+Recording a request is a clock read, one logarithm and a few counter updates
+under a lock, i.e. a few microseconds. Metrics are per process.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Relative width of a histogram bucket
+LATENCY_RELATIVE_ERROR = 0.05
+# Durations from 1 µs to 10 minutes get their own bucket, longer ones share the last
+MAX_TRACKED_LATENCY_US = 600 * 1_000_000
+
+_LOG_GROWTH = math.log1p(LATENCY_RELATIVE_ERROR)
+HISTOGRAM_BUCKETS = int(math.log(MAX_TRACKED_LATENCY_US) / _LOG_GROWTH) + 2
+
+# Hourly slots kept for the trends
+TREND_HOURS = 24
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+# Requests that did not match a route share one entry, so that scanners
+# probing random paths cannot grow the per-route table
+UNMATCHED_ROUTE = "unmatched"
+
+
+def latency_bucket(duration_us: float) -> int:
+    """Histogram bucket of a duration in microseconds"""
+    if duration_us < 1:
+        return 0
+    return min(int(math.log(duration_us) / _LOG_GROWTH) + 1, HISTOGRAM_BUCKETS - 1)
+
+
+def bucket_latency_ms(bucket: int) -> float:
+    """Representative duration of a bucket in milliseconds (its geometric midpoint)"""
+    if bucket == 0:
+        return 0.0
+    return math.exp((bucket - 0.5) * _LOG_GROWTH) / 1000
+
+
+def histogram_percentiles(histogram: List[int], percentiles=(50, 95, 99)) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 in milliseconds of a latency histogram, None when it is empty"""
+    total = sum(histogram)
+    result: Dict[str, Optional[float]] = {f"p{p}": None for p in percentiles}
+    if not total:
+        return result
+    targets = sorted((math.ceil(total * p / 100), f"p{p}") for p in percentiles)
+    seen = 0
+    index = 0
+    for bucket, count in enumerate(histogram):
+        if not count:
+            continue
+        seen += count
+        while index < len(targets) and seen >= targets[index][0]:
+            result[targets[index][1]] = round(bucket_latency_ms(bucket), 2)
+            index += 1
+        if index == len(targets):
+            break
+    return result
+
+
+class _LatencyStats:
+    """Request count, status classes and latency histogram of a route or an hour"""
+
+    __slots__ = ("count", "total_us", "statuses", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_us = 0.0
+        self.statuses = [0] * len(STATUS_CLASSES)
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, bucket: int, status_class: int, duration_us: float) -> None:
+        self.count += 1
+        self.total_us += duration_us
+        self.statuses[status_class] += 1
+        self.histogram[bucket] += 1
+
+    def merge(self, other: "_LatencyStats") -> None:
+        self.count += other.count
+        self.total_us += other.total_us
+        self.statuses = [a + b for a, b in zip(self.statuses, other.statuses)]
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    @property
+    def errors(self) -> int:
+        return self.statuses[4]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.count * 100, 2) if self.count else 0.0,
+            "total_ms": round(self.total_us / 1000, 2),
+            "average_response_time": round(self.total_us / self.count / 1000, 2) if self.count else None,
+            **histogram_percentiles(self.histogram),
+            "status_codes": dict(zip(STATUS_CLASSES, self.statuses)),
+        }
+
+
+class RequestMetrics:
+    """Per-route and hourly request statistics of this process"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _LatencyStats] = {}
+        # Hour number (epoch hours) and stats of each ring slot
+        self._hours: List[Tuple[int, _LatencyStats]] = [(-1, _LatencyStats()) for _ in range(TREND_HOURS)]
+        self._in_flight = 0
+        self._total = 0
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self, route: str, status_code: int, duration_us: float, now: float) -> None:
+        bucket = latency_bucket(duration_us)
+        status_class = min(max(status_code // 100 - 1, 0), 4)
+        hour = int(now // 3600)
+        slot = hour % TREND_HOURS
+        with self._lock:
+            self._in_flight -= 1
+            self._total += 1
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = _LatencyStats()
+            stats.record(bucket, status_class, duration_us)
+            slot_hour, hourly = self._hours[slot]
+            if slot_hour != hour:
+                hourly = _LatencyStats()
+                self._hours[slot] = (hour, hourly)
+            hourly.record(bucket, status_class, duration_us)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self._routes.clear()
+            self._hours = [(-1, _LatencyStats()) for _ in range(TREND_HOURS)]
+            self._total = 0
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Totals, last-24-hour percentiles, per-route stats and hourly trend"""
+        now = time.time() if now is None else now
+        current_hour = int(now // 3600)
+        with self._lock:
+            routes = {route: stats.summary() for route, stats in self._routes.items()}
+            hours = {
+                hour: (stats.count, stats.errors, histogram_percentiles(stats.histogram, (95,))["p95"])
+                for hour, stats in self._hours
+                if current_hour - TREND_HOURS < hour <= current_hour
+            }
+            last_day = _LatencyStats()
+            for hour, stats in self._hours:
+                if current_hour - TREND_HOURS < hour <= current_hour:
+                    last_day.merge(stats)
+            in_flight = self._in_flight
+            total = self._total
+
+        trend = []
+        for hour in range(current_hour - TREND_HOURS + 1, current_hour + 1):
+            count, errors, p95 = hours.get(hour, (0, 0, None))
+            trend.append({
+                "hour": datetime.utcfromtimestamp(hour * 3600),
+                "requests": count,
+                "errors": errors,
+                "p95": p95,
+            })
+
+        return {
+            "uptime_seconds": round(now - self.started_at, 1),
+            "total_requests": total,
+            "in_flight_requests": in_flight,
+            "last_24h": last_day.summary(),
+            "routes": dict(sorted(routes.items(), key=lambda item: item[1]["requests"], reverse=True)),
+            "hourly": trend,
+        }
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording the latency and status of every HTTP request"""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.metrics.request_started()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_us = (time.perf_counter() - started) * 1_000_000
+            route = scope.get("route")
+            name = f"{scope['method']} {route.path}" if route is not None else UNMATCHED_ROUTE
+            self.metrics.request_finished(name, status_code, duration_us, time.time())
+
+
+# Metrics of the process, recorded by the middleware installed in main.py
+request_metrics = RequestMetrics()
@@ -3,18 +3,35 @@ Database configuration and session management
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool, pool_metrics
+
+
+def _pool_options(database_url: str) -> dict:
+    """Queue pool sizing; in-memory SQLite keeps its single-connection pool"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
-    # PostgreSQL specific settings
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **_pool_options(settings.DATABASE_URL)
 )
+pool_metrics.instrument(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -2,7 +2,9 @@
 User model for PostgreSQL database
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+import uuid
+
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Boolean, Date, DateTime, Text, Index, ForeignKey, Uuid, DDL, event, text
 from sqlalchemy.sql import func
 from app.models.database import Base
 
@@ -60,6 +62,12 @@ class User(Base):
     # Profile completion status
     profile_completed = Column(Boolean, default=False)
 
+    __table_args__ = (
+        # Incremental refresh of the user dimension cube, registration ranges
+        Index("ix_users_updated_at", "updated_at"),
+        Index("ix_users_created_at", "created_at"),
+    )
+
 
 class AdminUser(Base):
     __tablename__ = "admin_users"
@@ -80,6 +88,26 @@ class AdminUser(Base):
 
 class VideoContent(Base):
     __tablename__ = "video_content"
+    __table_args__ = (
+        # Keyset pagination for the admin list and the moderation queue
+        # (created_at DESC NULLS LAST, id DESC) on PostgreSQL, the default listing order;
+        # SQLite sorts NULLs first, so its ascending index read backwards matches
+        Index(
+            "ix_video_content_created_at_id", "created_at", "id",
+            postgresql_ops={"created_at": "DESC NULLS LAST", "id": "DESC"}
+        ),
+        Index("ix_video_content_moderation_status_created_at_id", "moderation_status", "created_at", "id"),
+        # sort_by=trending
+        Index("ix_video_content_trending_score_id", "trending_score", "id"),
+        # Upload deduplication, one video per file content
+        Index("ix_video_content_content_hash", "content_hash", unique=True),
+        # Moderation queue claims only ever scan unreviewed rows
+        Index(
+            "ix_video_content_unreviewed_queue", "created_at", "id",
+            postgresql_where=text("moderation_status = 'unreviewed'"),
+            sqlite_where=text("moderation_status = 'unreviewed'")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -87,13 +115,14 @@ class VideoContent(Base):
     file_url = Column(String, nullable=False)
     thumbnail_url = Column(String, nullable=True)
     duration = Column(Integer, nullable=True)  # in seconds
-    file_size = Column(Integer, nullable=True)  # in bytes
+    file_size = Column(BigInteger, nullable=True)  # in bytes
+    content_hash = Column(String(64), nullable=True)  # SHA-256 hex digest of the stored file
     
     # Content categorization
     sport = Column(String, nullable=False)
     category = Column(String, nullable=False)  # 'tutorial', 'workout', 'technique', 'match', 'training'
     difficulty_level = Column(String, nullable=True)  # 'beginner', 'intermediate', 'advanced'
-    tags = Column(Text, nullable=True)  # JSON string of tags
+    tags = Column(Text, nullable=True)  # JSON string of tags, denormalized copy of video_tags
     
     # Content status and moderation
     status = Column(String, nullable=False, default="pending")  # 'pending', 'approved', 'rejected', 'flagged'
@@ -102,6 +131,10 @@ class VideoContent(Base):
     moderated_by = Column(Integer, nullable=True)  # Admin user ID
     moderated_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Moderation queue lease
+    claimed_by = Column(Integer, nullable=True)  # Admin user ID holding the claim
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Upload information
     uploaded_by = Column(Integer, nullable=True)  # User ID who uploaded
     upload_source = Column(String, nullable=True)  # 'admin', 'user', 'api'
@@ -111,6 +144,7 @@ class VideoContent(Base):
     like_count = Column(Integer, default=0)
     dislike_count = Column(Integer, default=0)
     share_count = Column(Integer, default=0)
+    trending_score = Column(Float, nullable=False, default=0, server_default="0")  # Maintained by trending_service
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -118,6 +152,137 @@ class VideoContent(Base):
     published_at = Column(DateTime(timezone=True), nullable=True)
 
 
+# Full-text search vector maintained by PostgreSQL itself; title, tags and
+# description are weighted A, B and C. Not mapped on the model, it is only read
+# through app.services.video_search_service.
+event.listen(
+    VideoContent.__table__,
+    "after_create",
+    DDL("""
+        ALTER TABLE video_content ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED;
+        CREATE INDEX IF NOT EXISTS ix_video_content_search_vector
+            ON video_content USING GIN (search_vector);
+    """).execute_if(dialect="postgresql")
+)
+
+
+class VideoTag(Base):
+    __tablename__ = "video_tags"
+    __table_args__ = (
+        # Tag filter lookups: tag -> video ids
+        Index("ix_video_tags_tag_video_id", "tag", "video_id"),
+    )
+
+    video_id = Column(Integer, ForeignKey("video_content.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False, default=0)  # Order of the tag on the video
+
+
+class VideoDailyStats(Base):
+    """Per upload day x sport x category totals of video_content, kept up to date
+    by the video write paths (see app.services.video_stats_service)"""
+    __tablename__ = "video_daily_stats"
+
+    day = Column(Date, primary_key=True)  # Upload (created_at) day of the videos
+    sport = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    
+    uploads = Column(Integer, nullable=False, default=0)
+    approved = Column(Integer, nullable=False, default=0)  # status 'approved'
+    unreviewed = Column(Integer, nullable=False, default=0)  # moderation_status 'unreviewed'
+    flagged = Column(Integer, nullable=False, default=0)  # status 'flagged'
+    views = Column(BigInteger, nullable=False, default=0)
+    likes = Column(BigInteger, nullable=False, default=0)
+    shares = Column(BigInteger, nullable=False, default=0)
+    duration_total = Column(BigInteger, nullable=False, default=0)  # in seconds
+    duration_count = Column(Integer, nullable=False, default=0)  # Videos with a known duration
+
+
+class VideoRelated(Base):
+    """Precomputed "more like this" neighbors of a video"""
+    __tablename__ = "video_related"
+
+    video_id = Column(Integer, ForeignKey("video_content.id", ondelete="CASCADE"), primary_key=True)
+    neighbors = Column(Text, nullable=False)  # JSON list of [video_id, score], best first
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class VideoEngagementEvent(Base):
+    """Append-only log of video engagement events
+
+    On PostgreSQL the table is range-partitioned by month on created_at; the
+    partitions are managed by app.services.engagement_event_service.
+    """
+    __tablename__ = "video_engagement_events"
+    __table_args__ = (
+        # Dedup window checks and unique viewer counts
+        Index("ix_video_engagement_events_video_user_created_at", "video_id", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime(timezone=True), primary_key=True)  # Partition key
+    video_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)  # None for anonymous events
+    action = Column(String, nullable=False)  # 'view', 'like', 'dislike', 'share'
+
+
+class VideoImportJob(Base):
+    """Bulk video import of a CSV/NDJSON file (see app.services.video_import_service)"""
+    __tablename__ = "video_import_jobs"
+
+    id = Column(String, primary_key=True)  # UUID
+    source_path = Column(String, nullable=False)  # File being imported
+    format = Column(String, nullable=False)  # 'csv', 'ndjson'
+    status = Column(String, nullable=False, default="pending")  # 'pending', 'running', 'completed', 'failed'
+    rows_processed = Column(Integer, nullable=False, default=0)  # Input rows committed; a resumed import skips these
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text, nullable=True)  # Why the last run failed
+    created_by = Column(Integer, nullable=True)  # Admin user ID, uploader of the imported videos
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class VideoImportError(Base):
+    """Input row of an import that failed validation"""
+    __tablename__ = "video_import_errors"
+
+    job_id = Column(String, ForeignKey("video_import_jobs.id", ondelete="CASCADE"), primary_key=True)
+    row_number = Column(Integer, primary_key=True)  # 1-based, header excluded
+    errors = Column(Text, nullable=False)  # JSON list of messages
+
+
+class AnalyticsExportJob(Base):
+    """Export of user analytics data to a file (see app.services.analytics_export_service)"""
+    __tablename__ = "analytics_export_jobs"
+
+    id = Column(String, primary_key=True)  # UUID
+    format = Column(String, nullable=False)  # 'csv', 'xlsx', 'parquet'
+    filters = Column(Text, nullable=True)  # JSON of the AnalyticsRequest
+    status = Column(String, nullable=False, default="pending")  # 'pending', 'running', 'completed', 'failed', 'expired'
+    rows_total = Column(Integer, nullable=True)  # Rows matching the filters, counted when the export starts
+    rows_written = Column(Integer, nullable=False, default=0)
+    file_path = Column(String, nullable=True)  # Generated file, removed when the export expires
+    file_size = Column(BigInteger, nullable=True)
+    error_message = Column(Text, nullable=True)
+    created_by = Column(Integer, nullable=True)  # Admin user ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Active exports of an admin
+        Index("ix_analytics_export_jobs_created_by_status", "created_by", "status"),
+    )
+
+
 class VideoModerationLog(Base):
     __tablename__ = "video_moderation_logs"
 
@@ -82,8 +82,40 @@ class AnalyticsRequest(BaseModel):
 
 
 class AnalyticsSummary(BaseModel):
-    user_analytics: UserAnalytics
-    sport_analytics: SportAnalytics
-    engagement_metrics: EngagementMetrics
+    # Sections that failed or timed out are None, with the reason in section_errors
+    user_analytics: Optional[UserAnalytics] = None
+    sport_analytics: Optional[SportAnalytics] = None
+    engagement_metrics: Optional[EngagementMetrics] = None
     system_metrics: SystemMetrics
-    generated_at: datetime
\ No newline at end of file
+    generated_at: datetime
+    section_errors: Dict[str, str] = {}
+
+class AnalyticsExportJobResponse(BaseModel):
+    id: str
+    format: str  # 'csv', 'xlsx', 'parquet'
+    status: str  # 'pending', 'running', 'completed', 'failed', 'expired'
+    rows_total: Optional[int] = None  # Known once the export has started
+    rows_written: int
+    file_size: Optional[int] = None
+    error_message: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class UserBreakdownRow(BaseModel):
+    values: Dict[str, Any]  # Group-by dimension -> value, None for users without one
+    count: int
+    percentage: float
+
+
+class UserBreakdown(BaseModel):
+    group_by: List[str]
+    total_users: int  # Users matching the filters
+    rows: List[UserBreakdownRow]  # Most frequent first
+    source: str  # 'cube' or 'database'
+    as_of: datetime  # When the data was read
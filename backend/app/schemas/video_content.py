@@ -3,7 +3,7 @@ Video Content Pydantic schemas for request/response models
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, HttpUrl
 
 
@@ -40,6 +40,7 @@ class VideoContentResponse(VideoContentBase):
     thumbnail_url: Optional[str] = None
     duration: Optional[int] = None
     file_size: Optional[int] = None
+    content_hash: Optional[str] = None
     
     # Status and moderation
     status: str
@@ -89,6 +90,12 @@ class VideoModerationRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class VideoModerationClaimResponse(BaseModel):
+    videos: List[VideoContentListResponse]
+    claimed_by: int
+    lease_expires_at: datetime
+
+
 class VideoModerationResponse(BaseModel):
     id: int
     video_id: int
@@ -116,17 +123,19 @@ class VideoSearchRequest(BaseModel):
     max_duration: Optional[int] = None
     min_views: Optional[int] = None
     tags: Optional[List[str]] = None
+    tag_match: Literal["all", "any"] = "all"  # 'all' (video has every tag) or 'any'
     limit: int = 50
 
 
 class PaginatedVideoResponse(BaseModel):
     videos: List[VideoContentListResponse]
-    total: int
+    total: Optional[int] = None  # None when the count was skipped
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
 
 
 class VideoAnalytics(BaseModel):
@@ -148,6 +157,14 @@ class VideoEngagementUpdate(BaseModel):
     user_id: Optional[int] = None
 
 
+class VideoEngagementStats(BaseModel):
+    video_id: int
+    start_date: datetime
+    end_date: datetime
+    events: Dict[str, int]  # Counted events per action
+    unique_viewers: int
+
+
 class VideoBulkAction(BaseModel):
     video_ids: List[int]
     action: str  # 'approve', 'reject', 'delete', 'flag', 'unflag'
@@ -164,6 +181,43 @@ class VideoUploadRequest(BaseModel):
     # File upload would be handled separately via multipart/form-data
 
 
+class VideoUploadSessionCreate(VideoUploadRequest):
+    filename: Optional[str] = None  # Original file name, used for the stored extension
+    thumbnail_url: Optional[str] = None
+    duration: Optional[int] = None  # in seconds
+    total_size: Optional[int] = None  # in bytes, checked when the upload completes
+
+
+class VideoUploadSessionResponse(BaseModel):
+    upload_id: str
+    offset: int  # Bytes received so far; the next chunk starts here
+    total_size: Optional[int] = None
+    chunk_size: int  # Suggested chunk size in bytes
+    created_at: datetime
+
+
+class VideoImportJobResponse(BaseModel):
+    id: str
+    format: str  # 'csv', 'ndjson'
+    status: str  # 'pending', 'running', 'completed', 'failed'
+    rows_processed: int  # Input rows done; a resumed import continues after these
+    rows_imported: int
+    rows_failed: int
+    error_message: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class VideoImportRowError(BaseModel):
+    row_number: int  # 1-based, header excluded
+    errors: List[str]
+
+
 class VideoExportRequest(BaseModel):
     format: str = "csv"  # 'csv', 'excel', 'json'
     filters: Optional[VideoSearchRequest] = None
@@ -0,0 +1,169 @@
+"""
+Response cache for the analytics summary
+
+Keeps a bounded, per-process LRU of computed results keyed by the normalized
+request. An entry is fresh for ANALYTICS_CACHE_TTL_SECONDS and is then served
+stale for up to ANALYTICS_CACHE_STALE_SECONDS more while a single background
+refresh recomputes it. Concurrent misses of the same key wait for one shared
+computation instead of each running the queries (single-flight), so a burst
+of identical dashboard loads costs the database one run.
+
+The cache is driven from the event loop; computations are blocking callables
+run in worker threads.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def analytics_cache_key(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    sports: Optional[List[str]]
+) -> Tuple:
+    """Normalize request parameters so that equivalent requests share an entry"""
+    return (
+        start_date.replace(tzinfo=None) if start_date else None,
+        end_date.replace(tzinfo=None) if end_date else None,
+        tuple(sorted(set(sports))) if sports else None,
+    )
+
+
+class AnalyticsCache:
+    """Bounded LRU cache with TTL, stale-while-revalidate and single-flight computation"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.ANALYTICS_CACHE_SIZE,
+        ttl_seconds: float = settings.ANALYTICS_CACHE_TTL_SECONDS,
+        stale_seconds: float = settings.ANALYTICS_CACHE_STALE_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Bumped by clear(), so computations started before it are not stored
+        self._generation = 0
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._refreshes = 0
+        self._errors = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    async def get(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Return the cached result for key, computing it with compute() when missing
+
+        Errors of compute() are raised to every request waiting for it and are
+        not cached, nor are results for which cacheable() is false (they are
+        still returned to the requests that waited for them).
+        """
+        entry = self._entries.get(key) if self.enabled else None
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                if age < self.ttl_seconds:
+                    self._hits += 1
+                else:
+                    self._stale_hits += 1
+                    if key not in self._inflight:
+                        self._refreshes += 1
+                        self._start(key, compute, cacheable, background=True)
+                return entry[1]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+        else:
+            self._misses += 1
+            future = self._start(key, compute, cacheable, background=False)
+        # A cancelled request does not cancel the computation others wait for
+        return await asyncio.shield(future)
+
+    def _start(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]],
+        background: bool
+    ) -> asyncio.Future:
+        future = asyncio.ensure_future(asyncio.to_thread(compute))
+        self._inflight[key] = future
+        generation = self._generation
+        future.add_done_callback(lambda done: self._finish(key, generation, done, cacheable, background))
+        return future
+
+    def _finish(
+        self,
+        key: Hashable,
+        generation: int,
+        future: asyncio.Future,
+        cacheable: Optional[Callable[[Any], bool]],
+        background: bool
+    ) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self._errors += 1
+            if background:
+                logger.error("Failed to refresh cached analytics for %s", key, exc_info=error)
+            return
+        if not self.enabled or generation != self._generation:
+            return
+        if cacheable is not None and not cacheable(future.result()):
+            return
+        self._entries[key] = (time.monotonic(), future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache metrics for the system metrics endpoint"""
+        lookups = self._hits + self._stale_hits + self._misses + self._coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "refreshes": self._refreshes,
+            "errors": self._errors,
+            "evictions": self._evictions,
+            "in_flight": len(self._inflight),
+            "hit_rate": round((self._hits + self._stale_hits) / lookups, 4) if lookups else None,
+        }
+
+
+# Cache of GET /admin/analytics/summary results, shared by the process
+analytics_summary_cache = AnalyticsCache()
@@ -0,0 +1,612 @@
+"""
+Background analytics exports
+
+An export job writes the users matching an AnalyticsRequest, with all their
+profile fields, to a CSV, XLSX or Parquet file in ANALYTICS_EXPORT_DIR. Jobs
+run in a pool of ANALYTICS_EXPORT_WORKERS worker processes, so that large
+exports take neither API threads nor the event loop. A worker reads the users
+in id order, one keyset page of ANALYTICS_EXPORT_BATCH_SIZE rows at a time,
+appends each page to the file and saves its progress before reading the next;
+XLSX is written by openpyxl in write-only mode and Parquet one row group per
+page, so memory use does not depend on the number of users exported. The file
+is written under a temporary name and renamed once complete.
+
+An admin may have ANALYTICS_EXPORT_MAX_ACTIVE_PER_ADMIN exports pending or
+running at a time. A periodic sweep removes the files of exports finished more
+than ANALYTICS_EXPORT_RETENTION_HOURS ago, fails running exports whose worker
+stopped making progress and picks up pending exports left by a stopped process.
+"""
+
+import asyncio
+import csv
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Set
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import AdminUser, AnalyticsExportJob, User
+from app.schemas.analytics import AnalyticsRequest
+from app.services.user_cube import secondary_sport_condition
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Format names accepted for compatibility with earlier clients
+FORMAT_ALIASES = {
+    "excel": "xlsx",
+}
+
+ACTIVE_STATUSES = ("pending", "running")
+
+# Exported columns; the Supabase ID only links the account to authentication
+USER_EXPORT_COLUMNS = tuple(
+    column for column in User.__table__.columns
+    if column.name != "supabase_user_id"
+)
+
+# Rows per worksheet including the header; longer exports continue on further sheets
+XLSX_MAX_ROWS = 1_048_576
+
+
+class ExportLimitExceeded(ValueError):
+    """The admin already has the maximum number of exports pending or running"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"At most {limit} exports may be pending or running at a time, wait for one to finish")
+        self.limit = limit
+
+
+def analytics_export_format(format: str) -> str:
+    """Normalize an export format; raises ValueError for formats that cannot be exported"""
+    format = FORMAT_ALIASES.get(format, format)
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{format}', use csv, xlsx or parquet")
+    if format == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise ValueError("XLSX export requires the openpyxl package")
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export requires the pyarrow package")
+    return format
+
+
+def export_filename(job: AnalyticsExportJob) -> str:
+    created_at = job.created_at or datetime.utcnow()
+    return f"users_{created_at:%Y%m%d_%H%M%S}.{job.format}"
+
+
+def export_filter_clauses(request: AnalyticsRequest) -> list:
+    """WHERE clauses selecting the users of an export request"""
+    clauses = []
+    if request.start_date:
+        clauses.append(User.created_at >= request.start_date.replace(tzinfo=None))
+    if request.end_date:
+        clauses.append(User.created_at <= request.end_date.replace(tzinfo=None))
+    if request.sports:
+        clauses.append(or_(
+            User.primary_sport.in_(request.sports),
+            *[secondary_sport_condition(sport) for sport in request.sports]
+        ))
+    if request.locations:
+        clauses.append(or_(
+            User.city.in_(request.locations),
+            User.state.in_(request.locations),
+            User.country.in_(request.locations)
+        ))
+    if request.experience_levels:
+        clauses.append(User.experience_level.in_(request.experience_levels))
+    return clauses
+
+
+def create_analytics_export(
+    db: Session,
+    request: AnalyticsRequest,
+    format: str,
+    admin_id: Optional[int]
+) -> AnalyticsExportJob:
+    """Register an export; run it with analytics_export_runner.submit
+
+    Raises ExportLimitExceeded when the admin has too many exports in progress.
+    """
+    if admin_id is not None:
+        # Serializes the submissions of an admin on PostgreSQL, so that
+        # concurrent requests cannot both pass the limit
+        db.query(AdminUser.id).filter(AdminUser.id == admin_id).with_for_update().first()
+        active = db.query(func.count(AnalyticsExportJob.id)).filter(
+            AnalyticsExportJob.created_by == admin_id,
+            AnalyticsExportJob.status.in_(ACTIVE_STATUSES)
+        ).scalar()
+        if active >= settings.ANALYTICS_EXPORT_MAX_ACTIVE_PER_ADMIN:
+            db.rollback()
+            raise ExportLimitExceeded(settings.ANALYTICS_EXPORT_MAX_ACTIVE_PER_ADMIN)
+
+    job = AnalyticsExportJob(
+        id=str(uuid.uuid4()),
+        format=format,
+        filters=request.model_dump_json(exclude_none=True),
+        status="pending",
+        rows_written=0,
+        created_by=admin_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_analytics_export(db: Session, job_id: str, admin_id: int) -> Optional[AnalyticsExportJob]:
+    """Get an export job with its progress; exports are only visible to the admin who created them"""
+    return db.query(AnalyticsExportJob).filter(
+        AnalyticsExportJob.id == job_id,
+        AnalyticsExportJob.created_by == admin_id
+    ).first()
+
+
+def _lease_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_EXPORT_LEASE_SECONDS)
+
+
+def _retention_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(hours=settings.ANALYTICS_EXPORT_RETENTION_HOURS)
+
+
+def _user_pages(db: Session, clauses: list) -> Iterator[List[tuple]]:
+    """Exported users in id order, one keyset page per transaction"""
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(*USER_EXPORT_COLUMNS).where(*clauses, User.id > last_id).order_by(User.id).limit(
+                settings.ANALYTICS_EXPORT_BATCH_SIZE
+            )
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+# Leading characters that make spreadsheet applications read a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@contextmanager
+def _keep_lease(job_id: str) -> Iterator[None]:
+    """Renew a running export's lease from a thread while the block runs
+
+    For steps that write no pages, like saving an XLSX file, which can take
+    longer than the lease on large exports.
+    """
+    stop = threading.Event()
+    interval = max(settings.ANALYTICS_EXPORT_LEASE_SECONDS / 4, 1)
+
+    def renew():
+        while True:
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(AnalyticsExportJob).where(
+                        AnalyticsExportJob.id == job_id,
+                        AnalyticsExportJob.status == "running"
+                    ).values(updated_at=func.now())
+                )
+                db.commit()
+            except Exception:
+                logger.exception("Failed to renew the lease of analytics export %s", job_id)
+            finally:
+                db.close()
+            if stop.wait(interval):
+                return
+
+    thread = threading.Thread(target=renew, name=f"analytics-export-lease-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Profile text is data, never a formula
+        return "'" + value
+    return value
+
+
+def _write_csv(
+    path: Path,
+    pages: Iterator[List[tuple]],
+    keep_lease: Callable[[], ContextManager[None]]
+) -> Iterator[int]:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([column.name for column in USER_EXPORT_COLUMNS])
+        for rows in pages:
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield len(rows)
+
+
+def _write_xlsx(
+    path: Path,
+    pages: Iterator[List[tuple]],
+    keep_lease: Callable[[], ContextManager[None]]
+) -> Iterator[int]:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    header = [column.name for column in USER_EXPORT_COLUMNS]
+    sheet = None
+    sheet_rows = 0
+
+    def cell(value):
+        if isinstance(value, datetime):
+            # Excel has no time zones
+            return value.replace(tzinfo=None)
+        if not isinstance(value, str):
+            return value
+        value = ILLEGAL_CHARACTERS_RE.sub("", value)
+        if value.startswith(FORMULA_PREFIXES):
+            # Profile text is data, never a formula: a text cell with a quote
+            # prefix, which Excel keeps as text when the cell is edited
+            text_cell = WriteOnlyCell(sheet, value)
+            text_cell.data_type = "s"
+            text_cell.quotePrefix = True
+            return text_cell
+        return value
+
+    def new_sheet():
+        sheet = workbook.create_sheet("users" if not workbook.worksheets else f"users ({len(workbook.worksheets) + 1})")
+        sheet.append(header)
+        return sheet
+
+    for rows in pages:
+        for row in rows:
+            if sheet is None or sheet_rows == XLSX_MAX_ROWS:
+                sheet = new_sheet()
+                sheet_rows = 1
+            sheet.append([cell(value) for value in row])
+            sheet_rows += 1
+        yield len(rows)
+    if sheet is None:
+        new_sheet()
+    # Zipping the sheets writes no pages, so the lease is renewed meanwhile
+    with keep_lease():
+        workbook.save(path)
+
+
+def _parquet_schema(pa):
+    fields = []
+    for column in USER_EXPORT_COLUMNS:
+        if isinstance(column.type, Boolean):
+            data_type = pa.bool_()
+        elif isinstance(column.type, (Integer, BigInteger)):
+            data_type = pa.int64()
+        elif isinstance(column.type, Float):
+            data_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            data_type = pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+        else:
+            data_type = pa.string()
+        fields.append(pa.field(column.name, data_type))
+    return pa.schema(fields)
+
+
+def _write_parquet(
+    path: Path,
+    pages: Iterator[List[tuple]],
+    keep_lease: Callable[[], ContextManager[None]]
+) -> Iterator[int]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in pages:
+            writer.write_table(pa.Table.from_pydict(dict(zip(schema.names, zip(*rows))), schema=schema))
+            yield len(rows)
+
+
+# Writers append the pages to a file, yielding the number of rows of each page
+# written; steps that write no pages run under keep_lease()
+EXPORT_WRITERS = {
+    "csv": _write_csv,
+    "xlsx": _write_xlsx,
+    "parquet": _write_parquet,
+}
+
+
+def _claim_export(db: Session, job_id: str) -> bool:
+    """Mark a pending export running; false when another worker took it"""
+    result = db.execute(
+        update(AnalyticsExportJob).where(
+            AnalyticsExportJob.id == job_id,
+            AnalyticsExportJob.status == "pending"
+        ).values(status="running", updated_at=func.now())
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _fail_export(db: Session, job_id: str, error_message: str) -> None:
+    db.execute(
+        update(AnalyticsExportJob).where(
+            AnalyticsExportJob.id == job_id,
+            AnalyticsExportJob.status.in_(ACTIVE_STATUSES)
+        ).values(status="failed", error_message=error_message, updated_at=func.now())
+    )
+    db.commit()
+
+
+def run_analytics_export(db: Session, job_id: str) -> Optional[AnalyticsExportJob]:
+    """Generate the file of a pending export
+
+    Returns None when the job does not exist and raises ValueError when it is
+    not pending. Errors mark the job failed and are re-raised. A job failed by
+    the cleanup sweep while its file was written stays failed.
+    """
+    job = db.get(AnalyticsExportJob, job_id)
+    if job is None:
+        return None
+    if not _claim_export(db, job_id):
+        raise ValueError(f"Export is already {job.status}")
+    db.refresh(job)
+
+    directory = Path(settings.ANALYTICS_EXPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{job.id}.{job.format}"
+    partial_path = directory / f"{job.id}.{job.format}.part"
+    try:
+        clauses = export_filter_clauses(AnalyticsRequest.model_validate_json(job.filters or "{}"))
+        job.rows_total = db.execute(select(func.count(User.id)).where(*clauses)).scalar()
+        db.commit()
+
+        rows_written = 0
+        writer = EXPORT_WRITERS[job.format](partial_path, _user_pages(db, clauses), lambda: _keep_lease(job_id))
+        for count in writer:
+            rows_written += count
+            db.execute(
+                update(AnalyticsExportJob).where(AnalyticsExportJob.id == job_id).values(
+                    rows_written=rows_written, updated_at=func.now()
+                )
+            )
+            db.commit()
+        os.replace(partial_path, path)
+
+        result = db.execute(
+            update(AnalyticsExportJob).where(
+                AnalyticsExportJob.id == job_id,
+                AnalyticsExportJob.status == "running"
+            ).values(
+                status="completed",
+                file_path=str(path),
+                file_size=path.stat().st_size,
+                completed_at=datetime.utcnow(),
+                updated_at=func.now()
+            )
+        )
+        db.commit()
+        if result.rowcount != 1:
+            path.unlink(missing_ok=True)
+            logger.warning("Analytics export %s was no longer running when its file was written", job_id)
+    except Exception as e:
+        db.rollback()
+        partial_path.unlink(missing_ok=True)
+        _fail_export(db, job_id, str(e))
+        raise
+
+    db.refresh(job)
+    return job
+
+
+def run_analytics_export_job(job_id: str) -> None:
+    """Run an export on a session of its own, in an export worker process"""
+    db = SessionLocal()
+    try:
+        job = db.get(AnalyticsExportJob, job_id)
+        if job is None or job.status != "pending":
+            # Picked up by a worker of another process
+            return
+        run_analytics_export(db, job_id)
+    except Exception:
+        logger.exception("Analytics export %s failed", job_id)
+    finally:
+        db.close()
+
+
+def cleanup_analytics_exports(db: Session) -> Dict[str, Any]:
+    """Expire old exports and fail stalled ones
+
+    Returns the exports expired and failed, and the pending exports that
+    waited longer than the lease, for the caller to run.
+    """
+    retention_cutoff = _retention_cutoff()
+    expired = db.query(AnalyticsExportJob).filter(
+        AnalyticsExportJob.status == "completed",
+        AnalyticsExportJob.completed_at < retention_cutoff
+    ).all()
+    for job in expired:
+        if job.file_path:
+            Path(job.file_path).unlink(missing_ok=True)
+        job.status = "expired"
+        job.file_path = None
+    db.commit()
+
+    stalled = db.execute(
+        update(AnalyticsExportJob).where(
+            AnalyticsExportJob.status == "running",
+            AnalyticsExportJob.updated_at < _lease_cutoff()
+        ).values(status="failed", error_message="Export stopped making progress", updated_at=func.now())
+    ).rowcount
+    db.commit()
+
+    # Partial files of workers that died; live ones are written at least once per lease
+    directory = Path(settings.ANALYTICS_EXPORT_DIR)
+    if directory.is_dir():
+        lease_cutoff = time.time() - settings.ANALYTICS_EXPORT_LEASE_SECONDS
+        for partial_path in directory.glob("*.part"):
+            try:
+                if partial_path.stat().st_mtime < lease_cutoff:
+                    partial_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    waiting = [job_id for (job_id,) in db.query(AnalyticsExportJob.id).filter(
+        AnalyticsExportJob.status == "pending",
+        AnalyticsExportJob.created_at < _lease_cutoff()
+    ).order_by(AnalyticsExportJob.created_at).all()]
+    return {"expired": len(expired), "failed": stalled, "waiting": waiting}
+
+
+class AnalyticsExportRunner:
+    """Runs exports in worker processes and periodically cleans them up"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        workers: int = settings.ANALYTICS_EXPORT_WORKERS,
+        cleanup_interval: float = settings.ANALYTICS_EXPORT_CLEANUP_INTERVAL_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.cleanup_interval = cleanup_interval
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Exports submitted by this process and not finished yet
+        self._queued: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._submitted = 0
+        self._crashed = 0
+        self._expired = 0
+        self._stalled = 0
+        self._last_cleanup_at: Optional[datetime] = None
+
+    def submit(self, job_id: str) -> None:
+        """Queue an export for the worker processes"""
+        with self._lock:
+            if job_id in self._queued:
+                return
+            if self._executor is None:
+                # Fresh interpreters rather than forks of a process running threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            executor = self._executor
+            future = executor.submit(run_analytics_export_job, job_id)
+            self._queued.add(job_id)
+            self._submitted += 1
+        future.add_done_callback(lambda done: self._finished(job_id, executor, done))
+
+    def _finished(self, job_id: str, executor: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            self._queued.discard(job_id)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            return
+        # The worker died, e.g. killed for running out of memory
+        logger.error("Analytics export worker failed running %s", job_id, exc_info=error)
+        with self._lock:
+            self._crashed += 1
+            if isinstance(error, BrokenProcessPool) and self._executor is executor:
+                # A broken pool takes no more work, the next submit starts a new one
+                self._executor = None
+        db = self.session_factory()
+        try:
+            _fail_export(db, job_id, f"Export worker failed: {error}")
+        except Exception:
+            logger.exception("Failed to mark analytics export %s failed", job_id)
+        finally:
+            db.close()
+
+    def cleanup(self) -> Dict[str, Any]:
+        """Expire old exports, fail stalled ones and pick up abandoned pending ones"""
+        db = self.session_factory()
+        try:
+            result = cleanup_analytics_exports(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for job_id in result["waiting"]:
+            self.submit(job_id)
+        self._expired += result["expired"]
+        self._stalled += result["failed"]
+        self._last_cleanup_at = datetime.utcnow()
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.cleanup)
+            except Exception:
+                logger.exception("Failed to clean up analytics exports")
+            await asyncio.sleep(self.cleanup_interval)
+
+    def start(self) -> None:
+        """Start the periodic cleanup task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the cleanup task and the worker processes
+
+        Running exports are left to finish; queued ones stay pending and are
+        picked up after a restart.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Export metrics for the system metrics endpoint"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": len(self._queued),
+                "submitted": self._submitted,
+                "worker_failures": self._crashed,
+                "expired": self._expired,
+                "stalled": self._stalled,
+                "last_cleanup_at": self._last_cleanup_at.isoformat() if self._last_cleanup_at else None,
+            }
+
+
+# Runner shared by the process
+analytics_export_runner = AnalyticsExportRunner()
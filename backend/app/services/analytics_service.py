@@ -2,147 +2,308 @@
 Analytics service functions
 """
 
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import case, func, literal, select, text, union_all, and_, or_
 
+from app.core.config import settings
+from app.core.pool_metrics import pool_metrics
+from app.core.request_metrics import request_metrics
+from app.models.database import SessionLocal
 from app.models.models import User
+from app.services.analytics_cache import analytics_summary_cache
+from app.services.analytics_export_service import analytics_export_runner
+from app.services.engagement_buffer import engagement_buffer
+from app.services.related_video_service import related_video_updater
+from app.services.trending_service import trending_updater
+from app.services.user_cube import (
+    CREATED_AT,
+    DIMENSIONS as USER_DIMENSIONS,
+    UserCubeSnapshot,
+    secondary_sport_condition,
+    user_cube
+)
+from app.services.video_cache import video_detail_cache
 from app.schemas.analytics import (
     UserAnalytics,
     SportAnalytics,
     EngagementMetrics,
     SystemMetrics,
+    AnalyticsSummary,
+    UserBreakdown,
+    UserBreakdownRow,
     TimeSeriesData,
     LocationData,
     SportData,
     ExperienceData
 )
 
+logger = logging.getLogger(__name__)
 
-def get_user_analytics(
+
+# Bucket sizes supported by time_bucket
+TIME_BUCKET_GRANULARITIES = ("hour", "day", "week", "month")
+
+
+def time_bucket(db: Session, column, granularity: str = "day"):
+    """Truncate a timestamp column to the start of its hour/day/week/month
+    
+    Uses date_trunc on PostgreSQL and strftime on SQLite; parse the resulting
+    values with parse_time_bucket.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(granularity, column)
+    
+    if granularity == "week":
+        # Weeks start on Monday, as with date_trunc
+        return func.strftime("%Y-%m-%d 00:00:00", column, "weekday 0", "-6 days")
+    formats = {
+        "hour": "%Y-%m-%d %H:00:00",
+        "day": "%Y-%m-%d 00:00:00",
+        "month": "%Y-%m-01 00:00:00",
+    }
+    return func.strftime(formats[granularity], column)
+
+
+def parse_time_bucket(value) -> datetime:
+    """Normalize a time_bucket value to a naive datetime"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+
+def truncate_datetime(value: datetime, granularity: str = "day") -> datetime:
+    """Python equivalent of time_bucket"""
+    value = value.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    if granularity == "hour":
+        return value
+    value = value.replace(hour=0)
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return value.replace(day=1)
+    return value
+
+
+def bucket_series(
+    counts: Dict[datetime, int],
+    start_date: datetime,
+    end_date: datetime,
+    granularity: str = "day"
+) -> List[Tuple[datetime, int]]:
+    """Every bucket between start_date and end_date with its count, gaps filled with 0"""
+    series = []
+    bucket = truncate_datetime(start_date, granularity)
+    end_date = end_date.replace(tzinfo=None)
+    while bucket <= end_date:
+        series.append((bucket, counts.get(bucket, 0)))
+        if granularity == "hour":
+            bucket += timedelta(hours=1)
+        elif granularity == "week":
+            bucket += timedelta(weeks=1)
+        elif granularity == "month":
+            bucket = (bucket + timedelta(days=32)).replace(day=1)
+        else:
+            bucket += timedelta(days=1)
+    return series
+
+
+# Breakdowns of UserAnalytics: name -> (cube dimension, users column)
+USER_BREAKDOWNS = {
+    "location": ("city", User.city),
+    "sport": ("sport", User.primary_sport),
+    "experience": ("experience", User.experience_level),
+}
+
+# Totals of UserAnalytics: total, active, new today/this week/this month, new in the previous month
+UserCounts = Tuple[int, int, int, int, int, int]
+
+
+def _user_counts_from_db(
     db: Session,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-    sports: Optional[List[str]] = None
-) -> UserAnalytics:
-    """Get user analytics data"""
-    
-    # Default date range - last 30 days
-    if not end_date:
-        end_date = datetime.utcnow()
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
-    
-    # Base query
-    base_query = db.query(User)
+    start_date: datetime,
+    end_date: datetime,
+    sports: Optional[List[str]],
+    granularity: str,
+    ranges: Tuple[datetime, datetime, datetime, datetime]
+) -> Tuple[UserCounts, Dict[datetime, int], Dict[str, List[Tuple[str, int]]]]:
+    """Totals, registrations per bucket and breakdowns with three aggregate queries"""
+    today, week_ago, month_ago, two_months_ago = ranges
+    filters = [User.created_at <= end_date]
     
     # Apply sport filter if provided
     if sports:
         sport_conditions = []
         for sport in sports:
             sport_conditions.append(User.primary_sport == sport)
-            sport_conditions.append(User.secondary_sports.contains(sport))
-        base_query = base_query.filter(or_(*sport_conditions))
+            sport_conditions.append(secondary_sport_condition(sport))
+        filters.append(or_(*sport_conditions))
+    
+    def count_where(condition):
+        return func.count(case((condition, 1)))
+    
+    # Totals and new users in one pass, with plain ranges on created_at
+    counts = db.query(
+        func.count(User.id),
+        count_where(User.profile_completed.is_(True)),
+        count_where(User.created_at >= today),
+        count_where(User.created_at >= week_ago),
+        count_where(User.created_at >= month_ago),
+        count_where(and_(User.created_at >= two_months_ago, User.created_at < month_ago))
+    ).filter(*filters).one()
+    
+    trend_bucket = time_bucket(db, User.created_at, granularity)
+    trend_rows = db.query(trend_bucket, func.count(User.id)).filter(
+        *filters,
+        User.created_at >= truncate_datetime(start_date, granularity)
+    ).group_by(trend_bucket).all()
+    trend_counts = {parse_time_bucket(value): count for value, count in trend_rows}
+    
+    # Users by location, sport and experience level in one statement
+    breakdown_rows = union_all(*(
+        select(literal(name).label("dimension"), column.label("value"), func.count(User.id).label("count"))
+        .where(*filters, column.isnot(None))
+        .group_by(column)
+        for name, (_, column) in USER_BREAKDOWNS.items()
+    ))
+    breakdowns: Dict[str, List[Tuple[str, int]]] = {name: [] for name in USER_BREAKDOWNS}
+    for dimension, value, count in db.execute(breakdown_rows):
+        breakdowns[dimension].append((value, count))
+    for values in breakdowns.values():
+        values.sort(key=lambda item: item[1], reverse=True)
+    
+    return tuple(counts), trend_counts, breakdowns
+
+
+def _user_counts_from_cube(
+    snapshot: UserCubeSnapshot,
+    start_date: datetime,
+    end_date: datetime,
+    sports: Optional[List[str]],
+    granularity: str,
+    ranges: Tuple[datetime, datetime, datetime, datetime]
+) -> Tuple[UserCounts, Dict[datetime, int], Dict[str, List[Tuple[str, int]]]]:
+    """Same as _user_counts_from_db, from the in-memory user dimension cube"""
+    today, week_ago, month_ago, two_months_ago = ranges
+    mask = snapshot.mask({"sport": sports} if sports else None, created_to=end_date)
+    
+    counts = (
+        snapshot.count(mask),
+        snapshot.count(mask & snapshot.mask({"profile_completed": [True]})),
+        snapshot.count(mask, created_from=today),
+        snapshot.count(mask, created_from=week_ago),
+        snapshot.count(mask, created_from=month_ago),
+        snapshot.count(mask, created_from=two_months_ago, created_before=month_ago)
+    )
     
-    # Total users
-    total_users = base_query.count()
+    trend_mask = mask & snapshot.mask(created_from=truncate_datetime(start_date, granularity))
+    trend_counts = {
+        bucket: count
+        for (bucket,), count in snapshot.group_counts([CREATED_AT], trend_mask, granularity)
+        if bucket is not None
+    }
     
-    # Active users (users with profile completed)
-    active_users = base_query.filter(User.profile_completed.is_(True)).count()
+    breakdowns = {
+        name: [(value, count) for (value,), count in snapshot.group_counts([dimension], mask) if value is not None]
+        for name, (dimension, _) in USER_BREAKDOWNS.items()
+    }
+    return counts, trend_counts, breakdowns
+
+
+def get_user_analytics(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    sports: Optional[List[str]] = None,
+    granularity: str = "day"
+) -> UserAnalytics:
+    """Get user analytics data
     
-    # New users today
-    today = datetime.utcnow().date()
-    new_users_today = base_query.filter(
-        func.date(User.created_at) == today
-    ).count()
+    Counts and breakdowns are taken as of end_date, the registration trend
+    covers start_date to end_date in buckets of the given granularity. Served
+    from the user dimension cube while it is fresh, with SQL otherwise. Raises
+    ValueError for an unknown granularity.
+    """
     
-    # New users this week
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    new_users_this_week = base_query.filter(
-        User.created_at >= week_ago
-    ).count()
+    if granularity not in TIME_BUCKET_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity '{granularity}', use hour, day, week or month")
     
-    # New users this month
-    month_ago = datetime.utcnow() - timedelta(days=30)
-    new_users_this_month = base_query.filter(
-        User.created_at >= month_ago
-    ).count()
+    # Default date range - last 30 days
+    if not end_date:
+        end_date = datetime.utcnow()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+    end_date = end_date.replace(tzinfo=None)
+    start_date = start_date.replace(tzinfo=None)
+    
+    # New users are counted relative to end_date
+    today = truncate_datetime(end_date, "day")
+    week_ago = end_date - timedelta(days=7)
+    month_ago = end_date - timedelta(days=30)
+    two_months_ago = end_date - timedelta(days=60)
+    ranges = (today, week_ago, month_ago, two_months_ago)
+    
+    snapshot = user_cube.snapshot
+    if snapshot is not None:
+        counts, trend_counts, breakdowns = _user_counts_from_cube(
+            snapshot, start_date, end_date, sports, granularity, ranges
+        )
+    else:
+        counts, trend_counts, breakdowns = _user_counts_from_db(
+            db, start_date, end_date, sports, granularity, ranges
+        )
+    (
+        total_users,
+        active_users,
+        new_users_today,
+        new_users_this_week,
+        new_users_this_month,
+        previous_month_users
+    ) = counts
     
     # User growth rate (compared to previous month)
-    two_months_ago = datetime.utcnow() - timedelta(days=60)
-    previous_month_users = base_query.filter(
-        and_(User.created_at >= two_months_ago, User.created_at < month_ago)
-    ).count()
-    
     user_growth_rate = 0.0
     if previous_month_users > 0:
         user_growth_rate = ((new_users_this_month - previous_month_users) / previous_month_users) * 100
     
-    # Registration trend (daily for last 30 days)
-    registration_trend = []
-    for i in range(30):
-        date = (end_date - timedelta(days=i)).date()
-        count = base_query.filter(func.date(User.created_at) == date).count()
-        registration_trend.append(TimeSeriesData(
-            date=date.isoformat(),
+    # Registration trend over the date range, missing buckets filled with 0
+    registration_trend = [
+        TimeSeriesData(
+            date=bucket.isoformat() if granularity == "hour" else bucket.date().isoformat(),
             value=count
-        ))
-    registration_trend.reverse()
+        )
+        for bucket, count in bucket_series(trend_counts, start_date, end_date, granularity)
+    ]
     
-    # Users by location (top 10 cities)
-    location_data = db.query(
-        User.city,
-        func.count(User.id).label('count')
-    ).filter(
-        User.city.isnot(None)
-    ).group_by(User.city).order_by(func.count(User.id).desc()).limit(10).all()
+    def percentage(count: int) -> float:
+        return round((count / total_users) * 100, 2) if total_users > 0 else 0
     
-    users_by_location = []
-    for city, count in location_data:
-        percentage = (count / total_users) * 100 if total_users > 0 else 0
-        users_by_location.append(LocationData(
-            location=city,
-            count=count,
-            percentage=round(percentage, 2)
-        ))
+    # Top 10 cities
+    users_by_location = [
+        LocationData(location=city, count=count, percentage=percentage(count))
+        for city, count in breakdowns["location"][:10]
+    ]
     
     # Users by sport (primary sport)
-    sport_data = db.query(
-        User.primary_sport,
-        func.count(User.id).label('count')
-    ).filter(
-        User.primary_sport.isnot(None)
-    ).group_by(User.primary_sport).order_by(func.count(User.id).desc()).all()
-    
-    users_by_sport = []
-    for sport, count in sport_data:
-        percentage = (count / total_users) * 100 if total_users > 0 else 0
-        # Mock growth calculation
-        growth = round((count / total_users) * 10, 2)  # Simplified growth metric
-        users_by_sport.append(SportData(
+    users_by_sport = [
+        SportData(
             sport=sport,
             count=count,
-            percentage=round(percentage, 2),
-            growth=growth
-        ))
+            percentage=percentage(count),
+            # Mock growth calculation
+            growth=round((count / total_users) * 10, 2)  # Simplified growth metric
+        )
+        for sport, count in breakdowns["sport"]
+    ]
     
     # Users by experience level
-    experience_data = db.query(
-        User.experience_level,
-        func.count(User.id).label('count')
-    ).filter(
-        User.experience_level.isnot(None)
-    ).group_by(User.experience_level).order_by(func.count(User.id).desc()).all()
-    
-    users_by_experience = []
-    for level, count in experience_data:
-        percentage = (count / total_users) * 100 if total_users > 0 else 0
-        users_by_experience.append(ExperienceData(
-            level=level,
-            count=count,
-            percentage=round(percentage, 2)
-        ))
+    users_by_experience = [
+        ExperienceData(level=level, count=count, percentage=percentage(count))
+        for level, count in breakdowns["experience"]
+    ]
     
     return UserAnalytics(
         total_users=total_users,
@@ -158,6 +319,87 @@ def get_user_analytics(
     )
 
 
+def get_user_breakdown(
+    db: Session,
+    group_by: List[str],
+    filters: Optional[Dict[str, List]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    granularity: str = "day",
+    limit: int = 100
+) -> UserBreakdown:
+    """Users per combination of the group_by dimensions, among those matching the filters
+    
+    Dimensions are sport, city, state, experience, gender, profile_completed
+    and is_active, plus created_at for grouping by registration hour, day,
+    week or month. A sport filter matches primary and secondary sports.
+    Served from the user dimension cube while it is fresh, with SQL otherwise.
+    Raises ValueError for unknown dimensions or granularity.
+    """
+    
+    if granularity not in TIME_BUCKET_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity '{granularity}', use hour, day, week or month")
+    filters = {dimension: values for dimension, values in (filters or {}).items() if values}
+    for dimension in filters:
+        if dimension not in USER_DIMENSIONS:
+            raise ValueError(f"Cannot filter by '{dimension}'")
+    for dimension in group_by:
+        if dimension not in USER_DIMENSIONS and dimension != CREATED_AT:
+            raise ValueError(f"Cannot group by '{dimension}'")
+    
+    snapshot = user_cube.snapshot
+    if snapshot is not None:
+        mask = snapshot.mask(filters, created_from=start_date, created_to=end_date)
+        total_users = snapshot.count(mask)
+        groups = snapshot.group_counts(group_by, mask, granularity)
+        source, as_of = "cube", snapshot.refreshed_at
+    else:
+        clauses = []
+        for dimension, values in filters.items():
+            condition = USER_DIMENSIONS[dimension].in_(values)
+            if dimension == "sport":
+                condition = or_(condition, *[secondary_sport_condition(sport) for sport in values])
+            clauses.append(condition)
+        if start_date:
+            clauses.append(User.created_at >= start_date.replace(tzinfo=None))
+        if end_date:
+            clauses.append(User.created_at <= end_date.replace(tzinfo=None))
+        
+        columns = [
+            time_bucket(db, User.created_at, granularity) if dimension == CREATED_AT else USER_DIMENSIONS[dimension]
+            for dimension in group_by
+        ]
+        user_count = func.count(User.id)
+        rows = db.query(*columns, user_count).filter(*clauses).group_by(*columns).order_by(user_count.desc()).all()
+        groups = [
+            (
+                tuple(
+                    parse_time_bucket(value) if dimension == CREATED_AT and value is not None else value
+                    for dimension, value in zip(group_by, row[:-1])
+                ),
+                row[-1]
+            )
+            for row in rows
+        ]
+        total_users = sum(count for _, count in groups)
+        source, as_of = "database", datetime.utcnow()
+    
+    return UserBreakdown(
+        group_by=group_by,
+        total_users=total_users,
+        rows=[
+            UserBreakdownRow(
+                values=dict(zip(group_by, values)),
+                count=count,
+                percentage=round(count / total_users * 100, 2) if total_users else 0.0
+            )
+            for values, count in groups[:limit]
+        ],
+        source=source,
+        as_of=as_of
+    )
+
+
 def get_sport_analytics(
     db: Session,
     start_date: Optional[datetime] = None,
@@ -271,60 +513,161 @@ def get_engagement_metrics(
 
 
 def get_system_metrics() -> SystemMetrics:
-    """Get system metrics (mock data for now)"""
+    """Get system metrics from the request telemetry of this process
+    
+    Latencies, error rates and trends cover the last 24 hours; an error is a
+    5xx response. Database metrics are those of the connection pool.
+    """
+    
+    requests = request_metrics.snapshot()
+    last_day = requests["last_24h"]
+    uptime = round(100 - last_day["error_rate"], 2)
     
-    # Mock system metrics
     api_metrics = {
-        "total_requests": 125000,
-        "average_response_time": 245,  # ms
-        "error_rate": 0.8,  # %
-        "uptime": 99.9  # %
+        "total_requests": requests["total_requests"],
+        "requests_last_24h": last_day["requests"],
+        "in_flight_requests": requests["in_flight_requests"],
+        "average_response_time": last_day["average_response_time"],  # ms
+        "p50_response_time": last_day["p50"],  # ms
+        "p95_response_time": last_day["p95"],  # ms
+        "p99_response_time": last_day["p99"],  # ms
+        "error_rate": last_day["error_rate"],  # %
+        "status_codes": last_day["status_codes"],
+        "uptime": uptime,  # % of requests served without a server error
+        "uptime_seconds": requests["uptime_seconds"],
+        "routes": requests["routes"],
+        "engagement_buffer": engagement_buffer.stats(),
+        "video_detail_cache": video_detail_cache.stats(),
+        "analytics_summary_cache": analytics_summary_cache.stats(),
+        "trending": trending_updater.stats(),
+        "related_videos": related_video_updater.stats(),
+        "analytics_exports": analytics_export_runner.stats(),
+        "user_cube": user_cube.stats()
     }
     
+    pool = pool_metrics.snapshot()
     database_metrics = {
-        "connection_count": 15,
-        "query_performance": 89.5,  # score
-        "storage_used": 2.3,  # GB
-        "storage_total": 10.0  # GB
+        "connection_count": pool.get("checked_out", 0) + pool.get("checked_in", 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **pool
     }
     
-    performance_alerts = [
-        {
-            "id": "alert_1",
-            "type": "warning",
-            "message": "High memory usage detected",
+    performance_alerts = []
+    if "pool_size" in pool and pool["checked_out"] >= pool["pool_size"] + settings.DB_MAX_OVERFLOW:
+        performance_alerts.append({
+            "id": "connection_pool",
+            "type": "error",
+            "message": f"All {pool['checked_out']} database connections are in use, requests wait for a free one",
             "timestamp": datetime.utcnow().isoformat(),
             "resolved": False
-        }
+        })
+    
+    # Alerts on the current hour
+    current_hour = requests["hourly"][-1]
+    if current_hour["requests"]:
+        error_rate = current_hour["errors"] / current_hour["requests"] * 100
+        if error_rate >= settings.ALERT_ERROR_RATE_PERCENT:
+            performance_alerts.append({
+                "id": "error_rate",
+                "type": "error",
+                "message": f"{error_rate:.1f}% of requests failed with a server error this hour",
+                "timestamp": datetime.utcnow().isoformat(),
+                "resolved": False
+            })
+        if current_hour["p95"] >= settings.ALERT_P95_RESPONSE_MS:
+            performance_alerts.append({
+                "id": "response_time",
+                "type": "warning",
+                "message": f"p95 response time is {current_hour['p95']:.0f} ms this hour",
+                "timestamp": datetime.utcnow().isoformat(),
+                "resolved": False
+            })
+    
+    # Hourly p95 response time (ms) and server errors over the last 24 hours
+    response_times = [
+        TimeSeriesData(date=hour["hour"].isoformat(), value=round(hour["p95"] or 0), label="p95_ms")
+        for hour in requests["hourly"]
+    ]
+    error_rates = [
+        TimeSeriesData(date=hour["hour"].isoformat(), value=hour["errors"], label="5xx_responses")
+        for hour in requests["hourly"]
     ]
-    
-    # Mock response time trend
-    response_times = []
-    for i in range(24):  # Last 24 hours
-        hour = datetime.utcnow() - timedelta(hours=i)
-        value = 200 + (i % 50)  # Mock response time
-        response_times.append(TimeSeriesData(
-            date=hour.isoformat(),
-            value=value
-        ))
-    response_times.reverse()
-    
-    # Mock error rate trend
-    error_rates = []
-    for i in range(24):  # Last 24 hours
-        hour = datetime.utcnow() - timedelta(hours=i)
-        value = max(0, 1 + (i % 3) - 1)  # Mock error rate
-        error_rates.append(TimeSeriesData(
-            date=hour.isoformat(),
-            value=value
-        ))
-    error_rates.reverse()
     
     return SystemMetrics(
         api_metrics=api_metrics,
         database_metrics=database_metrics,
         performance_alerts=performance_alerts,
-        uptime=99.9,
+        uptime=uptime,
         response_times=response_times,
         error_rates=error_rates
-    )
\ No newline at end of file
+    )
+
+
+# Analytics summary sections, each computed on a session of its own
+SUMMARY_SECTIONS = {
+    "user_analytics": lambda db, start_date, end_date, sports: get_user_analytics(db, start_date, end_date, sports),
+    "sport_analytics": lambda db, start_date, end_date, sports: get_sport_analytics(db, start_date, end_date),
+    "engagement_metrics": lambda db, start_date, end_date, sports: get_engagement_metrics(db, start_date, end_date),
+}
+
+_section_executor = ThreadPoolExecutor(
+    max_workers=settings.ANALYTICS_SECTION_WORKERS,
+    thread_name_prefix="analytics-section"
+)
+
+
+def _run_summary_section(section, session_factory, start_date, end_date, sports, timeout: float):
+    db = session_factory()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            # Stop the section's queries once the summary has given up on them
+            db.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+        return section(db, start_date, end_date, sports)
+    finally:
+        db.close()
+
+
+def compute_analytics_summary(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    sports: Optional[List[str]] = None,
+    session_factory=SessionLocal
+) -> AnalyticsSummary:
+    """Compute the analytics summary sections concurrently
+    
+    Each section runs on its own session in a bounded thread pool. A section
+    that fails or does not finish within ANALYTICS_SECTION_TIMEOUT_SECONDS is
+    left out and reported in section_errors; only when all of them fail is an
+    error raised.
+    """
+    
+    timeout = settings.ANALYTICS_SECTION_TIMEOUT_SECONDS
+    futures = {
+        name: _section_executor.submit(
+            _run_summary_section, section, session_factory, start_date, end_date, sports, timeout
+        )
+        for name, section in SUMMARY_SECTIONS.items()
+    }
+    done, _ = wait(futures.values(), timeout=timeout)
+    
+    sections = {}
+    section_errors = {}
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            section_errors[name] = f"Timed out after {timeout:g} seconds"
+        elif future.exception() is not None:
+            logger.error("Failed to compute analytics section %s", name, exc_info=future.exception())
+            section_errors[name] = str(future.exception())
+        else:
+            sections[name] = future.result()
+    
+    if not sections:
+        raise RuntimeError("; ".join(f"{name}: {error}" for name, error in section_errors.items()))
+    
+    return AnalyticsSummary(
+        **sections,
+        system_metrics=get_system_metrics(),
+        generated_at=datetime.utcnow(),
+        section_errors=section_errors
+    )
@@ -0,0 +1,272 @@
+"""
+Write-behind buffer for video engagement events
+
+Engagement events are only queued in memory. A background task periodically
+flushes the queue in batches: repeat events of a user within the action's
+dedup window are dropped, the rest are appended to video_engagement_events and
+folded into the video_content counters with atomic
+``UPDATE ... SET view_count = view_count + :n`` statements, all in one
+transaction per batch. Concurrent events therefore never lose updates, popular
+videos are not serialized on their row lock, and the counters always equal the
+logged events. The daily video rollup is updated in the same transaction, and
+flushed videos are dropped from the video detail cache.
+
+At most ENGAGEMENT_MAX_PENDING_EVENTS events are held: reaching half of it
+starts a flush early, and once it is full (e.g. while the database is down)
+new events are rejected with EngagementBufferFull and counted in the buffer
+stats.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, func, insert, update
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import VideoContent, VideoEngagementEvent
+from app.services.engagement_event_service import (
+    deduplicate_events,
+    ensure_event_partitions,
+    maintain_event_partitions
+)
+from app.services.video_cache import video_detail_cache
+from app.services.video_stats_service import apply_video_stats_delta, video_stats_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Engagement action -> counter column on video_content
+ENGAGEMENT_COLUMNS = {
+    "view": "view_count",
+    "like": "like_count",
+    "dislike": "dislike_count",
+    "share": "share_count",
+}
+
+
+class EngagementBufferFull(Exception):
+    """The buffer holds ENGAGEMENT_MAX_PENDING_EVENTS events and rejected an event"""
+
+
+class EngagementEventBuffer:
+    """Queues engagement events and flushes them to the event log and counters in batches"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        flush_interval: float = settings.ENGAGEMENT_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = settings.ENGAGEMENT_FLUSH_BATCH_SIZE,
+        max_pending: int = settings.ENGAGEMENT_MAX_PENDING_EVENTS
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events: List[dict] = []
+        self._flushed = 0
+        self._deduplicated = 0
+        self._dropped = 0
+        self._early_flushes = 0
+        self._last_flush_at: Optional[datetime] = None
+        self._partition_month: Optional[str] = None
+        # (year, month) of the event partitions known to exist
+        self._partitions_ready: Set[Tuple[int, int]] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def record(self, video_id: int, action: str, user_id: Optional[int] = None) -> bool:
+        """Queue an engagement event; returns False for unknown actions
+
+        Raises EngagementBufferFull when the buffer is full; the event is dropped.
+        """
+        if action not in ENGAGEMENT_COLUMNS:
+            return False
+        with self._lock:
+            pending = len(self._events)
+            if pending >= self.max_pending:
+                self._dropped += 1
+                raise EngagementBufferFull(
+                    f"Engagement buffer is full ({self.max_pending} pending events)"
+                )
+            self._events.append({
+                "video_id": video_id,
+                "user_id": user_id,
+                "action": action,
+                "created_at": datetime.utcnow()
+            })
+        if pending + 1 == self.max_pending // 2:
+            self._wake()
+        return True
+
+    def _wake(self) -> None:
+        """Start the next flush now instead of after the flush interval"""
+        if self._loop is not None and self._wakeup is not None:
+            self._early_flushes += 1
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    @property
+    def pending_events(self) -> int:
+        """Number of events accepted but not yet written to the database"""
+        return len(self._events)
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer metrics for the system metrics endpoint"""
+        with self._lock:
+            pending = len(self._events)
+            pending_videos = len({event["video_id"] for event in self._events})
+        return {
+            "pending_events": pending,
+            "pending_videos": pending_videos,
+            "max_pending_events": self.max_pending,
+            "flushed_events": self._flushed,
+            "deduplicated_events": self._deduplicated,
+            "dropped_events": self._dropped,
+            "early_flushes": self._early_flushes,
+            "dedup_windows_seconds": settings.ENGAGEMENT_DEDUP_WINDOWS,
+            "flush_interval_seconds": self.flush_interval,
+            "last_flush_at": self._last_flush_at.isoformat() if self._last_flush_at else None,
+        }
+
+    def _flush_batch(self, db, events: List[dict]) -> int:
+        """Log and count one batch of events in a single transaction"""
+        months = {(event["created_at"].year, event["created_at"].month): event["created_at"] for event in events}
+        missing = [created_at for month, created_at in months.items() if month not in self._partitions_ready]
+        if missing:
+            ensure_event_partitions(db, missing)
+        accepted = deduplicate_events(db, events)
+        self._deduplicated += len(events) - len(accepted)
+        if not accepted:
+            db.commit()
+            self._partitions_ready.update(months)
+            return 0
+
+        db.execute(insert(VideoEngagementEvent), accepted)
+
+        counters: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for event in accepted:
+            counters[event["video_id"]][ENGAGEMENT_COLUMNS[event["action"]]] += 1
+        rows = [
+            {
+                "b_video_id": video_id,
+                **{f"b_{column}": deltas.get(column, 0) for column in ENGAGEMENT_COLUMNS.values()}
+            }
+            for video_id, deltas in sorted(counters.items())
+        ]
+        table = VideoContent.__table__
+        statement = update(table).where(table.c.id == bindparam("b_video_id")).values(
+            **{
+                column: func.coalesce(table.c[column], 0) + bindparam(f"b_{column}")
+                for column in ENGAGEMENT_COLUMNS.values()
+            },
+            updated_at=func.now()
+        )
+
+        video_ids = list(counters)
+        stats_before = video_stats_snapshot(db, video_ids, lock=True)
+        db.execute(statement, rows)
+        apply_video_stats_delta(db, stats_before, video_stats_snapshot(db, video_ids))
+        db.commit()
+        self._partitions_ready.update(months)
+
+        video_detail_cache.invalidate(video_ids)
+        return len(accepted)
+
+    def flush(self) -> int:
+        """Write all queued events to the database; returns the number counted"""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+
+            counted = 0
+            db = self.session_factory()
+            try:
+                for start in range(0, len(events), self.batch_size):
+                    try:
+                        counted += self._flush_batch(db, events[start:start + self.batch_size])
+                    except Exception:
+                        db.rollback()
+                        self._restore(events[start:])
+                        raise
+            finally:
+                db.close()
+                self._flushed += counted
+                self._last_flush_at = datetime.utcnow()
+            return counted
+
+    def _restore(self, events: List[dict]) -> None:
+        """Put back events from a failed flush so they are retried, newest dropped beyond max_pending"""
+        with self._lock:
+            self._events[:0] = events
+            excess = len(self._events) - self.max_pending
+            if excess > 0:
+                del self._events[-excess:]
+                self._dropped += excess
+
+    def _maintain_partitions(self) -> None:
+        """Roll the monthly event partitions forward, once per month"""
+        month = datetime.utcnow().strftime("%Y-%m")
+        if month == self._partition_month:
+            return
+        db = self.session_factory()
+        try:
+            dropped = maintain_event_partitions(db)
+            if dropped:
+                logger.info("Dropped expired engagement event partitions: %s", ", ".join(dropped))
+            self._partition_month = month
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        dropped_reported = self._dropped
+        while True:
+            try:
+                await asyncio.to_thread(self._maintain_partitions)
+            except Exception:
+                logger.exception("Failed to maintain engagement event partitions")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Failed to flush engagement events")
+            if self._dropped > dropped_reported:
+                logger.warning(
+                    "Engagement buffer full (%d events), %d events dropped so far",
+                    self.max_pending, self._dropped
+                )
+                dropped_reported = self._dropped
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and drain whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+            self._wakeup = None
+        await asyncio.to_thread(self.flush)
+
+
+# Buffer shared by the process
+engagement_buffer = EngagementEventBuffer()
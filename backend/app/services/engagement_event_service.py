@@ -0,0 +1,174 @@
+"""
+Video engagement event log
+
+Engagement events are appended to video_engagement_events by the engagement
+buffer. On PostgreSQL the table is partitioned by month: partitions are created
+ahead of time and dropped whole once older than
+ENGAGEMENT_EVENT_RETENTION_MONTHS, so retention never runs a DELETE.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import VideoEngagementEvent
+
+# Partitions created beyond the current month
+PARTITIONS_AHEAD = 2
+
+_PARTITION_PREFIX = "video_engagement_events_"
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def uses_partitions(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def ensure_event_partitions(db: Session, months: Iterable[datetime]) -> None:
+    """Create the monthly partitions holding the given timestamps (PostgreSQL only)"""
+    if not uses_partitions(db):
+        return
+    for month in sorted({_month_start(value) for value in months}):
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_PARTITION_PREFIX}{month:%Y_%m} "
+            f"PARTITION OF video_engagement_events "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        ))
+
+
+def maintain_event_partitions(db: Session, now: Optional[datetime] = None) -> List[str]:
+    """Create upcoming partitions and drop expired ones; returns the dropped names"""
+    if not uses_partitions(db):
+        return []
+
+    current = _month_start(now or datetime.utcnow())
+    ensure_event_partitions(db, [_add_months(current, offset) for offset in range(PARTITIONS_AHEAD + 1)])
+
+    dropped = []
+    if settings.ENGAGEMENT_EVENT_RETENTION_MONTHS > 0:
+        oldest_kept = f"{_PARTITION_PREFIX}{_add_months(current, -settings.ENGAGEMENT_EVENT_RETENTION_MONTHS):%Y_%m}"
+        partitions = db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'video_engagement_events'"
+        )).scalars().all()
+        for name in sorted(partitions):
+            # Names sort chronologically: video_engagement_events_YYYY_MM
+            if name.startswith(_PARTITION_PREFIX) and name < oldest_kept:
+                db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                dropped.append(name)
+    db.commit()
+    return dropped
+
+
+def latest_user_events(
+    db: Session,
+    keys: Iterable[Tuple[int, int, str]],
+    since: datetime
+) -> Dict[Tuple[int, int, str], datetime]:
+    """Latest event time per (video_id, user_id, action) since a point in time"""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(
+            VideoEngagementEvent.video_id,
+            VideoEngagementEvent.user_id,
+            VideoEngagementEvent.action,
+            func.max(VideoEngagementEvent.created_at)
+        ).where(
+            VideoEngagementEvent.created_at >= since,
+            tuple_(
+                VideoEngagementEvent.video_id,
+                VideoEngagementEvent.user_id,
+                VideoEngagementEvent.action
+            ).in_(keys)
+        ).group_by(
+            VideoEngagementEvent.video_id,
+            VideoEngagementEvent.user_id,
+            VideoEngagementEvent.action
+        )
+    ).all()
+    return {
+        (video_id, user_id, action): latest.replace(tzinfo=None)
+        for video_id, user_id, action, latest in rows
+    }
+
+
+def deduplicate_events(db: Session, events: List[dict]) -> List[dict]:
+    """Drop events repeated by the same user on the same video within the action's
+    ENGAGEMENT_DEDUP_WINDOWS window, checking both the batch and the stored log"""
+    windows = settings.ENGAGEMENT_DEDUP_WINDOWS
+    deduplicated = [
+        event for event in events
+        if event["user_id"] is not None and windows.get(event["action"], 0) > 0
+    ]
+    if not deduplicated:
+        return events
+
+    earliest = min(event["created_at"] for event in deduplicated)
+    last_seen = latest_user_events(
+        db,
+        [(event["video_id"], event["user_id"], event["action"]) for event in deduplicated],
+        earliest - timedelta(seconds=max(windows.values()))
+    )
+
+    accepted = []
+    for event in sorted(events, key=lambda event: event["created_at"]):
+        window = windows.get(event["action"], 0)
+        if event["user_id"] is None or window <= 0:
+            accepted.append(event)
+            continue
+        key = (event["video_id"], event["user_id"], event["action"])
+        previous = last_seen.get(key)
+        if previous is None or event["created_at"] - previous >= timedelta(seconds=window):
+            accepted.append(event)
+            last_seen[key] = event["created_at"]
+    return accepted
+
+
+def get_video_engagement_stats(
+    db: Session,
+    video_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, object]:
+    """Counted events per action and unique viewers of a video over a date range"""
+    if not end_date:
+        end_date = datetime.utcnow()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+
+    in_range = (
+        VideoEngagementEvent.video_id == video_id,
+        VideoEngagementEvent.created_at >= start_date,
+        VideoEngagementEvent.created_at <= end_date
+    )
+    events = dict(db.execute(
+        select(VideoEngagementEvent.action, func.count())
+        .where(*in_range)
+        .group_by(VideoEngagementEvent.action)
+    ).all())
+    unique_viewers = db.execute(
+        select(func.count(func.distinct(VideoEngagementEvent.user_id)))
+        .where(*in_range, VideoEngagementEvent.action == "view")
+    ).scalar()
+
+    return {
+        "video_id": video_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "events": events,
+        "unique_viewers": unique_viewers or 0
+    }
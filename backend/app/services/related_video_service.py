@@ -0,0 +1,439 @@
+"""
+Related videos ("more like this")
+
+Each video is described by a sparse TF-IDF weighted vector over its sport,
+category, difficulty level, tags and title tokens. rebuild_related_videos
+computes the cosine similarity of every video against all others with blocked
+sparse matrix products and stores the top RELATED_VIDEOS_TOP_K neighbors of
+each video in video_related, so serving them is a primary key lookup. Between
+rebuilds, video writes only queue their id with related_video_updater; a
+background task updates the lists affected by the queued videos from an
+in-process copy of the index every RELATED_VIDEOS_REFRESH_INTERVAL_SECONDS,
+reloading that copy there when it is older than RELATED_VIDEOS_RELOAD_SECONDS.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import VideoContent, VideoRelated
+from app.services.video_search_service import tokenize, _parse_tags
+
+logger = logging.getLogger(__name__)
+
+# Weight of each feature kind before IDF weighting
+FEATURE_WEIGHTS = {"sport": 3.0, "category": 2.0, "level": 1.0, "tag": 2.0, "title": 1.0}
+
+# Columns of video_content the features are built from
+FEATURE_COLUMNS = (
+    VideoContent.id,
+    VideoContent.title,
+    VideoContent.sport,
+    VideoContent.category,
+    VideoContent.difficulty_level,
+    VideoContent.tags,
+)
+
+# Fields whose change requires a refresh of the video's neighbors
+FEATURE_FIELDS = {"title", "sport", "category", "difficulty_level", "tags"}
+
+WRITE_BATCH_SIZE = 1000
+
+
+def _video_terms(video) -> Dict[str, float]:
+    """Weighted features of a video"""
+    terms = {
+        f"sport:{video.sport.lower()}": FEATURE_WEIGHTS["sport"],
+        f"category:{video.category.lower()}": FEATURE_WEIGHTS["category"],
+    }
+    if video.difficulty_level:
+        terms[f"level:{video.difficulty_level.lower()}"] = FEATURE_WEIGHTS["level"]
+    for tag in _parse_tags(video.tags):
+        terms[f"tag:{tag.strip().lower()}"] = FEATURE_WEIGHTS["tag"]
+    for token in tokenize(video.title):
+        terms[f"title:{token}"] = FEATURE_WEIGHTS["title"]
+    return terms
+
+
+class RelatedVideoIndex:
+    """Row-normalized feature matrix of all videos plus their top-K neighbors"""
+
+    # Similarity cells computed per block (rows x videos), bounding memory use
+    BLOCK_CELLS = 1 << 22
+
+    def __init__(self, top_k: int = settings.RELATED_VIDEOS_TOP_K):
+        self.top_k = top_k
+        self.lock = threading.RLock()
+        self._vocabulary: Dict[str, int] = {}
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        # Neighbor video ids (-1 when fewer than top_k) and scores, best first
+        self._neighbor_ids = np.full((0, top_k), -1, dtype=np.int64)
+        self._neighbor_scores = np.zeros((0, top_k), dtype=np.float32)
+        # Whether the neighbor lists were computed; until then only the lists
+        # of refreshed videos themselves are maintained
+        self.built = False
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def video_ids(self) -> List[int]:
+        return self._ids.tolist()
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at > settings.RELATED_VIDEOS_RELOAD_SECONDS
+        )
+
+    def fit(self, videos: Iterable) -> None:
+        """Build the feature matrix; neighbor lists are reset"""
+        with self.lock:
+            documents = [(video.id, _video_terms(video)) for video in videos]
+            document_frequency: Dict[str, int] = defaultdict(int)
+            for _, terms in documents:
+                for term in terms:
+                    document_frequency[term] += 1
+
+            count = len(documents)
+            vocabulary = sorted(document_frequency)
+            self._vocabulary = {term: column for column, term in enumerate(vocabulary)}
+            self._idf = np.array(
+                [math.log((1 + count) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+                dtype=np.float32
+            )
+            self._ids = np.array([video_id for video_id, _ in documents], dtype=np.int64)
+            self._rows = {video_id: row for row, (video_id, _) in enumerate(documents)}
+            self._matrix = self._vectorize([terms for _, terms in documents])
+            self._neighbor_ids = np.full((count, self.top_k), -1, dtype=np.int64)
+            self._neighbor_scores = np.zeros((count, self.top_k), dtype=np.float32)
+            self.built = False
+            self.loaded_at = time.monotonic()
+
+    def _vectorize(self, documents: List[Dict[str, float]]) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows; terms unseen at fit time join the vocabulary"""
+        indptr, indices, data = [0], [], []
+        for terms in documents:
+            for term, weight in terms.items():
+                column = self._vocabulary.get(term)
+                if column is None:
+                    column = len(self._vocabulary)
+                    self._vocabulary[term] = column
+                    self._idf = np.append(
+                        self._idf, np.float32(math.log((1 + len(self._ids)) / 2) + 1)
+                    )
+                indices.append(column)
+                data.append(weight * self._idf[column])
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int64), indptr),
+            shape=(len(documents), len(self._vocabulary))
+        )
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms).astype(np.float32) @ matrix)
+
+    def _blocks(self, rows: np.ndarray):
+        size = max(1, self.BLOCK_CELLS // max(1, len(self._ids)))
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+    def _top_k(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cosine top-K neighbors of the given matrix rows"""
+        ids = np.full((len(rows), self.top_k), -1, dtype=np.int64)
+        scores = np.zeros((len(rows), self.top_k), dtype=np.float32)
+        k = min(self.top_k, len(self._ids) - 1)
+        if k <= 0:
+            return ids, scores
+
+        # Sparse x dense product: every video against the block, as block x videos
+        similarity = np.ascontiguousarray((self._matrix @ self._matrix[rows].T.toarray()).T)
+        similarity[np.arange(len(rows)), rows] = 0  # A video is not its own neighbor
+        best = np.argpartition(similarity, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(similarity, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+        found = best_scores > 0
+        ids[:, :k] = np.where(found, self._ids[best], -1)
+        scores[:, :k] = np.where(found, best_scores, 0)
+        return ids, scores
+
+    def _recompute(self, rows: np.ndarray) -> None:
+        for block in self._blocks(rows):
+            self._neighbor_ids[block], self._neighbor_scores[block] = self._top_k(block)
+
+    def compute_all(self) -> None:
+        """Compute the neighbor lists of every video"""
+        with self.lock:
+            self._recompute(np.arange(len(self._ids)))
+            self.built = True
+
+    def load_neighbors(self, stored: Iterable[Tuple[int, str]]) -> None:
+        """Take over neighbor lists previously saved to video_related"""
+        with self.lock:
+            for video_id, neighbors in stored:
+                row = self._rows.get(video_id)
+                if row is None:
+                    continue
+                pairs = json.loads(neighbors)[:self.top_k]
+                self._neighbor_ids[row] = -1
+                self._neighbor_scores[row] = 0
+                for position, (neighbor_id, score) in enumerate(pairs):
+                    self._neighbor_ids[row, position] = neighbor_id
+                    self._neighbor_scores[row, position] = score
+                self.built = True
+
+    def neighbors_of(self, video_id: int) -> List[List]:
+        """Stored form of a video's neighbor list: [[video_id, score], ...]"""
+        row = self._rows[video_id]
+        return [
+            [int(neighbor_id), round(float(score), 4)]
+            for neighbor_id, score in zip(self._neighbor_ids[row], self._neighbor_scores[row])
+            if neighbor_id >= 0
+        ]
+
+    def upsert_many(self, videos: List) -> List[int]:
+        """Add or replace videos and update the affected neighbor lists
+
+        The matrix is rebuilt once per call, not once per video. Returns the ids
+        of the videos whose neighbor lists were recomputed.
+        """
+        with self.lock:
+            if not videos:
+                return []
+            vectors = self._vectorize([_video_terms(video) for video in videos])
+            count = len(self._ids)
+            if self._matrix.shape[1] < vectors.shape[1]:
+                self._matrix.resize((count, vectors.shape[1]))
+
+            # Row of each video in the new matrix, and the row of the stacked
+            # (old matrix + vectors) matrix it is taken from
+            new_ids = [video.id for video in videos if video.id not in self._rows]
+            source = np.arange(count + len(new_ids))
+            for position, video in enumerate(videos):
+                row = self._rows.get(video.id)
+                if row is None:
+                    row = len(self._rows)
+                    self._rows[video.id] = row
+                source[row] = count + position
+            rows = np.array([self._rows[video.id] for video in videos])
+
+            if new_ids:
+                self._ids = np.append(self._ids, np.array(new_ids, dtype=np.int64))
+                self._neighbor_ids = np.vstack([
+                    self._neighbor_ids, np.full((len(new_ids), self.top_k), -1, dtype=np.int64)
+                ])
+                self._neighbor_scores = np.vstack([
+                    self._neighbor_scores, np.zeros((len(new_ids), self.top_k), dtype=np.float32)
+                ])
+            self._matrix = sparse.vstack([self._matrix, vectors], format="csr")[source]
+
+            affected = np.unique(rows)
+            if self.built:
+                # Lists the videos now enter, and lists they were already part
+                # of (their score there changed, they may have to leave them)
+                entering = np.zeros(len(self._ids), dtype=bool)
+                for block in self._blocks(np.arange(len(videos))):
+                    similarity = (self._matrix @ vectors[block].T).toarray()
+                    similarity[rows[block], np.arange(len(block))] = 0
+                    entering |= (similarity > self._neighbor_scores[:, -1:]).any(axis=1)
+                member = np.isin(self._neighbor_ids, [video.id for video in videos]).any(axis=1)
+                affected = np.union1d(affected, np.flatnonzero(entering | member))
+
+            self._recompute(affected)
+            return [int(self._ids[affected_row]) for affected_row in affected]
+
+
+# Index shared by the process, loaded on first refresh
+related_index = RelatedVideoIndex()
+
+
+def _load_videos(db: Session):
+    return db.execute(
+        select(*FEATURE_COLUMNS).where(VideoContent.status != "deleted").order_by(VideoContent.id)
+    ).all()
+
+
+def load_related_index(db: Session) -> None:
+    """(Re)load the process index from video_content and video_related"""
+    with related_index.lock:
+        related_index.fit(_load_videos(db))
+        related_index.load_neighbors(
+            db.execute(select(VideoRelated.video_id, VideoRelated.neighbors)).all()
+        )
+
+
+def _save_neighbors(db: Session, video_ids: List[int]) -> None:
+    """Upsert the neighbor lists of the given videos (without committing)"""
+    if db.get_bind().dialect.name == "postgresql":
+        statement = postgresql.insert(VideoRelated)
+    else:
+        statement = sqlite.insert(VideoRelated)
+    statement = statement.on_conflict_do_update(
+        index_elements=["video_id"],
+        set_={"neighbors": statement.excluded.neighbors, "updated_at": datetime.utcnow()}
+    )
+
+    rows = [
+        {"video_id": video_id, "neighbors": json.dumps(related_index.neighbors_of(video_id))}
+        for video_id in sorted(video_ids)
+    ]
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        db.execute(statement, rows[start:start + WRITE_BATCH_SIZE])
+
+
+def rebuild_related_videos(db: Session) -> int:
+    """Recompute every neighbor list; returns the number of videos indexed"""
+    with related_index.lock:
+        related_index.fit(_load_videos(db))
+        related_index.compute_all()
+
+        db.execute(delete(VideoRelated))
+        video_ids = related_index.video_ids
+        for start in range(0, len(video_ids), WRITE_BATCH_SIZE):
+            db.execute(insert(VideoRelated), [
+                {"video_id": video_id, "neighbors": json.dumps(related_index.neighbors_of(video_id))}
+                for video_id in video_ids[start:start + WRITE_BATCH_SIZE]
+            ])
+        db.commit()
+        return len(video_ids)
+
+
+def refresh_related_videos(db: Session, video_ids: List[int]) -> int:
+    """Update the neighbor lists affected by created or changed videos
+
+    Reloads the process index first when it is stale. Returns the number of
+    neighbor lists written.
+    """
+    with related_index.lock:
+        if related_index.stale:
+            load_related_index(db)
+        videos = db.execute(
+            select(*FEATURE_COLUMNS).where(
+                VideoContent.id.in_(video_ids),
+                VideoContent.status != "deleted"
+            ).order_by(VideoContent.id)
+        ).all()
+        affected = related_index.upsert_many(videos)
+        _save_neighbors(db, affected)
+        db.commit()
+        return len(affected)
+
+
+class RelatedVideoUpdater:
+    """Applies queued related video refreshes in the background, off the request path"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = settings.RELATED_VIDEOS_REFRESH_INTERVAL_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending: Set[int] = set()
+        self._refreshed_videos = 0
+        self._updated_lists = 0
+        self._last_run_ms: Optional[float] = None
+        self._last_run_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def queue(self, video_id: int) -> None:
+        """Refresh the neighbor lists affected by a created or changed video on the next run"""
+        with self._lock:
+            self._pending.add(video_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Refresh metrics for the system metrics endpoint"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending_videos": pending,
+            "indexed_videos": len(related_index),
+            "refreshed_videos": self._refreshed_videos,
+            "updated_lists": self._updated_lists,
+            "interval_seconds": self.interval,
+            "last_run_ms": self._last_run_ms,
+            "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+        }
+
+    def run(self) -> int:
+        """Apply the queued refreshes now; returns the number of neighbor lists written
+
+        On failure the videos are queued again for the next run.
+        """
+        with self._lock:
+            video_ids, self._pending = sorted(self._pending), set()
+        if not video_ids:
+            return 0
+
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            updated = refresh_related_videos(db, video_ids)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._pending.update(video_ids)
+            raise
+        finally:
+            db.close()
+
+        self._refreshed_videos += len(video_ids)
+        self._updated_lists += updated
+        self._last_run_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._last_run_at = datetime.utcnow()
+        return updated
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.run)
+            except Exception:
+                logger.exception("Failed to refresh related videos")
+
+    def start(self) -> None:
+        """Start the periodic refresh task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task and apply whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.to_thread(self.run)
+        except Exception:
+            logger.exception("Failed to refresh related videos")
+
+
+# Updater shared by the process
+related_video_updater = RelatedVideoUpdater()
@@ -0,0 +1,212 @@
+"""
+Trending video scores
+
+A video's trending score is the weighted sum of its logged engagement events,
+each decayed by its age with a half-life of TRENDING_HALF_LIFE_HOURS; events
+older than TRENDING_WINDOW_HOURS are ignored. A background task recomputes the
+scores periodically into the indexed video_content.trending_score column:
+events are aggregated per video and hour in the database, decayed with NumPy,
+and the scores written back in short transactions of TRENDING_BATCH_SIZE
+videos, so no row stays locked for longer than one batch.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, case, cast, extract, func, select, text, update, Integer
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import VideoContent, VideoEngagementEvent
+
+logger = logging.getLogger(__name__)
+
+# Weight of one event per engagement action
+TRENDING_ACTION_WEIGHTS = {
+    "view": 1.0,
+    "like": 3.0,
+    "share": 5.0,
+    "dislike": -2.0,
+}
+
+# pg_try_advisory_lock key, so only one worker recomputes at a time
+_ADVISORY_LOCK_KEY = 0x7472656E64  # 'trend'
+
+
+def _epoch_hour(db: Session, column):
+    """Whole hours since the Unix epoch of a timestamp column"""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.floor(extract("epoch", column) / 3600), Integer)
+    return cast(func.strftime("%s", column), Integer) // 3600
+
+
+def compute_trending_scores(db: Session, now: Optional[datetime] = None) -> Dict[int, float]:
+    """Decayed engagement score of every video with events in the window"""
+    now = (now or datetime.utcnow()).replace(tzinfo=None)
+    since = now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+
+    hour = _epoch_hour(db, VideoEngagementEvent.created_at)
+    weight = case(
+        *[(VideoEngagementEvent.action == action, value) for action, value in TRENDING_ACTION_WEIGHTS.items()],
+        else_=0.0
+    )
+    rows = db.execute(
+        select(VideoEngagementEvent.video_id, hour, func.sum(weight))
+        .where(VideoEngagementEvent.created_at >= since)
+        .group_by(VideoEngagementEvent.video_id, hour)
+    ).all()
+    if not rows:
+        return {}
+
+    # Column-wise, converting Row objects one by one is an order of magnitude slower
+    video_ids, hours, weights = (np.array(column, dtype=np.float64) for column in zip(*rows))
+    # Events count from the middle of their hour
+    ages = (now - datetime(1970, 1, 1)).total_seconds() / 3600 - (hours + 0.5)
+    decayed = weights * np.exp2(-np.maximum(ages, 0) / settings.TRENDING_HALF_LIFE_HOURS)
+
+    unique_ids, positions = np.unique(video_ids.astype(np.int64), return_inverse=True)
+    scores = np.maximum(np.bincount(positions, weights=decayed), 0)
+    return dict(zip(unique_ids.tolist(), scores.round(6).tolist()))
+
+
+def _write_scores(db: Session, scores: List[Tuple[int, float]]) -> None:
+    """Set trending_score for one batch of (video_id, score) pairs (without committing)"""
+    if db.get_bind().dialect.name == "postgresql":
+        # One statement per batch instead of one round trip per row
+        db.execute(
+            text(
+                "UPDATE video_content SET trending_score = batch.score "
+                "FROM unnest(CAST(:ids AS integer[]), CAST(:scores AS double precision[])) "
+                "AS batch(id, score) WHERE video_content.id = batch.id"
+            ),
+            {"ids": [video_id for video_id, _ in scores], "scores": [score for _, score in scores]}
+        )
+        return
+
+    table = VideoContent.__table__
+    db.execute(
+        update(table).where(table.c.id == bindparam("b_id")).values(trending_score=bindparam("b_score")),
+        [{"b_id": video_id, "b_score": score} for video_id, score in scores]
+    )
+
+
+def recompute_trending_scores(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = settings.TRENDING_BATCH_SIZE
+) -> Dict[str, Any]:
+    """Recompute all trending scores, committing every batch_size videos
+
+    Videos whose events all left the window are reset to 0. Returns the number
+    of scored and reset videos with the time spent.
+    """
+    started = time.perf_counter()
+    scores = compute_trending_scores(db, now)
+    computed = time.perf_counter()
+
+    scored = set(scores)
+    stale = [
+        video_id for video_id in db.execute(
+            select(VideoContent.id).where(VideoContent.trending_score > 0)
+        ).scalars()
+        if video_id not in scored
+    ]
+    db.commit()
+
+    # Ascending ids, the same lock order as the engagement flush
+    updates = sorted(scores.items()) + [(video_id, 0.0) for video_id in sorted(stale)]
+    for start in range(0, len(updates), batch_size):
+        _write_scores(db, updates[start:start + batch_size])
+        db.commit()
+
+    return {
+        "scored_videos": len(scores),
+        "reset_videos": len(stale),
+        "compute_seconds": round(computed - started, 3),
+        "write_seconds": round(time.perf_counter() - computed, 3),
+    }
+
+
+class TrendingScoreUpdater:
+    """Periodically recomputes trending scores in the background"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = settings.TRENDING_RECOMPUTE_INTERVAL_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._last_run: Dict[str, Any] = {}
+        self._last_run_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Recompute metrics for the system metrics endpoint"""
+        return {
+            **self._last_run,
+            "interval_seconds": self.interval,
+            "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+        }
+
+    def run(self) -> Optional[Dict[str, Any]]:
+        """Recompute the scores now; skipped while another worker recomputes"""
+        db = self.session_factory()
+        try:
+            bind = db.get_bind()
+            if bind.dialect.name != "postgresql":
+                result = recompute_trending_scores(db)
+            else:
+                # Session-level lock on a connection of its own, since the
+                # session returns its connection to the pool on every commit
+                with bind.connect() as lock_connection:
+                    acquired = lock_connection.execute(
+                        select(func.pg_try_advisory_lock(_ADVISORY_LOCK_KEY))
+                    ).scalar()
+                    if not acquired:
+                        return None
+                    try:
+                        result = recompute_trending_scores(db)
+                    finally:
+                        lock_connection.execute(select(func.pg_advisory_unlock(_ADVISORY_LOCK_KEY)))
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self._last_run = result
+        self._last_run_at = datetime.utcnow()
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.run)
+            except Exception:
+                logger.exception("Failed to recompute trending scores")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic recompute task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the recompute task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Updater shared by the process
+trending_updater = TrendingScoreUpdater()
@@ -0,0 +1,484 @@
+"""
+Columnar snapshot of the user dimensions
+
+UserCube keeps the low-cardinality dimensions of every user in memory as NumPy
+arrays with one row per user, ordered by id. Primary sport, city, state,
+experience level, gender, profile_completed and is_active are dictionary
+encoded into int32 codes (code 0 is NULL), created_at is a datetime64 column
+and the sports listed in secondary_sports are kept as (row, sport code) pairs.
+A filter is a boolean mask, looked up from the codes through a table of the
+accepted codes, and a breakdown is np.bincount of the (combined) codes under
+the mask, so any filter/group-by combination of the dimensions takes a few
+vectorized passes instead of a GROUP BY over users.
+
+The cube is refreshed every USER_CUBE_REFRESH_SECONDS with the users updated or
+created since the previous refresh, by the database clock and with a margin for
+transactions that committed late. A full reload happens every
+USER_CUBE_FULL_RELOAD_SECONDS and whenever the row count shows that users were
+deleted. Each refresh publishes a new immutable UserCubeSnapshot, so readers
+never wait for it. The cube is per process.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import User
+
+logger = logging.getLogger(__name__)
+
+# Dimension name -> users column
+DIMENSIONS = {
+    "sport": User.primary_sport,
+    "city": User.city,
+    "state": User.state,
+    "experience": User.experience_level,
+    "gender": User.gender,
+    "profile_completed": User.profile_completed,
+    "is_active": User.is_active,
+}
+
+# Group-by dimension bucketing created_at by hour, day, week or month
+CREATED_AT = "created_at"
+
+CUBE_COLUMNS = (User.id, *DIMENSIONS.values(), User.created_at, User.secondary_sports)
+
+READ_BATCH_SIZE = 10000
+
+# Rows whose updated_at/created_at was set up to this long before the previous
+# refresh are read again, for transactions that committed after it
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# Group-by combinations counted with bincount up to this many, with np.unique beyond
+MAX_BINCOUNT_GROUPS = 1 << 22
+
+
+class _Vocabulary:
+    """Append-only dictionary encoding of a dimension; code 0 is NULL"""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Iterable = ()):
+        self.values: List[Any] = [None, *values]
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup_table(self, values: Iterable, size: int) -> np.ndarray:
+        """Whether each of the first size codes is one of the values; unseen values match no row"""
+        table = np.zeros(size, dtype=bool)
+        for value in values:
+            code = self._codes.get(value)
+            if code is not None and code < size:
+                table[code] = True
+        return table
+
+
+def _new_vocabularies() -> Dict[str, _Vocabulary]:
+    return {
+        dimension: _Vocabulary((False, True) if dimension in ("profile_completed", "is_active") else ())
+        for dimension in DIMENSIONS
+    }
+
+
+def _datetime64(value: datetime) -> np.datetime64:
+    """Naive UTC datetime64 of a datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def _secondary_sports(value: Optional[str]) -> List[str]:
+    try:
+        sports = json.loads(value) if value else []
+    except ValueError:
+        return []
+    return [sport for sport in set(sports) if isinstance(sport, str)] if isinstance(sports, list) else []
+
+
+def secondary_sport_condition(sport: str):
+    """SQL condition on users listing sport among their secondary sports, as the cube matches them
+
+    secondary_sports is a JSON list, so the quoted JSON string is searched for;
+    the bare name would also match e.g. "table tennis" for "tennis".
+    """
+    encodings = {json.dumps(sport), json.dumps(sport, ensure_ascii=False)}
+    return or_(*[User.secondary_sports.contains(encoded, autoescape=True) for encoded in sorted(encodings)])
+
+
+_HOUR_US = 3600 * 1_000_000
+_DAY_US = 24 * _HOUR_US
+
+
+def _bucket_numbers(created_at: np.ndarray, granularity: str) -> Tuple[np.ndarray, str]:
+    """Number of the hour/day/week/month of each timestamp (no NaT) since the epoch, and its datetime64 unit
+
+    Weeks are numbered by their Monday in days; 1970-01-01 was a Thursday.
+    """
+    micros = created_at.view(np.int64)
+    if granularity == "hour":
+        return micros // _HOUR_US, "h"
+    days = micros // _DAY_US
+    if granularity == "week":
+        return days - (days + 3) % 7, "D"
+    if granularity == "month" and len(days):
+        # Month of each day in the range, looked up rather than converted row by row
+        first = int(days.min())
+        months = np.arange(first, int(days.max()) + 1).astype("datetime64[D]").astype("datetime64[M]")
+        return months.view(np.int64)[days - first], "M"
+    return days, "D"
+
+
+class _Rows:
+    """Encoded columns of a set of users"""
+
+    __slots__ = ("ids", "codes", "created_at", "secondary_rows", "secondary_codes")
+
+    def __init__(self, ids, codes, created_at, secondary_rows, secondary_codes):
+        self.ids: np.ndarray = ids
+        self.codes: Dict[str, np.ndarray] = codes
+        self.created_at: np.ndarray = created_at
+        self.secondary_rows: np.ndarray = secondary_rows
+        self.secondary_codes: np.ndarray = secondary_codes
+
+    @classmethod
+    def empty(cls) -> "_Rows":
+        return cls(
+            np.empty(0, dtype=np.int64),
+            {dimension: np.empty(0, dtype=np.int32) for dimension in DIMENSIONS},
+            np.empty(0, dtype="datetime64[us]"),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int32)
+        )
+
+    @classmethod
+    def concatenate(cls, parts: List["_Rows"]) -> "_Rows":
+        if not parts:
+            return cls.empty()
+        offsets = np.cumsum([0] + [len(part.ids) for part in parts[:-1]])
+        return cls(
+            np.concatenate([part.ids for part in parts]),
+            {dimension: np.concatenate([part.codes[dimension] for part in parts]) for dimension in DIMENSIONS},
+            np.concatenate([part.created_at for part in parts]),
+            np.concatenate([part.secondary_rows + offset for part, offset in zip(parts, offsets)]),
+            np.concatenate([part.secondary_codes for part in parts])
+        )
+
+    def take(self, rows: np.ndarray) -> "_Rows":
+        """The given rows in the given order, with their secondary sports"""
+        new_rows = np.full(len(self.ids), -1, dtype=np.int64)
+        new_rows[rows] = np.arange(len(rows))
+        secondary_rows = new_rows[self.secondary_rows]
+        kept = secondary_rows >= 0
+        return _Rows(
+            self.ids[rows],
+            {dimension: codes[rows] for dimension, codes in self.codes.items()},
+            self.created_at[rows],
+            secondary_rows[kept],
+            self.secondary_codes[kept]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.ids.nbytes + self.created_at.nbytes + self.secondary_rows.nbytes + self.secondary_codes.nbytes
+            + sum(codes.nbytes for codes in self.codes.values())
+        )
+
+
+class UserCubeSnapshot:
+    """One immutable version of the cube"""
+
+    def __init__(self, rows: _Rows, vocabularies: Dict[str, _Vocabulary], refreshed_at: datetime):
+        self._rows = rows
+        self._vocabularies = vocabularies
+        # Vocabulary sizes as of this snapshot; codes of later values do not occur in it
+        self._sizes = {dimension: len(vocabulary.values) for dimension, vocabulary in vocabularies.items()}
+        self.refreshed_at = refreshed_at
+        self.refreshed_monotonic = time.monotonic()
+        # Rows of the secondary sports grouped by sport code, so that a sport
+        # filter only touches the pairs of the requested sports
+        order = np.argsort(rows.secondary_codes, kind="stable")
+        self._secondary_rows = rows.secondary_rows[order]
+        self._secondary_offsets = np.searchsorted(
+            rows.secondary_codes[order], np.arange(self._sizes["sport"] + 1)
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows.nbytes
+
+    def mask(
+        self,
+        filters: Optional[Dict[str, Sequence]] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> np.ndarray:
+        """Rows matching every filter (dimension -> accepted values) created in [created_from, created_to]
+
+        The sport filter matches the primary sport and the secondary sports.
+        Raises ValueError for unknown dimensions.
+        """
+        rows = self._rows
+        mask = np.ones(len(rows.ids), dtype=bool)
+        for dimension, values in (filters or {}).items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown user dimension '{dimension}'")
+            accepted = self._vocabularies[dimension].lookup_table(values, self._sizes[dimension])
+            matched = accepted[rows.codes[dimension]]
+            if dimension == "sport":
+                for code in np.flatnonzero(accepted):
+                    matched[self._secondary_rows[self._secondary_offsets[code]:self._secondary_offsets[code + 1]]] = True
+            mask &= matched
+        if created_from is not None:
+            mask &= rows.created_at >= _datetime64(created_from)
+        if created_to is not None:
+            mask &= rows.created_at <= _datetime64(created_to)
+        return mask
+
+    def count(
+        self,
+        mask: np.ndarray,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> int:
+        """Rows under mask, optionally only those created in [created_from, created_before)"""
+        if created_from is not None:
+            mask = mask & (self._rows.created_at >= _datetime64(created_from))
+        if created_before is not None:
+            mask = mask & (self._rows.created_at < _datetime64(created_before))
+        return int(np.count_nonzero(mask))
+
+    def _group_key(self, dimension: str, mask: np.ndarray, granularity: str):
+        """Codes of a group-by dimension for the rows under mask, the number of codes and a decoder
+
+        The decoder maps an array of codes to the list of their values.
+        """
+        if dimension in DIMENSIONS:
+            values = np.array(self._vocabularies[dimension].values[:self._sizes[dimension]], dtype=object)
+            return self._rows.codes[dimension][mask], self._sizes[dimension], lambda codes: values[codes].tolist()
+        if dimension != CREATED_AT:
+            raise ValueError(f"Unknown user dimension '{dimension}'")
+
+        created_at = self._rows.created_at[mask]
+        valid = ~np.isnat(created_at)
+        numbers, unit = _bucket_numbers(created_at[valid], granularity)
+        if not len(numbers):
+            return np.zeros(len(created_at), dtype=np.int64), 1, lambda codes: [None] * len(codes)
+        step = 7 if granularity == "week" else 1
+        first = int(numbers.min())
+        # Code 0 is NULL, then one code per bucket from the earliest one
+        codes = np.zeros(len(created_at), dtype=np.int64)
+        codes[valid] = (numbers - first) // step + 1
+
+        def decode(codes: np.ndarray) -> list:
+            buckets = (first + (codes - 1) * step).astype(f"datetime64[{unit}]").astype("datetime64[us]")
+            buckets[codes == 0] = np.datetime64("NaT")
+            return buckets.tolist()
+
+        return codes, int((numbers.max() - first) // step) + 2, decode
+
+    def group_counts(
+        self,
+        group_by: Sequence[str],
+        mask: np.ndarray,
+        granularity: str = "day"
+    ) -> List[Tuple[tuple, int]]:
+        """Rows under mask per combination of group_by values, most frequent first
+
+        created_at is grouped by the start of its hour, day, week or month.
+        """
+        if not group_by:
+            return [((), self.count(mask))]
+        keys = [self._group_key(dimension, mask, granularity) for dimension in group_by]
+        sizes = tuple(size for _, size, _ in keys)
+
+        combined = keys[0][0].astype(np.int64)
+        for codes, size, _ in keys[1:]:
+            combined = combined * size + codes
+
+        if int(np.prod(sizes, dtype=np.float64)) <= MAX_BINCOUNT_GROUPS:
+            counts = np.bincount(combined, minlength=int(np.prod(sizes)))
+            groups = np.flatnonzero(counts)
+            counts = counts[groups]
+        else:
+            groups, counts = np.unique(combined, return_counts=True)
+
+        order = np.argsort(-counts, kind="stable")
+        groups, counts = groups[order], counts[order]
+        columns = np.unravel_index(groups, sizes)
+        decoded = [decode(column) for column, (_, _, decode) in zip(columns, keys)]
+        return [(values, int(count)) for values, count in zip(zip(*decoded), counts)]
+
+
+class UserCube:
+    """In-memory user dimension cube, refreshed incrementally in the background"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        refresh_interval: float = settings.USER_CUBE_REFRESH_SECONDS,
+        full_reload_interval: float = settings.USER_CUBE_FULL_RELOAD_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self._snapshot: Optional[UserCubeSnapshot] = None
+        self._vocabularies = _new_vocabularies()
+        self._refresh_lock = threading.Lock()
+        # Database time the last refresh started at
+        self._watermark: Optional[datetime] = None
+        self._loaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._full_loads = 0
+        self._incremental_refreshes = 0
+        self._last_changed_rows = 0
+        self._last_refresh_ms: Optional[float] = None
+
+    @property
+    def snapshot(self) -> Optional[UserCubeSnapshot]:
+        """Current snapshot; None when not loaded or not refreshed for USER_CUBE_MAX_AGE_SECONDS"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.refreshed_monotonic > settings.USER_CUBE_MAX_AGE_SECONDS:
+            return None
+        return snapshot
+
+    def _read(self, db: Session, vocabularies: Dict[str, _Vocabulary], *clauses) -> _Rows:
+        """Encode the users matching clauses, in id order"""
+        result = db.execute(
+            select(*CUBE_COLUMNS).where(*clauses).order_by(User.id).execution_options(yield_per=READ_BATCH_SIZE)
+        )
+        sport_vocabulary = vocabularies["sport"]
+        parts = []
+        for rows in result.partitions():
+            columns = list(zip(*rows))
+            ids = np.array(columns[0], dtype=np.int64)
+            codes = {
+                dimension: np.fromiter(map(vocabularies[dimension].code, values), dtype=np.int32, count=len(rows))
+                for dimension, values in zip(DIMENSIONS, columns[1:])
+            }
+            created_at = np.array(
+                [_datetime64(value) if value is not None else None for value in columns[-2]],
+                dtype="datetime64[us]"
+            )
+            pairs = [
+                (row, sport_vocabulary.code(sport))
+                for row, value in enumerate(columns[-1])
+                for sport in _secondary_sports(value)
+            ]
+            parts.append(_Rows(
+                ids,
+                codes,
+                created_at,
+                np.array([row for row, _ in pairs], dtype=np.int64),
+                np.array([code for _, code in pairs], dtype=np.int32)
+            ))
+        return _Rows.concatenate(parts)
+
+    def _merge(self, db: Session, rows: _Rows, since: datetime) -> Optional[_Rows]:
+        """Rows with the users changed since a time applied; None when users were deleted"""
+        changed = self._read(db, self._vocabularies, or_(User.updated_at >= since, User.created_at >= since))
+        self._last_changed_rows = len(changed.ids)
+        if len(changed.ids):
+            # Rows are in id order, so the changed users are found by binary search
+            positions = np.minimum(np.searchsorted(rows.ids, changed.ids), max(len(rows.ids) - 1, 0))
+            keep = np.ones(len(rows.ids), dtype=bool)
+            if len(rows.ids):
+                keep[positions[rows.ids[positions] == changed.ids]] = False
+            kept = rows.take(np.flatnonzero(keep))
+            merged = _Rows.concatenate([kept, changed])
+            if len(kept.ids) and len(changed.ids) and changed.ids[0] < kept.ids[-1]:
+                merged = merged.take(np.argsort(merged.ids, kind="stable"))
+            rows = merged
+        if db.query(func.count(User.id)).scalar() != len(rows.ids):
+            return None
+        return rows
+
+    def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """Apply the users changed since the last refresh, or reload all of them"""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                now = db.execute(select(func.now())).scalar()
+                previous = self._snapshot
+                rows = None
+                if not full and previous is not None and time.monotonic() - self._loaded_at < self.full_reload_interval:
+                    rows = self._merge(db, previous._rows, self._watermark - REFRESH_OVERLAP)
+                    if rows is not None:
+                        self._incremental_refreshes += 1
+                if rows is None:
+                    # Fresh vocabularies drop the values no user has anymore
+                    vocabularies = _new_vocabularies()
+                    rows = self._read(db, vocabularies)
+                    self._vocabularies = vocabularies
+                    self._loaded_at = time.monotonic()
+                    self._last_changed_rows = len(rows.ids)
+                    self._full_loads += 1
+            finally:
+                db.close()
+
+            self._snapshot = UserCubeSnapshot(rows, self._vocabularies, datetime.utcnow())
+            self._watermark = now
+            self._last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+            return self.stats()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Failed to refresh the user dimension cube")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start the periodic refresh task on the running event loop"""
+        if self._task is None and self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Cube metrics for the system metrics endpoint"""
+        snapshot = self._snapshot
+        return {
+            "rows": len(snapshot) if snapshot is not None else 0,
+            "memory_bytes": snapshot.nbytes if snapshot is not None else 0,
+            "values": {dimension: len(vocabulary.values) - 1 for dimension, vocabulary in self._vocabularies.items()},
+            "full_loads": self._full_loads,
+            "incremental_refreshes": self._incremental_refreshes,
+            "last_changed_rows": self._last_changed_rows,
+            "last_refresh_ms": self._last_refresh_ms,
+            "refreshed_at": snapshot.refreshed_at.isoformat() if snapshot is not None else None,
+            "serving": self.snapshot is not None,
+        }
+
+
+# Cube shared by the process
+user_cube = UserCube()
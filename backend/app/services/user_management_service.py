@@ -15,6 +15,23 @@ from app.schemas.user_management import (
     UserActivitySummary,
     PaginatedUserResponse
 )
+from app.services.user_cube import secondary_sport_condition
+
+
+# Columns of UserListResponse; list queries select only these instead of
+# hydrating full User entities with their text blobs
+USER_LIST_COLUMNS = (
+    User.id,
+    User.email,
+    User.full_name,
+    User.is_active,
+    User.profile_completed,
+    User.primary_sport,
+    User.experience_level,
+    User.city,
+    User.created_at,
+    User.updated_at.label("last_activity"),  # Mock last activity
+)
 
 
 def get_users_with_filters(
@@ -31,8 +48,8 @@ def get_users_with_filters(
 ) -> PaginatedUserResponse:
     """Get paginated list of users with filtering"""
     
-    # Base query
-    query = db.query(User)
+    # Base query, projecting only the listed columns
+    query = db.query(*USER_LIST_COLUMNS)
     
     # Apply filters
     if search:
@@ -47,7 +64,7 @@ def get_users_with_filters(
         query = query.filter(
             or_(
                 User.primary_sport == sport,
-                User.secondary_sports.contains(sport)
+                secondary_sport_condition(sport)
             )
         )
     
@@ -71,27 +88,14 @@ def get_users_with_filters(
         query = query.order_by(asc(sort_column))
     
     # Get total count
-    total = query.count()
+    total = query.order_by(None).with_entities(func.count(User.id)).scalar()
     
     # Apply pagination
     offset = (page - 1) * limit
     users = query.offset(offset).limit(limit).all()
     
     # Convert to response format
-    user_responses = []
-    for user in users:
-        user_responses.append(UserListResponse(
-            id=user.id,
-            email=user.email,
-            full_name=user.full_name,
-            is_active=user.is_active,
-            profile_completed=user.profile_completed,
-            primary_sport=user.primary_sport,
-            experience_level=user.experience_level,
-            city=user.city,
-            created_at=user.created_at,
-            last_activity=user.updated_at  # Mock last activity
-        ))
+    user_responses = [UserListResponse(**user._mapping) for user in users]
     
     total_pages = (total + limit - 1) // limit
     
@@ -233,7 +237,7 @@ def search_users(
 ) -> List[UserListResponse]:
     """Advanced user search with multiple criteria"""
     
-    query = db.query(User)
+    query = db.query(*USER_LIST_COLUMNS)
     
     # Text search
     if search_request.query:
@@ -250,7 +254,7 @@ def search_users(
         sport_filters = []
         for sport in search_request.sports:
             sport_filters.append(User.primary_sport == sport)
-            sport_filters.append(User.secondary_sports.contains(sport))
+            sport_filters.append(secondary_sport_condition(sport))
         query = query.filter(or_(*sport_filters))
     
     # Experience levels filter
@@ -295,20 +299,7 @@ def search_users(
     users = query.limit(search_request.limit).all()
     
     # Convert to response format
-    user_responses = []
-    for user in users:
-        user_responses.append(UserListResponse(
-            id=user.id,
-            email=user.email,
-            full_name=user.full_name,
-            is_active=user.is_active,
-            profile_completed=user.profile_completed,
-            primary_sport=user.primary_sport,
-            experience_level=user.experience_level,
-            city=user.city,
-            created_at=user.created_at,
-            last_activity=user.updated_at
-        ))
+    user_responses = [UserListResponse(**user._mapping) for user in users]
     
     return user_responses
 
@@ -0,0 +1,121 @@
+"""
+Read-through cache for video detail responses
+
+Keeps a bounded, per-process LRU of serialized VideoContentResponse objects
+keyed by video id, each entry expiring after VIDEO_DETAIL_CACHE_TTL_SECONDS.
+Every hit returns a new instance, so callers cannot alter what others get.
+Write paths invalidate (or replace) the entries they touch; the TTL bounds how
+stale an entry can get when another worker process wrote the row.
+
+Invalidations are versioned per video: a read only loses its fill when the
+video it read was invalidated after the read started, not on any write.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.video_content import VideoContentResponse
+
+
+class VideoDetailCache:
+    """Bounded LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.VIDEO_DETAIL_CACHE_SIZE,
+        ttl_seconds: float = settings.VIDEO_DETAIL_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, bytes]]" = OrderedDict()
+        # Bumped by every invalidation; a read that started at version v cannot
+        # store a video invalidated at a later version
+        self._version = 0
+        self._invalidated: Dict[int, int] = {}
+        # Reads older than this version are not stored, their videos'
+        # invalidations were forgotten to bound _invalidated
+        self._oldest_version = 0
+        self._max_invalidations = max(self.max_entries, 10000)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, video_id: int) -> Tuple[Optional[VideoContentResponse], int]:
+        """Return (copy of the cached response or None, version to pass to put())"""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            version = self._version
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(video_id)
+                    self._hits += 1
+                else:
+                    del self._entries[video_id]
+                    payload = None
+            else:
+                payload = None
+            if payload is None:
+                self._misses += 1
+                return None, version
+        return VideoContentResponse.model_validate_json(payload), version
+
+    def put(self, video: VideoContentResponse, version: Optional[int] = None) -> None:
+        """Store a copy of a response; skipped when the video was invalidated since ``version``"""
+        if not self.enabled:
+            return
+        payload = video.model_dump_json().encode()
+        with self._lock:
+            if version is not None and (
+                version < self._oldest_version or self._invalidated.get(video.id, -1) > version
+            ):
+                return
+            self._entries[video.id] = (time.monotonic() + self.ttl_seconds, payload)
+            self._entries.move_to_end(video.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, video_ids: Iterable[int]) -> None:
+        """Drop the cached responses of the given videos"""
+        with self._lock:
+            self._version += 1
+            for video_id in video_ids:
+                self._entries.pop(video_id, None)
+                self._invalidated[video_id] = self._version
+            if len(self._invalidated) > self._max_invalidations:
+                self._invalidated.clear()
+                self._oldest_version = self._version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._invalidated.clear()
+            self._oldest_version = self._version
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache metrics for the system metrics endpoint"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            }
+
+
+# Cache shared by the process
+video_detail_cache = VideoDetailCache()
@@ -2,13 +2,14 @@
 Video content service functions
 """
 
+import base64
 import json
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func, desc, asc
+from sqlalchemy import and_, or_, func, desc, asc, insert, select, tuple_, update
 
-from app.models.models import VideoContent, VideoModerationLog
+from app.models.models import VideoContent, VideoDailyStats, VideoModerationLog, VideoRelated, VideoTag
 from app.schemas.video_content import (
     VideoContentResponse,
     VideoContentListResponse,
@@ -16,84 +17,221 @@ from app.schemas.video_content import (
     VideoContentUpdate,
     VideoSearchRequest,
     PaginatedVideoResponse,
-    VideoAnalytics
+    VideoAnalytics,
+    VideoModerationClaimResponse
 )
+from app.core.config import settings
+from app.services.analytics_service import bucket_series
+from app.services.engagement_buffer import engagement_buffer
+from app.services.related_video_service import FEATURE_FIELDS, related_video_updater
+from app.services.video_cache import video_detail_cache
+from app.services.video_stats_service import apply_video_stats_delta, video_stats_of, video_stats_snapshot
+from app.services.video_search_service import build_text_search, index_video, unindex_video
 
 
-def get_videos_with_filters(
+# Columns of VideoContentListResponse; list queries select only these instead
+# of hydrating full VideoContent entities
+VIDEO_LIST_COLUMNS = (
+    VideoContent.id,
+    VideoContent.title,
+    VideoContent.sport,
+    VideoContent.category,
+    VideoContent.status,
+    VideoContent.moderation_status,
+    VideoContent.view_count,
+    VideoContent.duration,
+    VideoContent.thumbnail_url,
+    VideoContent.created_at,
+    VideoContent.published_at,
+)
+
+
+# sort_by values that name a derived ranking rather than a column
+SORT_ALIASES = {
+    "trending": "trending_score",
+}
+
+
+def _encode_cursor(sort_by: str, sort_order: str, value, video_id: int) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps([sort_by, sort_order, value, video_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """Decode a cursor produced by _encode_cursor into (value, video_id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_sort_order, value, video_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        video_id = int(video_id)
+        if isinstance(value, dict) and "dt" in value:
+            value = datetime.fromisoformat(value["dt"])
+        elif isinstance(value, (list, dict)):
+            raise ValueError("Invalid cursor value")
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    
+    if cursor_sort_by != sort_by or cursor_sort_order != sort_order:
+        raise ValueError("Cursor does not match the requested sort order")
+    
+    return value, video_id
+
+
+def _keyset_filter(sort_column, descending: bool, value, video_id: int):
+    """Rows strictly after (value, video_id) in (sort_column NULLS LAST, id) order
+    with a non-NULL sort key, or with a NULL one when value is None
+    
+    The non-NULL phase is a row-value comparison, so it is an index range scan
+    on (sort_column, id); rows with a NULL sort key follow in a phase of their own.
+    """
+    if value is None:
+        id_after = VideoContent.id < video_id if descending else VideoContent.id > video_id
+        return and_(sort_column.is_(None), id_after)
+    
+    key = tuple_(sort_column, VideoContent.id)
+    return key < tuple_(value, video_id) if descending else key > tuple_(value, video_id)
+
+
+def _keyset_page(query, sort_column, descending: bool, value, video_id: int, size: int) -> List:
+    """Up to size rows of an ordered query after (value, video_id), moving on to
+    the rows with a NULL sort key once the non-NULL ones are exhausted"""
+    rows = query.filter(_keyset_filter(sort_column, descending, value, video_id)).limit(size).all()
+    if value is not None and len(rows) < size and sort_column.nullable:
+        rows += query.filter(sort_column.is_(None)).limit(size - len(rows)).all()
+    return rows
+
+
+def video_filter_clauses(
     db: Session,
-    page: int = 1,
-    limit: int = 20,
     search: Optional[str] = None,
     sport: Optional[str] = None,
     category: Optional[str] = None,
     status: Optional[str] = None,
     moderation_status: Optional[str] = None,
-    difficulty_level: Optional[str] = None,
-    sort_by: str = "created_at",
-    sort_order: str = "desc"
-) -> PaginatedVideoResponse:
-    """Get paginated list of videos with filtering"""
-    
-    # Base query
-    query = db.query(VideoContent)
-    
-    # Apply filters
+    difficulty_level: Optional[str] = None
+) -> List:
+    """WHERE clauses of the admin video list filters"""
+    clauses = []
     if search:
-        search_filter = or_(
-            VideoContent.title.ilike(f"%{search}%"),
-            VideoContent.description.ilike(f"%{search}%"),
-            VideoContent.tags.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        search_filter, _ = build_text_search(db, search)
+        if search_filter is not None:
+            clauses.append(search_filter)
     
     if sport:
-        query = query.filter(VideoContent.sport == sport)
+        clauses.append(VideoContent.sport == sport)
     
     if category:
-        query = query.filter(VideoContent.category == category)
+        clauses.append(VideoContent.category == category)
     
     if status:
-        query = query.filter(VideoContent.status == status)
+        clauses.append(VideoContent.status == status)
     
     if moderation_status:
-        query = query.filter(VideoContent.moderation_status == moderation_status)
+        clauses.append(VideoContent.moderation_status == moderation_status)
     
     if difficulty_level:
-        query = query.filter(VideoContent.difficulty_level == difficulty_level)
+        clauses.append(VideoContent.difficulty_level == difficulty_level)
     
-    # Apply sorting
-    sort_column = getattr(VideoContent, sort_by, VideoContent.created_at)
-    if sort_order.lower() == "desc":
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(asc(sort_column))
+    return clauses
+
+
+def video_sort(sort_by: str = "created_at", sort_order: str = "desc") -> Tuple[str, str]:
+    """Normalize sort_by (column name or alias) and sort_order of the video list"""
+    sort_by = SORT_ALIASES.get(sort_by, sort_by)
+    if sort_by not in VideoContent.__table__.columns:
+        sort_by = "created_at"
+    return sort_by, "desc" if sort_order.lower() == "desc" else "asc"
+
+
+def video_order_by(sort_by: str, sort_order: str) -> List:
+    """ORDER BY of the video list, with id as tie-breaker so that keyset pages are stable"""
+    sort_column = getattr(VideoContent, sort_by)
+    descending = sort_order == "desc"
+    
+    # NULLS LAST only where NULLs can occur, so NOT NULL sort keys such as
+    # trending_score can be read off their (key, id) index in either direction
+    order = desc(sort_column) if descending else asc(sort_column)
+    if sort_column.nullable:
+        order = order.nulls_last()
+    return [order, desc(VideoContent.id) if descending else asc(VideoContent.id)]
+
+
+def get_videos_with_filters(
+    db: Session,
+    page: int = 1,
+    limit: int = 20,
+    search: Optional[str] = None,
+    sport: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    moderation_status: Optional[str] = None,
+    difficulty_level: Optional[str] = None,
+    sort_by: str = "created_at",
+    sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> PaginatedVideoResponse:
+    """Get paginated list of videos with filtering
+    
+    Pages are addressed either by page number (OFFSET) or, when a cursor from
+    a previous response's next_cursor is given, by keyset on (sort key, id).
+    Search results are listed by relevance first and only by page number.
+    The total count is skipped when include_total is False.
+    """
+    
+    sort_by, sort_order = video_sort(sort_by, sort_order)
+    sort_column = getattr(VideoContent, sort_by)
+    descending = sort_order == "desc"
+    
+    # Base query, projecting only the listed columns plus the sort key
+    query = db.query(*VIDEO_LIST_COLUMNS, sort_column.label("sort_key"))
+    
+    # Full-text search, ranked by relevance
+    rank = None
+    if search:
+        search_filter, rank = build_text_search(db, search)
+        if search_filter is not None:
+            query = query.filter(search_filter)
+        if rank is not None and cursor:
+            raise ValueError("Search results are paginated by page, not by cursor")
+    
+    # Apply filters
+    query = query.filter(*video_filter_clauses(
+        db, None, sport, category, status, moderation_status, difficulty_level
+    ))
     
     # Get total count
-    total = query.count()
+    total = query.with_entities(func.count(VideoContent.id)).scalar() if include_total else None
     
-    # Apply pagination
-    offset = (page - 1) * limit
-    videos = query.offset(offset).limit(limit).all()
+    order_by = video_order_by(sort_by, sort_order)
+    if rank is not None:
+        order_by.insert(0, desc(rank))
+    query = query.order_by(*order_by)
+    
+    # Apply pagination, fetching one extra row to know whether another page follows
+    if cursor:
+        last_value, last_id = _decode_cursor(cursor, sort_by, sort_order)
+        videos = _keyset_page(query, sort_column, descending, last_value, last_id, limit + 1)
+    else:
+        videos = query.offset((page - 1) * limit).limit(limit + 1).all()
+    has_next = len(videos) > limit
+    videos = videos[:limit]
+    
+    next_cursor = None
+    if has_next and rank is None:
+        last_video = videos[-1]
+        next_cursor = _encode_cursor(
+            sort_by, sort_order, last_video.sort_key, last_video.id
+        )
     
     # Convert to response format
-    video_responses = []
-    for video in videos:
-        video_responses.append(VideoContentListResponse(
-            id=video.id,
-            title=video.title,
-            sport=video.sport,
-            category=video.category,
-            status=video.status,
-            moderation_status=video.moderation_status,
-            view_count=video.view_count,
-            duration=video.duration,
-            thumbnail_url=video.thumbnail_url,
-            created_at=video.created_at,
-            published_at=video.published_at
-        ))
-    
-    total_pages = (total + limit - 1) // limit
+    video_responses = [VideoContentListResponse(**video._mapping) for video in videos]
+    
+    total_pages = (total + limit - 1) // limit if total is not None else None
     
     return PaginatedVideoResponse(
         videos=video_responses,
@@ -101,93 +239,169 @@ def get_videos_with_filters(
         page=page,
         limit=limit,
         total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        has_next=has_next,
+        has_prev=cursor is not None or page > 1,
+        next_cursor=next_cursor
+    )
+
+
+def _normalize_tags(tags: Optional[List[str]]) -> List[str]:
+    """Lowercase a tag list and strip blanks and duplicates, keeping the given order
+
+    Tags are stored and matched in lowercase, so filters are case-insensitive.
+    """
+    normalized = []
+    for tag in tags or []:
+        tag = tag.strip().lower()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+def get_video_tags(db: Session, video_id: int) -> List[str]:
+    """Get the tags of a video in their original order"""
+    rows = db.query(VideoTag.tag).filter(
+        VideoTag.video_id == video_id
+    ).order_by(VideoTag.position).all()
+    return [tag for tag, in rows]
+
+
+def set_video_tags(db: Session, video_id: int, tags: Optional[List[str]]) -> List[str]:
+    """Replace the tags of a video (without committing)"""
+    tags = _normalize_tags(tags)
+    db.query(VideoTag).filter(VideoTag.video_id == video_id).delete(synchronize_session=False)
+    if tags:
+        db.execute(insert(VideoTag), [
+            {"video_id": video_id, "tag": tag, "position": position}
+            for position, tag in enumerate(tags)
+        ])
+    return tags
+
+
+def tag_filter(tags: List[str], match: str = "all"):
+    """Filter clause on VideoContent.id for videos carrying all (or any) of the tags"""
+    tags = _normalize_tags(tags)
+    tagged = select(VideoTag.video_id).where(VideoTag.tag.in_(tags))
+    if match != "any":
+        tagged = tagged.group_by(VideoTag.video_id).having(
+            func.count(VideoTag.tag) == len(tags)
+        )
+    return VideoContent.id.in_(tagged)
+
+
+def _video_response(video, tags: List[str]) -> VideoContentResponse:
+    """Build the detail response from a VideoContent entity or a returned row"""
+    return VideoContentResponse(
+        **{field: getattr(video, field) for field in VideoContentResponse.model_fields if field != "tags"},
+        tags=tags
     )
 
 
 def get_video_by_id(db: Session, video_id: int) -> Optional[VideoContentResponse]:
-    """Get detailed information about a specific video"""
+    """Get detailed information about a specific video
+    
+    Served from the video detail cache when possible; misses are read from the
+    database and stored unless the video was written in the meantime.
+    """
+    
+    cached, version = video_detail_cache.get(video_id)
+    if cached is not None:
+        return cached
     
     video = db.query(VideoContent).filter(VideoContent.id == video_id).first()
     if not video:
         return None
     
-    # Parse tags from JSON string
-    tags = []
-    if video.tags:
-        try:
-            tags = json.loads(video.tags)
-        except json.JSONDecodeError:
-            tags = []
-    
-    return VideoContentResponse(
-        id=video.id,
-        title=video.title,
-        description=video.description,
-        file_url=video.file_url,
-        thumbnail_url=video.thumbnail_url,
-        duration=video.duration,
-        file_size=video.file_size,
-        sport=video.sport,
-        category=video.category,
-        difficulty_level=video.difficulty_level,
-        tags=tags,
-        status=video.status,
-        moderation_status=video.moderation_status,
-        moderation_reason=video.moderation_reason,
-        moderated_by=video.moderated_by,
-        moderated_at=video.moderated_at,
-        uploaded_by=video.uploaded_by,
-        upload_source=video.upload_source,
-        view_count=video.view_count,
-        like_count=video.like_count,
-        dislike_count=video.dislike_count,
-        share_count=video.share_count,
-        created_at=video.created_at,
-        updated_at=video.updated_at,
-        published_at=video.published_at
-    )
+    response = _video_response(video, get_video_tags(db, video_id))
+    video_detail_cache.put(response, version)
+    return response
+
+
+def get_related_videos(
+    db: Session,
+    video_id: int,
+    limit: int = 10
+) -> Optional[List[VideoContentListResponse]]:
+    """Get the precomputed "more like this" videos of an approved video
+    
+    Returns None when the video does not exist or is not approved, and an
+    empty list when its neighbors have not been computed yet.
+    """
+    
+    source = db.query(VideoContent.id, VideoRelated.neighbors).outerjoin(
+        VideoRelated, VideoRelated.video_id == VideoContent.id
+    ).filter(
+        VideoContent.id == video_id,
+        VideoContent.status == "approved"
+    ).first()
+    if not source:
+        return None
+    if not source.neighbors:
+        return []
+    
+    neighbor_ids = [neighbor_id for neighbor_id, _ in json.loads(source.neighbors)]
+    rows = db.query(*VIDEO_LIST_COLUMNS).filter(
+        VideoContent.id.in_(neighbor_ids),
+        VideoContent.status == "approved"
+    ).all()
+    videos = {row.id: row for row in rows}
+    
+    return [
+        VideoContentListResponse(**videos[neighbor_id]._mapping)
+        for neighbor_id in neighbor_ids if neighbor_id in videos
+    ][:limit]
 
 
 def create_video_content(
     db: Session,
     video_data: VideoContentCreate,
-    admin_id: int
+    admin_id: int,
+    content_hash: Optional[str] = None
 ) -> VideoContentResponse:
-    """Create a new video content entry"""
+    """Create a new video content entry
     
-    # Serialize tags to JSON
-    tags_json = None
-    if video_data.tags:
-        tags_json = json.dumps(video_data.tags)
-    
-    # Create video content
-    db_video = VideoContent(
-        title=video_data.title,
-        description=video_data.description,
-        file_url=video_data.file_url,
-        thumbnail_url=video_data.thumbnail_url,
-        duration=video_data.duration,
-        file_size=video_data.file_size,
-        sport=video_data.sport,
-        category=video_data.category,
-        difficulty_level=video_data.difficulty_level,
-        tags=tags_json,
-        upload_source=video_data.upload_source,
-        uploaded_by=admin_id,
-        status="approved",  # Admin uploads are auto-approved
-        moderation_status="approved",
-        moderated_by=admin_id,
-        moderated_at=datetime.utcnow(),
-        published_at=datetime.utcnow()
-    )
+    content_hash is the SHA-256 of an uploaded file; it is unique, so creating a
+    second video with the same hash raises IntegrityError.
+    """
     
-    db.add(db_video)
+    # Serialize tags to JSON
+    tags = _normalize_tags(video_data.tags)
+    tags_json = json.dumps(tags) if tags else None
+    now = datetime.utcnow()
+    
+    # Create video content, reading back the stored row in the same statement
+    video = db.execute(
+        insert(VideoContent).values(
+            title=video_data.title,
+            description=video_data.description,
+            file_url=video_data.file_url,
+            thumbnail_url=video_data.thumbnail_url,
+            duration=video_data.duration,
+            file_size=video_data.file_size,
+            content_hash=content_hash,
+            sport=video_data.sport,
+            category=video_data.category,
+            difficulty_level=video_data.difficulty_level,
+            tags=tags_json,
+            upload_source=video_data.upload_source,
+            uploaded_by=admin_id,
+            status="approved",  # Admin uploads are auto-approved
+            moderation_status="approved",
+            moderated_by=admin_id,
+            moderated_at=now,
+            published_at=now
+        ).returning(*VideoContent.__table__.columns)
+    ).one()
+    
+    set_video_tags(db, video.id, tags)
+    apply_video_stats_delta(db, {}, video_stats_of([video]))
     db.commit()
-    db.refresh(db_video)
+    index_video(db, video)
+    related_video_updater.queue(video.id)
     
-    return get_video_by_id(db, db_video.id)
+    response = _video_response(video, tags)
+    video_detail_cache.put(response)
+    return response
 
 
 def update_video_content(
@@ -197,31 +411,62 @@ def update_video_content(
 ) -> Optional[VideoContentResponse]:
     """Update video content information"""
     
-    video = db.query(VideoContent).filter(VideoContent.id == video_id).first()
-    if not video:
-        return None
-    
     # Update fields
     update_data = video_data.model_dump(exclude_unset=True)
+    features_changed = bool(FEATURE_FIELDS & update_data.keys())
     
     # Handle tags separately
+    tags = None
     if "tags" in update_data:
-        tags = update_data.pop("tags")
-        if tags:
-            update_data["tags"] = json.dumps(tags)
-        else:
-            update_data["tags"] = None
+        tags = _normalize_tags(update_data.pop("tags"))
+        update_data["tags"] = json.dumps(tags) if tags else None
+    
+    # Moving a video to another sport or category moves its rollup totals
+    regrouped = "sport" in update_data or "category" in update_data
+    if regrouped:
+        stats_before = video_stats_snapshot(db, [video_id], lock=True)
+    
+    # Update video and read back the stored row in the same statement
+    video = db.execute(
+        update(VideoContent)
+        .where(VideoContent.id == video_id)
+        .values(**update_data, updated_at=datetime.utcnow())
+        .returning(*VideoContent.__table__.columns),
+        execution_options={"synchronize_session": False}
+    ).first()
+    if not video:
+        db.rollback()
+        return None
     
-    # Update video
-    for field, value in update_data.items():
-        setattr(video, field, value)
+    if tags is not None:
+        set_video_tags(db, video_id, tags)
+    else:
+        tags = get_video_tags(db, video_id)
     
-    video.updated_at = datetime.utcnow()
+    if regrouped:
+        apply_video_stats_delta(db, stats_before, video_stats_of([video]))
     
     db.commit()
-    db.refresh(video)
-    
-    return get_video_by_id(db, video_id)
+    video_detail_cache.invalidate([video_id])
+    index_video(db, video)
+    if features_changed:
+        related_video_updater.queue(video_id)
+    
+    response = _video_response(video, tags)
+    video_detail_cache.put(response)
+    return response
+
+
+# Moderation action -> (moderation_status, status, published)
+MODERATION_ACTIONS = {
+    "approve": ("approved", "approved", True),
+    "reject": ("rejected", "rejected", False),
+    "flag": ("rejected", "flagged", False),
+    "unflag": ("approved", "approved", True),
+}
+
+# Videos updated per statement by bulk moderation, bounding row lock time
+BULK_MODERATION_CHUNK_SIZE = 500
 
 
 def moderate_video(
@@ -233,32 +478,24 @@ def moderate_video(
 ) -> bool:
     """Moderate video content"""
     
-    video = db.query(VideoContent).filter(VideoContent.id == video_id).first()
+    video = db.query(VideoContent).filter(VideoContent.id == video_id).with_for_update().first()
     if not video:
         return False
     
     previous_status = video.moderation_status
+    stats_before = video_stats_of([video])
     
     # Update moderation status based on action
-    if action == "approve":
-        video.moderation_status = "approved"
-        video.status = "approved"
-        video.published_at = datetime.utcnow()
-    elif action == "reject":
-        video.moderation_status = "rejected"
-        video.status = "rejected"
-        video.published_at = None
-    elif action == "flag":
-        video.moderation_status = "rejected"
-        video.status = "flagged"
-        video.published_at = None
-    elif action == "unflag":
-        video.moderation_status = "approved"
-        video.status = "approved"
-        video.published_at = datetime.utcnow()
+    if action in MODERATION_ACTIONS:
+        moderation_status, video_status, published = MODERATION_ACTIONS[action]
+        video.moderation_status = moderation_status
+        video.status = video_status
+        video.published_at = datetime.utcnow() if published else None
     
     video.moderation_reason = reason
     video.moderated_by = admin_id
+    video.claimed_by = None
+    video.claim_expires_at = None
     video.moderated_at = datetime.utcnow()
     video.updated_at = datetime.utcnow()
     
@@ -273,11 +510,80 @@ def moderate_video(
     )
     
     db.add(moderation_log)
+    apply_video_stats_delta(db, stats_before, video_stats_of([video]))
     db.commit()
+    video_detail_cache.invalidate([video_id])
     
     return True
 
 
+def claim_moderation_batch(
+    db: Session,
+    admin_id: int,
+    limit: int = 10
+) -> VideoModerationClaimResponse:
+    """Lease the next unreviewed videos of the moderation queue to a moderator
+    
+    Rows locked by a concurrent claim are skipped (FOR UPDATE SKIP LOCKED), so
+    moderators never wait on each other or receive the same video. Videos whose
+    lease expired are claimable again; the moderator's own claims are renewed.
+    """
+    
+    now = datetime.utcnow()
+    lease_expires_at = now + timedelta(seconds=settings.MODERATION_CLAIM_LEASE_SECONDS)
+    
+    claimable = select(VideoContent.id).where(
+        VideoContent.moderation_status == "unreviewed",
+        or_(
+            VideoContent.claim_expires_at.is_(None),
+            VideoContent.claim_expires_at < now,
+            VideoContent.claimed_by == admin_id
+        )
+    ).order_by(
+        VideoContent.created_at, VideoContent.id
+    ).limit(limit).with_for_update(skip_locked=True)
+    
+    claimed_ids = db.execute(
+        update(VideoContent)
+        .where(VideoContent.id.in_(claimable.scalar_subquery()))
+        .values(claimed_by=admin_id, claim_expires_at=lease_expires_at)
+        .returning(VideoContent.id),
+        execution_options={"synchronize_session": False}
+    ).scalars().all()
+    db.commit()
+    
+    videos = []
+    if claimed_ids:
+        videos = db.query(*VIDEO_LIST_COLUMNS).filter(
+            VideoContent.id.in_(claimed_ids)
+        ).order_by(VideoContent.created_at, VideoContent.id).all()
+    
+    return VideoModerationClaimResponse(
+        videos=[VideoContentListResponse(**video._mapping) for video in videos],
+        claimed_by=admin_id,
+        lease_expires_at=lease_expires_at
+    )
+
+
+def release_moderation_claims(
+    db: Session,
+    admin_id: int,
+    video_ids: Optional[List[int]] = None
+) -> int:
+    """Return a moderator's claimed videos (all of them by default) to the queue"""
+    
+    query = db.query(VideoContent).filter(VideoContent.claimed_by == admin_id)
+    if video_ids is not None:
+        query = query.filter(VideoContent.id.in_(video_ids))
+    
+    released = query.update(
+        {VideoContent.claimed_by: None, VideoContent.claim_expires_at: None},
+        synchronize_session=False
+    )
+    db.commit()
+    return released
+
+
 def delete_video_content(
     db: Session,
     video_id: int,
@@ -286,12 +592,14 @@ def delete_video_content(
 ) -> bool:
     """Delete or soft-delete video content"""
     
-    video = db.query(VideoContent).filter(VideoContent.id == video_id).first()
+    video = db.query(VideoContent).filter(VideoContent.id == video_id).with_for_update().first()
     if not video:
         return False
     
+    stats_before = video_stats_of([video])
     if permanent:
         # Permanent deletion
+        db.query(VideoTag).filter(VideoTag.video_id == video_id).delete(synchronize_session=False)
         db.delete(video)
     else:
         # Soft delete - mark as deleted
@@ -301,7 +609,12 @@ def delete_video_content(
         video.moderated_at = datetime.utcnow()
         video.updated_at = datetime.utcnow()
     
+    apply_video_stats_delta(db, stats_before, {} if permanent else video_stats_of([video]))
     db.commit()
+    video_detail_cache.invalidate([video_id])
+    
+    if permanent:
+        unindex_video(db, video_id)
     return True
 
 
@@ -311,16 +624,14 @@ def search_videos(
 ) -> List[VideoContentListResponse]:
     """Advanced video search with multiple criteria"""
     
-    query = db.query(VideoContent)
+    query = db.query(*VIDEO_LIST_COLUMNS)
     
-    # Text search
+    # Full-text search, ranked by relevance
+    rank = None
     if search_request.query:
-        text_filter = or_(
-            VideoContent.title.ilike(f"%{search_request.query}%"),
-            VideoContent.description.ilike(f"%{search_request.query}%"),
-            VideoContent.tags.ilike(f"%{search_request.query}%")
-        )
-        query = query.filter(text_filter)
+        text_filter, rank = build_text_search(db, search_request.query)
+        if text_filter is not None:
+            query = query.filter(text_filter)
     
     # Sports filter
     if search_request.sports:
@@ -360,30 +671,18 @@ def search_videos(
     if search_request.min_views:
         query = query.filter(VideoContent.view_count >= search_request.min_views)
     
-    # Tags filter
+    # Tags filter, exact tag matches through the video_tags index
     if search_request.tags:
-        for tag in search_request.tags:
-            query = query.filter(VideoContent.tags.ilike(f"%{tag}%"))
+        query = query.filter(tag_filter(search_request.tags, search_request.tag_match))
+    
+    if rank is not None:
+        query = query.order_by(desc(rank), desc(VideoContent.id))
     
     # Apply limit and get results
     videos = query.limit(search_request.limit).all()
     
     # Convert to response format
-    video_responses = []
-    for video in videos:
-        video_responses.append(VideoContentListResponse(
-            id=video.id,
-            title=video.title,
-            sport=video.sport,
-            category=video.category,
-            status=video.status,
-            moderation_status=video.moderation_status,
-            view_count=video.view_count,
-            duration=video.duration,
-            thumbnail_url=video.thumbnail_url,
-            created_at=video.created_at,
-            published_at=video.published_at
-        ))
+    video_responses = [VideoContentListResponse(**video._mapping) for video in videos]
     
     return video_responses
 
@@ -393,7 +692,11 @@ def get_video_analytics(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None
 ) -> VideoAnalytics:
-    """Get video analytics summary"""
+    """Get video analytics summary
+    
+    Read from the video_daily_stats rollup in one query over the upload days of
+    the range, so the cost grows with the number of days rather than videos.
+    """
     
     # Default date range
     if not end_date:
@@ -401,78 +704,62 @@ def get_video_analytics(
     if not start_date:
         start_date = end_date - timedelta(days=30)
     
-    # Base query for date range
-    base_query = db.query(VideoContent).filter(
-        VideoContent.created_at >= start_date,
-        VideoContent.created_at <= end_date
-    )
-    
-    # Basic counts
-    total_videos = base_query.count()
-    approved_videos = base_query.filter(VideoContent.status == "approved").count()
-    pending_videos = base_query.filter(VideoContent.moderation_status == "unreviewed").count()
-    flagged_videos = base_query.filter(VideoContent.status == "flagged").count()
-    
-    # Engagement metrics
-    total_views = db.query(func.sum(VideoContent.view_count)).scalar() or 0
-    total_duration = db.query(func.sum(VideoContent.duration)).filter(
-        VideoContent.duration.isnot(None)
-    ).scalar() or 0
-    
-    avg_duration = db.query(func.avg(VideoContent.duration)).filter(
-        VideoContent.duration.isnot(None)
-    ).scalar() or 0
-    
-    # Top sports
-    top_sports_data = db.query(
-        VideoContent.sport,
-        func.count(VideoContent.id).label('count'),
-        func.sum(VideoContent.view_count).label('total_views')
-    ).group_by(VideoContent.sport).order_by(func.count(VideoContent.id).desc()).limit(10).all()
-    
-    top_sports = []
-    for sport, count, views in top_sports_data:
-        top_sports.append({
-            "sport": sport,
-            "video_count": count,
-            "total_views": views or 0,
-            "percentage": round((count / total_videos) * 100, 2) if total_videos > 0 else 0
-        })
-    
-    # Top categories
-    top_categories_data = db.query(
-        VideoContent.category,
-        func.count(VideoContent.id).label('count'),
-        func.sum(VideoContent.view_count).label('total_views')
-    ).group_by(VideoContent.category).order_by(func.count(VideoContent.id).desc()).limit(10).all()
-    
-    top_categories = []
-    for category, count, views in top_categories_data:
-        top_categories.append({
-            "category": category,
-            "video_count": count,
-            "total_views": views or 0,
-            "percentage": round((count / total_videos) * 100, 2) if total_videos > 0 else 0
-        })
-    
-    # Upload trend (daily for last 30 days)
-    upload_trend = []
-    for i in range(30):
-        date = (end_date - timedelta(days=i)).date()
-        count = db.query(VideoContent).filter(
-            func.date(VideoContent.created_at) == date
-        ).count()
-        upload_trend.append({
-            "date": date.isoformat(),
-            "uploads": count
-        })
-    upload_trend.reverse()
+    rows = db.query(VideoDailyStats).filter(
+        VideoDailyStats.day >= start_date.date(),
+        VideoDailyStats.day <= end_date.date()
+    ).all()
+    
+    total_videos = approved_videos = pending_videos = flagged_videos = 0
+    total_views = total_likes = total_shares = total_duration = duration_count = 0
+    sports: Dict[str, Tuple[int, int]] = {}
+    categories: Dict[str, Tuple[int, int]] = {}
+    upload_counts: Dict[datetime, int] = {}
+    
+    for row in rows:
+        total_videos += row.uploads
+        approved_videos += row.approved
+        pending_videos += row.unreviewed
+        flagged_videos += row.flagged
+        total_views += row.views
+        total_likes += row.likes
+        total_shares += row.shares
+        total_duration += row.duration_total
+        duration_count += row.duration_count
+        
+        for totals, name in ((sports, row.sport), (categories, row.category)):
+            count, views = totals.get(name, (0, 0))
+            totals[name] = (count + row.uploads, views + row.views)
+        
+        day = datetime.combine(row.day, datetime.min.time())
+        upload_counts[day] = upload_counts.get(day, 0) + row.uploads
+    
+    def top(totals: Dict[str, Tuple[int, int]], label: str) -> List[Dict]:
+        ranked = sorted(
+            ((name, count, views) for name, (count, views) in totals.items() if count > 0),
+            key=lambda item: item[1],
+            reverse=True
+        )[:10]
+        return [
+            {
+                label: name,
+                "video_count": count,
+                "total_views": views,
+                "percentage": round((count / total_videos) * 100, 2) if total_videos > 0 else 0
+            }
+            for name, count, views in ranked
+        ]
+    
+    # Upload trend (daily over the date range, missing days filled with 0)
+    upload_trend = [
+        {"date": bucket.date().isoformat(), "uploads": count}
+        for bucket, count in bucket_series(upload_counts, start_date, end_date, "day")
+    ]
     
     # Engagement metrics
     engagement_metrics = {
         "average_views_per_video": round(total_views / total_videos, 2) if total_videos > 0 else 0,
-        "total_likes": db.query(func.sum(VideoContent.like_count)).scalar() or 0,
-        "total_shares": db.query(func.sum(VideoContent.share_count)).scalar() or 0,
+        "total_likes": total_likes,
+        "total_shares": total_shares,
         "engagement_rate": 0.0  # Would calculate based on views, likes, shares
     }
     
@@ -483,9 +770,9 @@ def get_video_analytics(
         flagged_videos=flagged_videos,
         total_views=total_views,
         total_duration=total_duration,
-        average_duration=round(avg_duration, 2),
-        top_sports=top_sports,
-        top_categories=top_categories,
+        average_duration=round(total_duration / duration_count, 2) if duration_count > 0 else 0.0,
+        top_sports=top(sports, "sport"),
+        top_categories=top(categories, "category"),
         upload_trend=upload_trend,
         engagement_metrics=engagement_metrics
     )
@@ -497,26 +784,103 @@ def update_video_engagement(
     action: str,
     user_id: Optional[int] = None
 ) -> bool:
-    """Update video engagement metrics"""
+    """Record a video engagement event
     
-    video = db.query(VideoContent).filter(VideoContent.id == video_id).first()
-    if not video:
+    The event is queued and written to the event log and the counters by the
+    engagement buffer's next flush; repeat events of the same user within the
+    action's dedup window are not counted. Raises EngagementBufferFull when the
+    buffer cannot accept the event.
+    """
+    
+    exists = db.query(VideoContent.id).filter(VideoContent.id == video_id).first()
+    if not exists:
         return False
     
-    # Update engagement based on action
-    if action == "view":
-        video.view_count += 1
-    elif action == "like":
-        video.like_count += 1
-    elif action == "dislike":
-        video.dislike_count += 1
-    elif action == "share":
-        video.share_count += 1
+    engagement_buffer.record(video_id, action, user_id)
+    return True
+
+
+def _bulk_moderate_chunk(
+    db: Session,
+    video_ids: List[int],
+    action: str,
+    reason: Optional[str],
+    admin_id: Optional[int]
+) -> List[int]:
+    """Moderate one chunk of videos with one UPDATE and one INSERT; returns updated ids"""
+    
+    now = datetime.utcnow()
+    values = {
+        "moderation_reason": reason,
+        "moderated_by": admin_id,
+        "moderated_at": now,
+        "claimed_by": None,
+        "claim_expires_at": None,
+        "updated_at": now
+    }
+    if action in MODERATION_ACTIONS:
+        moderation_status, video_status, published = MODERATION_ACTIONS[action]
+        values.update(
+            moderation_status=moderation_status,
+            status=video_status,
+            published_at=now if published else None
+        )
     
-    video.updated_at = datetime.utcnow()
+    stats_before = video_stats_snapshot(db, video_ids, lock=True)
+    
+    if db.get_bind().dialect.name == "postgresql":
+        # Lock the target rows and return their status from before the update
+        previous = select(
+            VideoContent.id,
+            VideoContent.moderation_status.label("previous_status")
+        ).where(VideoContent.id.in_(video_ids)).with_for_update().subquery()
+        
+        updated = db.execute(
+            update(VideoContent)
+            .where(VideoContent.id == previous.c.id)
+            .values(**values)
+            .returning(VideoContent.id, previous.c.previous_status, VideoContent.moderation_status),
+            execution_options={"synchronize_session": False}
+        ).all()
+    else:
+        # SQLite cannot return columns of the UPDATE ... FROM subquery, read them first
+        previous = dict(db.execute(
+            select(VideoContent.id, VideoContent.moderation_status)
+            .where(VideoContent.id.in_(video_ids))
+        ).all())
+        
+        updated = [
+            (video_id, previous[video_id], new_status)
+            for video_id, new_status in db.execute(
+                update(VideoContent)
+                .where(VideoContent.id.in_(video_ids))
+                .values(**values)
+                .returning(VideoContent.id, VideoContent.moderation_status),
+                execution_options={"synchronize_session": False}
+            ).all()
+        ]
+    
+    if updated:
+        db.execute(insert(VideoModerationLog).values([
+            {
+                "video_id": video_id,
+                "admin_id": admin_id,
+                "action": action,
+                "reason": reason,
+                "previous_status": previous_status,
+                "new_status": new_status
+            }
+            for video_id, previous_status, new_status in updated
+        ]))
+        apply_video_stats_delta(
+            db,
+            stats_before,
+            video_stats_snapshot(db, [video_id for video_id, _, _ in updated])
+        )
     
     db.commit()
-    return True
+    video_detail_cache.invalidate([video_id for video_id, _, _ in updated])
+    return [video_id for video_id, _, _ in updated]
 
 
 def bulk_moderate_videos(
@@ -526,28 +890,24 @@ def bulk_moderate_videos(
     reason: Optional[str] = None,
     admin_id: int = None
 ) -> Dict[str, List[int]]:
-    """Perform bulk moderation on multiple videos"""
+    """Perform bulk moderation on multiple videos
     
-    processed = []
-    failed = []
+    Videos are moderated set-based in chunks of BULK_MODERATION_CHUNK_SIZE, each
+    chunk in its own transaction. Ids that do not exist, or whose chunk failed,
+    are reported as failed.
+    """
     
-    for video_id in video_ids:
+    unique_ids = list(dict.fromkeys(video_ids))
+    moderated = set()
+    
+    for start in range(0, len(unique_ids), BULK_MODERATION_CHUNK_SIZE):
+        chunk = unique_ids[start:start + BULK_MODERATION_CHUNK_SIZE]
         try:
-            success = moderate_video(
-                db=db,
-                video_id=video_id,
-                action=action,
-                reason=reason,
-                admin_id=admin_id
-            )
-            if success:
-                processed.append(video_id)
-            else:
-                failed.append(video_id)
+            moderated.update(_bulk_moderate_chunk(db, chunk, action, reason, admin_id))
         except Exception:
-            failed.append(video_id)
+            db.rollback()
     
     return {
-        "processed": processed,
-        "failed": failed
-    }
\ No newline at end of file
+        "processed": [video_id for video_id in video_ids if video_id in moderated],
+        "failed": [video_id for video_id in video_ids if video_id not in moderated]
+    }
@@ -0,0 +1,170 @@
+"""
+Streaming video catalog export
+
+Exports run the admin video list query without pagination and stream the
+result as CSV, NDJSON or Parquet. Rows are read with yield_per, which uses a
+server-side cursor on PostgreSQL, and each batch of VIDEO_EXPORT_BATCH_SIZE
+rows is encoded and handed to the response before the next one is fetched, so
+memory use does not depend on the number of rows exported. Parquet needs the
+optional pyarrow package and writes one row group per batch.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional
+from sqlalchemy import BigInteger, DateTime, Float, Integer, select
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import VideoContent
+from app.services.video_content_service import video_filter_clauses, video_order_by, video_sort
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Exported columns; the claim lease columns are internal to the moderation queue
+VIDEO_EXPORT_COLUMNS = tuple(
+    column for column in VideoContent.__table__.columns
+    if column.name not in ("claimed_by", "claim_expires_at")
+)
+
+
+def check_export_format(format: str) -> None:
+    """Raise ValueError for formats that cannot be exported"""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{format}', use csv, ndjson or parquet")
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export requires the pyarrow package")
+
+
+def export_filename(format: str) -> str:
+    return f"videos_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+
+
+def _tags(value: Optional[str]) -> List[str]:
+    return json.loads(value) if value else []
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([column.name for column in VIDEO_EXPORT_COLUMNS])
+    # tags stay a JSON list, which the bulk import reads back
+    writer.writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(rows) -> bytes:
+    names = [column.name for column in VIDEO_EXPORT_COLUMNS]
+    lines = []
+    for row in rows:
+        record = dict(zip(names, row))
+        record["tags"] = _tags(record["tags"])
+        lines.append(json.dumps(record, default=_export_value))
+    return ("\n".join(lines) + "\n").encode()
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write target of the Parquet writer that keeps only bytes not yet streamed"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _parquet_schema(pa):
+    fields = []
+    for column in VIDEO_EXPORT_COLUMNS:
+        if column.name == "tags":
+            data_type = pa.list_(pa.string())
+        elif isinstance(column.type, (Integer, BigInteger)):
+            data_type = pa.int64()
+        elif isinstance(column.type, Float):
+            data_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            data_type = pa.timestamp("us", tz="UTC")
+        else:
+            data_type = pa.string()
+        fields.append(pa.field(column.name, data_type))
+    return pa.schema(fields)
+
+
+def stream_video_export(
+    format: str = "csv",
+    search: Optional[str] = None,
+    sport: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    moderation_status: Optional[str] = None,
+    difficulty_level: Optional[str] = None,
+    sort_by: str = "created_at",
+    sort_order: str = "desc",
+    session_factory=SessionLocal
+) -> Iterator[bytes]:
+    """Encoded chunks of all videos matching the admin list filters
+
+    Uses a session of its own, as the response is streamed after the request's
+    dependencies have been closed.
+    """
+    db = session_factory()
+    writer = None
+    try:
+        sort_by, sort_order = video_sort(sort_by, sort_order)
+        query = select(*VIDEO_EXPORT_COLUMNS).where(*video_filter_clauses(
+            db, search, sport, category, status, moderation_status, difficulty_level
+        )).order_by(*video_order_by(sort_by, sort_order))
+        result = db.execute(query.execution_options(yield_per=settings.VIDEO_EXPORT_BATCH_SIZE))
+
+        if format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = _parquet_schema(pa)
+            sink = _ParquetSink()
+            writer = pq.ParquetWriter(sink, schema)
+            for rows in result.partitions():
+                columns = dict(zip(schema.names, zip(*rows)))
+                columns["tags"] = [_tags(value) for value in columns["tags"]]
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                yield sink.drain()
+            writer.close()
+            writer = None
+            yield sink.drain()
+            return
+
+        header = format == "csv"
+        for rows in result.partitions():
+            yield _encode_csv(rows, header) if format == "csv" else _encode_ndjson(rows)
+            header = False
+        if header:
+            # No rows, still a valid CSV file
+            yield _encode_csv([], header)
+    finally:
+        if writer is not None:
+            writer.close()
+        db.close()
@@ -0,0 +1,415 @@
+"""
+Bulk video catalog import
+
+An import job streams a CSV or NDJSON file of VideoContentCreate records and
+works through it in chunks of VIDEO_IMPORT_CHUNK_SIZE rows. Each chunk is
+validated row by row, the valid rows are loaded with COPY on PostgreSQL (a
+multi-row INSERT elsewhere) together with their tags and rollup deltas, and the
+row errors and the job's progress are written in the same transaction. A
+failed or interrupted import therefore resumes exactly after its last
+committed chunk. Imported videos are approved like admin uploads; their related
+video lists are computed by the next rebuild_related_videos run.
+"""
+
+import asyncio
+import csv
+import io
+import itertools
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncIterator, Iterator, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import and_, func, insert, or_, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.models import VideoContent, VideoImportError, VideoImportJob, VideoTag
+from app.schemas.video_content import VideoContentCreate, VideoImportRowError
+from app.services.video_content_service import _normalize_tags
+from app.services.video_search_service import index_video
+from app.services.video_stats_service import apply_video_stats_delta, video_stats_of
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+# Raised by database drivers for rows the database rejects, e.g. out of range values
+ROW_LOAD_ERRORS = (DBAPIError, OverflowError)
+
+# Input row: (row_number, parsed record or the reason it could not be parsed)
+ImportRecord = Tuple[int, Union[dict, str]]
+
+
+def import_format_for(filename: Optional[str], format: Optional[str] = None) -> str:
+    """Resolve the format of an import file from an explicit format or its extension"""
+    if format:
+        if format not in IMPORT_FORMATS.values():
+            raise ValueError(f"Unsupported import format '{format}', use csv or ndjson")
+        return format
+    suffix = Path(filename or "").suffix.lower()
+    if suffix not in IMPORT_FORMATS:
+        raise ValueError("Cannot tell the import format from the file name, pass format=csv or format=ndjson")
+    return IMPORT_FORMATS[suffix]
+
+
+async def save_import_file(chunks: AsyncIterator[bytes], format: str) -> str:
+    """Stream an uploaded import file into VIDEO_IMPORT_DIR; returns its path"""
+    directory = Path(settings.VIDEO_IMPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4()}.{format}"
+    with open(path, "wb") as f:
+        async for chunk in chunks:
+            await asyncio.to_thread(f.write, chunk)
+    return str(path)
+
+
+def create_video_import(db: Session, source_path: str, format: str, admin_id: Optional[int]) -> VideoImportJob:
+    """Register an import of a file; run it with run_video_import"""
+    job = VideoImportJob(
+        id=str(uuid.uuid4()),
+        source_path=source_path,
+        format=format,
+        status="pending",
+        rows_processed=0,
+        rows_imported=0,
+        rows_failed=0,
+        created_by=admin_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_video_import(db: Session, job_id: str) -> Optional[VideoImportJob]:
+    """Get an import job with its progress"""
+    return db.get(VideoImportJob, job_id)
+
+
+def get_video_import_errors(
+    db: Session,
+    job_id: str,
+    offset: int = 0,
+    limit: int = 100
+) -> List[VideoImportRowError]:
+    """Row errors of an import in input order"""
+    rows = db.query(VideoImportError.row_number, VideoImportError.errors).filter(
+        VideoImportError.job_id == job_id
+    ).order_by(VideoImportError.row_number).offset(offset).limit(limit).all()
+    return [
+        VideoImportRowError(row_number=row_number, errors=json.loads(errors))
+        for row_number, errors in rows
+    ]
+
+
+def import_resumable(job: VideoImportJob) -> bool:
+    """Whether run_video_import may (re)start the job now"""
+    if job.status in ("pending", "failed"):
+        return True
+    if job.status != "running":
+        return False
+    # A running import whose worker stopped making progress
+    return job.updated_at is None or job.updated_at.replace(tzinfo=None) < _lease_cutoff()
+
+
+def _lease_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.VIDEO_IMPORT_LEASE_SECONDS)
+
+
+def _csv_record(record: dict) -> dict:
+    """CSV cells as VideoContentCreate input: blanks are unset, tags are a
+    JSON list or comma-separated"""
+    parsed = {}
+    for key, value in record.items():
+        if key is None or value is None:
+            continue
+        key, value = key.strip(), value.strip()
+        if not value:
+            continue
+        if key == "tags":
+            value = json.loads(value) if value.startswith("[") else value.split(",")
+        parsed[key] = value
+    return parsed
+
+
+def _read_records(path: str, format: str) -> Iterator[ImportRecord]:
+    """Records of an import file in order, with 1-based row numbers"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if format == "csv":
+            for row_number, record in enumerate(csv.DictReader(f), start=1):
+                try:
+                    yield row_number, _csv_record(record)
+                except json.JSONDecodeError as e:
+                    yield row_number, f"tags: Invalid JSON list ({e.msg})"
+            return
+
+        row_number = 0
+        for line in f:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, f"Invalid JSON ({e.msg})"
+
+
+def _validate(record: Union[dict, str]) -> Tuple[Optional[VideoContentCreate], List[str]]:
+    if isinstance(record, str):
+        return None, [record]
+    try:
+        return VideoContentCreate.model_validate(record), []
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in e.errors()
+        ]
+
+
+def _video_row(video: VideoContentCreate, admin_id: Optional[int], now: datetime) -> dict:
+    """video_content values of an imported video, as create_video_content stores them"""
+    tags = _normalize_tags(video.tags)
+    return {
+        "title": video.title,
+        "description": video.description,
+        "file_url": video.file_url,
+        "thumbnail_url": video.thumbnail_url,
+        "duration": video.duration,
+        "file_size": video.file_size,
+        "sport": video.sport,
+        "category": video.category,
+        "difficulty_level": video.difficulty_level,
+        "tags": json.dumps(tags) if tags else None,
+        "upload_source": video.upload_source,
+        "uploaded_by": admin_id,
+        "status": "approved",  # Admin imports are auto-approved
+        "moderation_status": "approved",
+        "moderated_by": admin_id,
+        "moderated_at": now,
+        "view_count": 0,
+        "like_count": 0,
+        "dislike_count": 0,
+        "share_count": 0,
+        "trending_score": 0.0,
+        "created_at": now,
+        "published_at": now,
+    }
+
+
+def _copy_value(value) -> str:
+    """A value in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_rows(db: Session, table: str, columns: List[str], rows: List[dict]) -> None:
+    """Load rows into a table with COPY FROM STDIN on the session's connection"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    except db.get_bind().dialect.dbapi.Error as e:
+        # Raw cursor errors are not wrapped by SQLAlchemy
+        raise DBAPIError(statement, None, e) from e
+    finally:
+        cursor.close()
+
+
+def _insert_videos(db: Session, rows: List[dict], use_copy: bool) -> List[int]:
+    """Insert video rows and their tags (without committing); returns the new ids"""
+    if use_copy:
+        ids = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('video_content', 'id')) FROM generate_series(1, :count)"),
+            {"count": len(rows)}
+        ).scalars().all()
+        for video_id, row in zip(ids, rows):
+            row["id"] = video_id
+        _copy_rows(db, "video_content", list(rows[0]), rows)
+    else:
+        # Core insert: the ORM bulk path runs RETURNING executemany row by row
+        table = VideoContent.__table__
+        ids = db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+        for video_id, row in zip(ids, rows):
+            row["id"] = video_id
+
+    tag_rows = [
+        {"video_id": row["id"], "tag": tag, "position": position}
+        for row in rows
+        for position, tag in enumerate(json.loads(row["tags"]) if row["tags"] else [])
+    ]
+    if tag_rows:
+        if use_copy:
+            _copy_rows(db, "video_tags", ["video_id", "tag", "position"], tag_rows)
+        else:
+            db.execute(insert(VideoTag.__table__), tag_rows)
+    return ids
+
+
+def _load_rows_one_by_one(db: Session, rows: List[Tuple[int, dict]]) -> Tuple[List[dict], List[dict]]:
+    """Insert rows each in its own savepoint, turning database errors into row errors"""
+    loaded, errors = [], []
+    for row_number, row in rows:
+        try:
+            with db.begin_nested():
+                _insert_videos(db, [row], use_copy=False)
+            loaded.append(row)
+        except ROW_LOAD_ERRORS as e:
+            message = str(getattr(e, "orig", None) or e).strip().splitlines()[0]
+            errors.append({"row_number": row_number, "errors": [f"database: {message}"]})
+    return loaded, errors
+
+
+def _import_chunk(
+    db: Session,
+    job_id: str,
+    admin_id: Optional[int],
+    offset: int,
+    records: List[ImportRecord]
+) -> None:
+    """Validate and load one chunk and advance the job, all in one transaction"""
+    now = datetime.utcnow()
+    rows: List[Tuple[int, dict]] = []
+    errors: List[dict] = []
+    for row_number, record in records:
+        video, messages = _validate(record)
+        if video is None:
+            errors.append({"row_number": row_number, "errors": messages})
+        else:
+            rows.append((row_number, _video_row(video, admin_id, now)))
+
+    loaded = [row for _, row in rows]
+    if rows:
+        try:
+            with db.begin_nested():
+                _insert_videos(db, loaded, use_copy=db.get_bind().dialect.name == "postgresql")
+        except ROW_LOAD_ERRORS:
+            # Find the offending rows; the rest of the chunk is still imported
+            for _, row in rows:
+                row.pop("id", None)
+            loaded, row_errors = _load_rows_one_by_one(db, rows)
+            errors = sorted(errors + row_errors, key=lambda error: error["row_number"])
+        apply_video_stats_delta(db, {}, video_stats_of(SimpleNamespace(**row) for row in loaded))
+
+    if errors:
+        db.execute(insert(VideoImportError), [
+            {"job_id": job_id, "row_number": error["row_number"], "errors": json.dumps(error["errors"])}
+            for error in errors
+        ])
+
+    # Only the worker that read from this offset may advance the job
+    advanced = db.execute(
+        update(VideoImportJob).where(
+            VideoImportJob.id == job_id,
+            VideoImportJob.rows_processed == offset
+        ).values(
+            rows_processed=VideoImportJob.rows_processed + len(records),
+            rows_imported=VideoImportJob.rows_imported + len(loaded),
+            rows_failed=VideoImportJob.rows_failed + len(errors),
+            updated_at=func.now()
+        )
+    )
+    if advanced.rowcount != 1:
+        raise RuntimeError("Import was resumed by another worker")
+    db.commit()
+
+    for row in loaded:
+        index_video(db, SimpleNamespace(**row))
+
+
+def _claim_import(db: Session, job_id: str) -> bool:
+    """Mark an import running unless another worker is making progress on it"""
+    result = db.execute(
+        update(VideoImportJob).where(
+            VideoImportJob.id == job_id,
+            or_(
+                VideoImportJob.status.in_(("pending", "failed")),
+                and_(VideoImportJob.status == "running", VideoImportJob.updated_at < _lease_cutoff())
+            )
+        ).values(status="running", error_message=None, updated_at=func.now())
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _remove_uploaded_file(path: str) -> None:
+    """Drop an import file once done with it, if it was uploaded into VIDEO_IMPORT_DIR"""
+    source = Path(path).resolve()
+    if source.parent == Path(settings.VIDEO_IMPORT_DIR).resolve():
+        source.unlink(missing_ok=True)
+
+
+def run_video_import(db: Session, job_id: str) -> Optional[VideoImportJob]:
+    """Run an import from its first unprocessed row to the end of the file
+
+    Returns None when the job does not exist and raises ValueError when it is
+    completed or running elsewhere. Errors of a chunk mark the job failed, and
+    are re-raised; running the job again resumes it.
+    """
+    job = db.get(VideoImportJob, job_id)
+    if job is None:
+        return None
+    if not _claim_import(db, job_id):
+        raise ValueError(f"Import is already {job.status}")
+    db.refresh(job)
+
+    offset = job.rows_processed
+    try:
+        records = itertools.islice(_read_records(job.source_path, job.format), offset, None)
+        while chunk := list(itertools.islice(records, settings.VIDEO_IMPORT_CHUNK_SIZE)):
+            _import_chunk(db, job_id, job.created_by, offset, chunk)
+            offset += len(chunk)
+
+        job.status = "completed"
+        job.completed_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        db.execute(
+            update(VideoImportJob).where(VideoImportJob.id == job_id).values(
+                status="failed", error_message=str(e), updated_at=func.now()
+            )
+        )
+        db.commit()
+        raise
+
+    _remove_uploaded_file(job.source_path)
+    db.refresh(job)
+    return job
+
+
+def run_video_import_job(job_id: str) -> None:
+    """Run an import on a session of its own, for background tasks"""
+    db = SessionLocal()
+    try:
+        run_video_import(db, job_id)
+    except Exception:
+        logger.exception("Video import %s failed", job_id)
+    finally:
+        db.close()
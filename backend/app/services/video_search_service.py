@@ -0,0 +1,230 @@
+"""
+Video full-text search service
+
+On PostgreSQL, search runs against the generated ``video_content.search_vector``
+tsvector column and its GIN index. Other databases (SQLite in development and
+tests) use an in-process inverted index that is kept up to date by the video
+write paths.
+
+The fallback index only sees the writes of its own process, so it is meant
+for a single worker: with several workers, each one's search results miss the
+videos written through the others until it restarts. Deployments running more
+than one worker use PostgreSQL.
+"""
+
+import bisect
+import json
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Set
+from sqlalchemy.orm import Session
+from sqlalchemy import case, false, func, literal_column
+
+from app.models.models import VideoContent
+
+
+# Field weights of the in-process index, mirroring the A/B/C weights of the tsvector
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "description": 1.0}
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens"""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _parse_tags(tags) -> List[str]:
+    """Accept tags as a list or as the JSON string stored on VideoContent"""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except json.JSONDecodeError:
+            return [tags]
+    return [str(tag) for tag in tags]
+
+
+class VideoSearchIndex:
+    """In-process inverted index over video title, tags and description
+
+    Scores documents with BM25 using per-field weighted term frequencies.
+    Every query term is matched as a prefix, and all terms must match.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms: List[str] = []  # Sorted vocabulary for prefix lookups
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def load(self, db: Session) -> None:
+        """(Re)build the index from the video_content table"""
+        rows = db.query(
+            VideoContent.id,
+            VideoContent.title,
+            VideoContent.description,
+            VideoContent.tags
+        ).yield_per(1000)
+
+        with self._lock:
+            self._postings.clear()
+            self._terms.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0.0
+            for video_id, title, description, tags in rows:
+                self._add(video_id, title, description, tags)
+            self.loaded = True
+
+    def add(self, video_id: int, title: Optional[str], description: Optional[str], tags=None) -> None:
+        """Index a video, replacing any previous entry for it"""
+        with self._lock:
+            self._remove(video_id)
+            self._add(video_id, title, description, tags)
+
+    def remove(self, video_id: int) -> None:
+        """Drop a video from the index"""
+        with self._lock:
+            self._remove(video_id)
+
+    def search(self, query: str) -> Dict[int, float]:
+        """Return {video_id: score} for videos matching every query term"""
+        tokens = tokenize(query)
+        if not tokens:
+            return {}
+
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return {}
+            avg_length = self._total_length / doc_count
+
+            scores: Optional[Dict[int, float]] = None
+            for token in set(tokens):
+                token_scores: Dict[int, float] = {}
+                for term in self._expand_prefix(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for video_id, tf in postings.items():
+                        norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[video_id] / avg_length)
+                        token_scores[video_id] = token_scores.get(video_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        video_id: score + token_scores[video_id]
+                        for video_id, score in scores.items()
+                        if video_id in token_scores
+                    }
+                if not scores:
+                    return {}
+
+            return scores
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        end = start
+        while end < len(self._terms) and self._terms[end].startswith(prefix):
+            end += 1
+        return self._terms[start:end]
+
+    def _add(self, video_id, title, description, tags) -> None:
+        fields = {
+            "title": tokenize(title),
+            "tags": [token for tag in _parse_tags(tags) for token in tokenize(tag)],
+            "description": tokenize(description),
+        }
+
+        length = 0.0
+        doc_terms = set()
+        for field, tokens in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            length += weight * len(tokens)
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    bisect.insort(self._terms, token)
+                postings[video_id] = postings.get(video_id, 0.0) + weight
+                doc_terms.add(token)
+
+        self._doc_terms[video_id] = doc_terms
+        self._doc_lengths[video_id] = length
+        self._total_length += length
+
+    def _remove(self, video_id: int) -> None:
+        length = self._doc_lengths.pop(video_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+
+        for term in self._doc_terms.pop(video_id):
+            postings = self._postings[term]
+            del postings[video_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+
+# Fallback index shared by the process
+search_index = VideoSearchIndex()
+
+
+def uses_postgres_search(db: Session) -> bool:
+    """Whether the session is bound to PostgreSQL and can use the tsvector column"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def build_text_search(db: Session, query: str):
+    """Build (match_clause, rank_expression) for a free-text query
+
+    Returns (None, None) when the query contains no searchable terms.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None, None
+
+    if uses_postgres_search(db):
+        # Every term is a prefix match, all terms are required
+        ts_query = func.to_tsquery("english", " & ".join(f"{token}:*" for token in tokens))
+        search_vector = literal_column("video_content.search_vector")
+        return search_vector.op("@@")(ts_query), func.ts_rank_cd(search_vector, ts_query)
+
+    if not search_index.loaded:
+        search_index.load(db)
+
+    scores = search_index.search(query)
+    if not scores:
+        return false(), None
+
+    rank = case(scores, value=VideoContent.id, else_=0.0)
+    return VideoContent.id.in_(list(scores)), rank
+
+
+def index_video(db: Session, video: VideoContent) -> None:
+    """Refresh a video in the fallback index after it was written"""
+    if uses_postgres_search(db) or not search_index.loaded:
+        return
+    search_index.add(video.id, video.title, video.description, video.tags)
+
+
+def unindex_video(db: Session, video_id: int) -> None:
+    """Remove a permanently deleted video from the fallback index"""
+    if uses_postgres_search(db) or not search_index.loaded:
+        return
+    search_index.remove(video_id)
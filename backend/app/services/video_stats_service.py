@@ -0,0 +1,157 @@
+"""
+Incrementally maintained daily video rollup
+
+video_daily_stats holds, per upload day x sport x category, the totals that the
+video analytics summary reports. Every write to video_content computes what the
+touched videos contributed before and after the write and applies the
+difference with an atomic upsert in the same transaction, so the rollup never
+needs a rescan. rebuild_video_daily_stats recomputes it from scratch.
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import cast, delete, func, insert, select, text, Date
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.models import VideoContent, VideoDailyStats
+
+# (day, sport, category)
+StatsKey = Tuple[date, str, str]
+
+ROLLUP_COUNTERS = (
+    "uploads",
+    "approved",
+    "unreviewed",
+    "flagged",
+    "views",
+    "likes",
+    "shares",
+    "duration_total",
+    "duration_count",
+)
+
+# Columns of video_content a video's contribution is computed from
+_CONTRIBUTION_COLUMNS = (
+    VideoContent.created_at,
+    VideoContent.sport,
+    VideoContent.category,
+    VideoContent.status,
+    VideoContent.moderation_status,
+    VideoContent.view_count,
+    VideoContent.like_count,
+    VideoContent.share_count,
+    VideoContent.duration,
+)
+
+
+def video_stats_of(videos: Iterable) -> Dict[StatsKey, Dict[str, int]]:
+    """Rollup contribution of videos (entities or rows with the video columns)"""
+    stats: Dict[StatsKey, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(ROLLUP_COUNTERS, 0))
+    for video in videos:
+        if video.created_at is None:
+            continue
+        counters = stats[(video.created_at.date(), video.sport, video.category)]
+        counters["uploads"] += 1
+        counters["approved"] += video.status == "approved"
+        counters["unreviewed"] += video.moderation_status == "unreviewed"
+        counters["flagged"] += video.status == "flagged"
+        counters["views"] += video.view_count or 0
+        counters["likes"] += video.like_count or 0
+        counters["shares"] += video.share_count or 0
+        if video.duration is not None:
+            counters["duration_total"] += video.duration
+            counters["duration_count"] += 1
+    return dict(stats)
+
+
+def video_stats_snapshot(
+    db: Session,
+    video_ids: List[int],
+    lock: bool = False
+) -> Dict[StatsKey, Dict[str, int]]:
+    """Current rollup contribution of the given videos
+
+    Take the snapshot before a write with lock=True, so a concurrent writer of
+    the same videos waits and then computes its difference from our result.
+    """
+    if not video_ids:
+        return {}
+    query = select(*_CONTRIBUTION_COLUMNS).where(VideoContent.id.in_(video_ids))
+    if lock:
+        query = query.with_for_update()
+    return video_stats_of(db.execute(query).all())
+
+
+def _upsert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(VideoDailyStats)
+    return sqlite.insert(VideoDailyStats)
+
+
+def apply_video_stats_delta(
+    db: Session,
+    before: Dict[StatsKey, Dict[str, int]],
+    after: Dict[StatsKey, Dict[str, int]]
+) -> None:
+    """Add the difference between two contributions to the rollup (without committing)"""
+    rows = []
+    for key in before.keys() | after.keys():
+        old = before.get(key, {})
+        new = after.get(key, {})
+        delta = {counter: new.get(counter, 0) - old.get(counter, 0) for counter in ROLLUP_COUNTERS}
+        if any(delta.values()):
+            day, sport, category = key
+            rows.append({"day": day, "sport": sport, "category": category, **delta})
+    if not rows:
+        return
+
+    # Keys are locked in a fixed order so concurrent writers cannot deadlock
+    rows.sort(key=lambda row: (row["day"], row["sport"], row["category"]))
+    statement = _upsert(db).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["day", "sport", "category"],
+        set_={
+            counter: getattr(VideoDailyStats, counter) + statement.excluded[counter]
+            for counter in ROLLUP_COUNTERS
+        }
+    ))
+
+
+def _created_day(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(VideoContent.created_at, Date)
+    return func.date(VideoContent.created_at)
+
+
+def rebuild_video_daily_stats(db: Session) -> int:
+    """Recompute video_daily_stats from video_content; returns the number of rows"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Writers apply their deltas after this rebuild commits, on top of it
+        db.execute(text("LOCK TABLE video_daily_stats IN EXCLUSIVE MODE"))
+
+    day = _created_day(db)
+    aggregate = select(
+        day,
+        VideoContent.sport,
+        VideoContent.category,
+        func.count(VideoContent.id),
+        func.count(VideoContent.id).filter(VideoContent.status == "approved"),
+        func.count(VideoContent.id).filter(VideoContent.moderation_status == "unreviewed"),
+        func.count(VideoContent.id).filter(VideoContent.status == "flagged"),
+        func.coalesce(func.sum(VideoContent.view_count), 0),
+        func.coalesce(func.sum(VideoContent.like_count), 0),
+        func.coalesce(func.sum(VideoContent.share_count), 0),
+        func.coalesce(func.sum(VideoContent.duration), 0),
+        func.count(VideoContent.duration)
+    ).where(
+        VideoContent.created_at.is_not(None)
+    ).group_by(day, VideoContent.sport, VideoContent.category)
+
+    db.execute(delete(VideoDailyStats))
+    result = db.execute(
+        insert(VideoDailyStats).from_select(["day", "sport", "category", *ROLLUP_COUNTERS], aggregate)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,350 @@
+"""
+Streaming, resumable video uploads to local storage
+
+An upload session is a ``<upload_id>.part`` data file plus a ``<upload_id>.json``
+sidecar with the video metadata in VIDEO_UPLOAD_DIR. Request bodies are streamed
+to the part file in UPLOAD_CHUNK_SIZE writes while a SHA-256 digest and the size
+are computed, so memory stays flat whatever the file size. Clients resume an
+interrupted upload by sending the remaining bytes at the session's offset.
+Completed files are stored content-addressed as ``<sha256><ext>`` in
+VIDEO_STORAGE_DIR.
+
+The digest is kept as the video's unique content_hash, so completing an upload
+of content that is already stored returns the existing video instead of a
+copy. Videos stored before hashes were recorded are matched by size and a
+fingerprint of their first and last chunk before any of them is hashed in full.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import VideoContent
+from app.schemas.video_content import (
+    VideoContentCreate,
+    VideoContentResponse,
+    VideoUploadSessionCreate,
+    VideoUploadSessionResponse
+)
+from app.services.video_content_service import create_video_content, get_video_by_id
+
+# URL prefix of files kept in VIDEO_STORAGE_DIR
+STORAGE_URL_PREFIX = "/storage/videos/"
+
+# Running digests of in-progress uploads: upload_id -> (offset, sha256)
+_hashers: Dict[str, Tuple[int, Any]] = {}
+_session_locks: Dict[str, asyncio.Lock] = {}
+
+
+class UploadOffsetMismatch(ValueError):
+    """A chunk was sent for an offset other than the session's current one"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload offset mismatch, expected offset {expected}")
+        self.expected = expected
+
+
+def _upload_dir() -> Path:
+    path = Path(settings.VIDEO_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _storage_dir() -> Path:
+    path = Path(settings.VIDEO_STORAGE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _part_path(upload_id: str) -> Path:
+    return _upload_dir() / f"{upload_id}.part"
+
+
+def _meta_path(upload_id: str) -> Path:
+    return _upload_dir() / f"{upload_id}.json"
+
+
+def storage_path_for(file_url: Optional[str]) -> Optional[Path]:
+    """Resolve the file_url of a locally stored video to its path on disk"""
+    if not file_url or not file_url.startswith(STORAGE_URL_PREFIX):
+        return None
+    name = file_url[len(STORAGE_URL_PREFIX):]
+    if not name or "/" in name or name.startswith("."):
+        return None
+    return Path(settings.VIDEO_STORAGE_DIR) / name
+
+
+def _load_session(upload_id: str, admin_id: int) -> Optional[dict]:
+    """The session of an upload started by admin_id; other admins' uploads are not found"""
+    try:
+        uuid.UUID(upload_id)
+    except ValueError:
+        return None
+    try:
+        session = json.loads(_meta_path(upload_id).read_text())
+    except FileNotFoundError:
+        return None
+    if session.get("admin_id") != admin_id:
+        return None
+    return session
+
+
+def _session_response(session: dict, offset: int) -> VideoUploadSessionResponse:
+    return VideoUploadSessionResponse(
+        upload_id=session["upload_id"],
+        offset=offset,
+        total_size=session.get("total_size"),
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        created_at=session["created_at"]
+    )
+
+
+def create_upload_session(upload_data: VideoUploadSessionCreate, admin_id: int) -> VideoUploadSessionResponse:
+    """Start a new resumable upload"""
+    upload_id = str(uuid.uuid4())
+    session = {
+        "upload_id": upload_id,
+        "admin_id": admin_id,
+        "metadata": upload_data.model_dump(exclude={"total_size"}),
+        "total_size": upload_data.total_size,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    _part_path(upload_id).touch()
+    _meta_path(upload_id).write_text(json.dumps(session))
+    return _session_response(session, 0)
+
+
+def get_upload_session(upload_id: str, admin_id: int) -> Optional[VideoUploadSessionResponse]:
+    """Get the state of an upload, including the offset to resume from"""
+    session = _load_session(upload_id, admin_id)
+    if not session:
+        return None
+    path = _part_path(upload_id)
+    return _session_response(session, path.stat().st_size if path.exists() else session["stored"]["size"])
+
+
+def _rehash(path: Path) -> Tuple[int, Any]:
+    """Rebuild the running digest of a part file, e.g. after a restart"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest
+
+
+def file_content_hash(path) -> str:
+    """SHA-256 hex digest of a whole file"""
+    return _rehash(Path(path))[1].hexdigest()
+
+
+def file_fingerprint(path) -> str:
+    """Cheap prefilter for content_hash: digest of the size and the first and last chunk"""
+    chunk_size = settings.UPLOAD_CHUNK_SIZE
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(chunk_size))
+        if size > chunk_size:
+            f.seek(max(size - chunk_size, chunk_size))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def find_video_by_content(db: Session, content_hash: str, path: Path) -> Optional[VideoContent]:
+    """The video already holding the content of the file at path, if any
+
+    Videos without a content_hash yet are only hashed when their stored file has
+    the same size and fingerprint; a match gets its hash recorded on the way.
+    """
+    video = db.query(VideoContent).filter(VideoContent.content_hash == content_hash).first()
+    if video:
+        return video
+
+    fingerprint = None
+    candidates = db.query(VideoContent.id, VideoContent.file_url).filter(
+        VideoContent.content_hash.is_(None),
+        VideoContent.file_size == path.stat().st_size,
+        VideoContent.file_url.startswith(STORAGE_URL_PREFIX)
+    ).order_by(VideoContent.id).all()
+    for video_id, file_url in candidates:
+        stored = storage_path_for(file_url)
+        if not stored or not stored.is_file():
+            continue
+        fingerprint = fingerprint or file_fingerprint(path)
+        if file_fingerprint(stored) != fingerprint or file_content_hash(stored) != content_hash:
+            continue
+        video = db.get(VideoContent, video_id)
+        video.content_hash = content_hash
+        db.commit()
+        return video
+    return None
+
+
+async def append_upload_chunks(
+    upload_id: str,
+    admin_id: int,
+    offset: int,
+    chunks: AsyncIterator[bytes]
+) -> Optional[VideoUploadSessionResponse]:
+    """Stream bytes into an upload of admin_id at the given offset
+
+    Returns None when the upload does not exist and raises UploadOffsetMismatch
+    when offset is not the current size of the upload.
+    """
+    if not _load_session(upload_id, admin_id):
+        return None
+
+    lock = _session_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        # Read again under the lock, a completion may have finished meanwhile
+        session = _load_session(upload_id, admin_id)
+        if not session:
+            return None
+        if "stored" in session and not _part_path(upload_id).exists():
+            # Already moved into storage by a completion whose insert failed
+            raise UploadOffsetMismatch(session["stored"]["size"])
+
+        path = _part_path(upload_id)
+        current = path.stat().st_size
+        if offset != current:
+            raise UploadOffsetMismatch(current)
+
+        size, digest = _hashers.get(upload_id, (None, None))
+        if size != current:
+            size, digest = await asyncio.to_thread(_rehash, path)
+
+        chunk_size = settings.UPLOAD_CHUNK_SIZE
+        buffer = bytearray()
+        with open(path, "ab") as f:
+            try:
+                async for chunk in chunks:
+                    buffer += chunk
+                    if len(buffer) >= chunk_size:
+                        block = bytes(buffer)
+                        buffer.clear()
+                        await asyncio.to_thread(f.write, block)
+                        digest.update(block)
+                        size += len(block)
+                if buffer:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    digest.update(buffer)
+                    size += len(buffer)
+            finally:
+                # Whatever reached the file is kept, the client resumes from there
+                f.flush()
+                _hashers[upload_id] = (size, digest)
+
+    return _session_response(session, size)
+
+
+async def complete_upload(db: Session, upload_id: str, admin_id: int) -> Optional[VideoContentResponse]:
+    """Complete an upload of admin_id once no chunk is being appended to it
+
+    Holds the session lock of append_upload_chunks, so a chunk still being
+    written is never hashed or moved; the work itself runs in a worker thread.
+    """
+    lock = _session_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        return await asyncio.to_thread(_complete_upload, db, upload_id, admin_id)
+
+
+def _complete_upload(db: Session, upload_id: str, admin_id: int) -> Optional[VideoContentResponse]:
+    """Move a fully uploaded file of admin_id into storage and create its VideoContent row
+
+    When a video with the same content exists it is returned instead and the
+    upload is discarded; a deleted video only lends its stored file to the new
+    one. Raises ValueError when fewer bytes than the announced total_size arrived.
+
+    The stored file is recorded in the session before the part file moves, so
+    completing again after a failed insert creates the row from the stored file.
+    """
+    session = _load_session(upload_id, admin_id)
+    if not session:
+        return None
+
+    path = _part_path(upload_id)
+    stored = session.get("stored")
+    if stored is None or path.exists():
+        size, digest = _hashers.get(upload_id, (None, None))
+        if size != path.stat().st_size:
+            size, digest = _rehash(path)
+
+        total_size = session.get("total_size")
+        if total_size is not None and size != total_size:
+            raise ValueError(f"Upload incomplete: received {size} of {total_size} bytes")
+        if size == 0:
+            raise ValueError("Upload is empty")
+
+        content_hash = digest.hexdigest()
+        existing = find_video_by_content(db, content_hash, path)
+        if existing is not None and existing.status != "deleted":
+            _discard_upload(upload_id)
+            return get_video_by_id(db, existing.id)
+        if existing is not None:
+            # The new video takes over the hash of the deleted one
+            existing.content_hash = None
+            db.commit()
+
+        extension = Path(session["metadata"].get("filename") or "").suffix.lower()
+        stored = {"name": f"{content_hash}{extension}", "size": size, "content_hash": content_hash}
+        session["stored"] = stored
+        _meta_path(upload_id).write_text(json.dumps(session))
+
+        stored_path = _storage_dir() / stored["name"]
+        if stored_path.is_file() and stored_path.stat().st_size == size:
+            # Same content already stored, e.g. by a deleted video
+            path.unlink()
+        else:
+            os.replace(path, stored_path)
+    elif not (_storage_dir() / stored["name"]).is_file():
+        _discard_upload(upload_id)
+        raise ValueError("Uploaded file is missing from storage, start a new upload")
+
+    content_hash = stored["content_hash"]
+    metadata = {key: value for key, value in session["metadata"].items() if key != "filename"}
+    try:
+        video = create_video_content(
+            db,
+            VideoContentCreate(
+                **metadata,
+                file_url=f"{STORAGE_URL_PREFIX}{stored['name']}",
+                file_size=stored["size"]
+            ),
+            session["admin_id"],
+            content_hash=content_hash
+        )
+    except IntegrityError:
+        # The same content was completed by a concurrent upload
+        db.rollback()
+        video_id = db.query(VideoContent.id).filter(VideoContent.content_hash == content_hash).scalar()
+        if video_id is None:
+            raise
+        video = get_video_by_id(db, video_id)
+
+    _discard_upload(upload_id)
+    return video
+
+
+def _discard_upload(upload_id: str) -> None:
+    _part_path(upload_id).unlink(missing_ok=True)
+    _meta_path(upload_id).unlink(missing_ok=True)
+    _hashers.pop(upload_id, None)
+    _session_locks.pop(upload_id, None)
+
+
+def cancel_upload(upload_id: str, admin_id: int) -> bool:
+    """Abort an upload of admin_id and delete its partial data"""
+    if not _load_session(upload_id, admin_id):
+        return False
+    _discard_upload(upload_id)
+    return True
@@ -0,0 +1,101 @@
+"""
+Script to record the content_hash of videos stored before uploads were deduplicated
+Stored files are hashed in parallel by a pool of worker processes. Deleted
+videos are skipped; when several videos hold the same content, the hash goes
+to the oldest one and the others are listed as duplicates.
+
+    python backfill_content_hashes.py --workers 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import update
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base, VideoContent
+from app.services.video_upload_service import STORAGE_URL_PREFIX, file_content_hash, storage_path_for
+
+# Duplicates printed after the backfill
+SHOWN_DUPLICATES = 20
+
+
+def _hash_file(path):
+    if path is None:
+        return None
+    try:
+        return file_content_hash(path)
+    except OSError:
+        return None
+
+
+def _record_hashes(db, batch, duplicates):
+    """Store the hashes of a batch of (video_id, content_hash) not held by another video yet"""
+    holders = dict(db.query(VideoContent.content_hash, VideoContent.id).filter(
+        VideoContent.content_hash.in_({content_hash for _, content_hash in batch})
+    ).all())
+    rows = []
+    for video_id, content_hash in batch:
+        if content_hash in holders:
+            duplicates.append((video_id, holders[content_hash]))
+            continue
+        holders[content_hash] = video_id
+        rows.append({"id": video_id, "content_hash": content_hash})
+    if rows:
+        db.execute(update(VideoContent), rows)
+    db.commit()
+    return len(rows)
+
+
+def backfill_content_hashes(workers=None, batch_size=500):
+    """Hash the stored file of every video without a content_hash"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    try:
+        videos = db.query(VideoContent.id, VideoContent.file_url).filter(
+            VideoContent.content_hash.is_(None),
+            VideoContent.status != "deleted",
+            VideoContent.file_url.startswith(STORAGE_URL_PREFIX)
+        ).order_by(VideoContent.id).all()
+        print(f"🔍 Hashing the files of {len(videos)} videos...")
+
+        started = time.perf_counter()
+        hashed = missing = 0
+        batch, duplicates = [], []
+        paths = [storage_path_for(file_url) for _, file_url in videos]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (video_id, _), content_hash in zip(videos, pool.map(_hash_file, paths, chunksize=8)):
+                if content_hash is None:
+                    missing += 1
+                    continue
+                batch.append((video_id, content_hash))
+                if len(batch) >= batch_size:
+                    hashed += _record_hashes(db, batch, duplicates)
+                    batch = []
+        if batch:
+            hashed += _record_hashes(db, batch, duplicates)
+
+        print(
+            f"✅ Hashed {hashed} videos in {time.perf_counter() - started:.1f}s, "
+            f"{len(duplicates)} duplicates, {missing} files missing"
+        )
+        for video_id, original_id in duplicates[:SHOWN_DUPLICATES]:
+            print(f"   video {video_id} duplicates video {original_id}")
+        if len(duplicates) > SHOWN_DUPLICATES:
+            print(f"   ... and {len(duplicates) - SHOWN_DUPLICATES} more")
+    except Exception as e:
+        print(f"❌ Error backfilling content hashes: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, help="Hashing processes, one per CPU if omitted")
+    parser.add_argument("--batch-size", type=int, default=500, help="Hashes recorded per transaction")
+    args = parser.parse_args()
+
+    backfill_content_hashes(args.workers, args.batch_size)
@@ -0,0 +1,27 @@
+"""
+Script to rebuild the video_daily_stats rollup from video_content
+Run this after bulk changes made outside the application (imports, manual SQL)
+"""
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base
+from app.services.video_stats_service import rebuild_video_daily_stats
+
+
+def backfill_video_stats():
+    """Recompute every video_daily_stats row"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    
+    try:
+        rows = rebuild_video_daily_stats(db)
+        print(f"✅ Rebuilt video_daily_stats: {rows} day/sport/category rows")
+    except Exception as e:
+        print(f"❌ Error rebuilding video_daily_stats: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_video_stats()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin list queries: full ORM hydration vs column projection
+
+Compares loading a page of complete User / VideoContent entities (and copying
+the listed fields into the response schema) with selecting only the listed
+columns, as get_users_with_filters and get_videos_with_filters do. Both sides
+run the same page query, with the same ORDER BY and no COUNT, so only
+hydration differs. Seeds synthetic rows into the configured DATABASE_URL only
+when --seed is given.
+
+    python benchmark_list_queries.py --seed --rows 50000 --limit 100
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base, User, VideoContent
+from app.schemas.user_management import UserListResponse
+from app.schemas.video_content import VideoContentListResponse
+from app.services.user_management_service import USER_LIST_COLUMNS
+from app.services.video_content_service import VIDEO_LIST_COLUMNS, video_order_by
+
+LOREM = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+
+
+def seed(rows: int, batch_size: int = 5000):
+    """Insert synthetic users with filled-in profiles and videos"""
+    rnd = random.Random(3)
+    now = datetime.utcnow()
+    print(f"Seeding {rows} users and {rows} videos...")
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            count = min(batch_size, rows - offset)
+            conn.execute(insert(User), [
+                {
+                    "email": f"bench{offset + i}@example.com",
+                    "full_name": f"Bench User {offset + i}",
+                    "is_active": True,
+                    "created_at": now - timedelta(minutes=offset + i),
+                    "address": LOREM,
+                    "city": rnd.choice(["Mumbai", "Delhi", "Pune"]),
+                    "primary_sport": rnd.choice(["football", "cricket", "tennis"]),
+                    "secondary_sports": '["swimming", "athletics"]',
+                    "experience_level": rnd.choice(["beginner", "advanced"]),
+                    "training_goals": LOREM,
+                    "availability_days": '["monday", "wednesday", "friday"]',
+                    "medical_conditions": LOREM,
+                    "allergies": LOREM,
+                    "profile_completed": True,
+                }
+                for i in range(count)
+            ])
+            conn.execute(insert(VideoContent), [
+                {
+                    "title": f"Bench video {offset + i}",
+                    "description": LOREM,
+                    "file_url": f"/videos/bench_{offset + i}.mp4",
+                    "sport": rnd.choice(["football", "cricket", "tennis"]),
+                    "category": rnd.choice(["tutorial", "workout"]),
+                    "tags": '["speed", "agility"]',
+                    "status": "approved",
+                    "moderation_status": "approved",
+                    "view_count": rnd.randint(0, 1000),
+                    "created_at": now - timedelta(minutes=offset + i),
+                }
+                for i in range(count)
+            ])
+
+
+def hydrated_users(db, limit):
+    users = db.query(User).order_by(User.created_at.desc()).limit(limit).all()
+    return [
+        UserListResponse(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            profile_completed=user.profile_completed,
+            primary_sport=user.primary_sport,
+            experience_level=user.experience_level,
+            city=user.city,
+            created_at=user.created_at,
+            last_activity=user.updated_at
+        )
+        for user in users
+    ]
+
+
+def projected_users(db, limit):
+    users = db.query(*USER_LIST_COLUMNS).order_by(User.created_at.desc()).limit(limit).all()
+    return [UserListResponse(**user._mapping) for user in users]
+
+
+def hydrated_videos(db, limit):
+    videos = db.query(VideoContent).order_by(*video_order_by("created_at", "desc")).limit(limit).all()
+    return [
+        VideoContentListResponse(
+            id=video.id,
+            title=video.title,
+            sport=video.sport,
+            category=video.category,
+            status=video.status,
+            moderation_status=video.moderation_status,
+            view_count=video.view_count,
+            duration=video.duration,
+            thumbnail_url=video.thumbnail_url,
+            created_at=video.created_at,
+            published_at=video.published_at
+        )
+        for video in videos
+    ]
+
+
+def projected_videos(db, limit):
+    videos = db.query(*VIDEO_LIST_COLUMNS).order_by(*video_order_by("created_at", "desc")).limit(limit).all()
+    return [VideoContentListResponse(**video._mapping) for video in videos]
+
+
+def measure(label, fn, limit, iterations):
+    timings = []
+    peaks = []
+    for _ in range(iterations):
+        db = SessionLocal()
+        try:
+            tracemalloc.start()
+            started = time.perf_counter()
+            fn(db, limit)
+            timings.append((time.perf_counter() - started) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        finally:
+            db.close()
+    print(f"⏱️  {label:<20} median {statistics.median(timings):7.2f} ms   peak memory {statistics.median(peaks) / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic users and videos first")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows to seed per table")
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.seed:
+        seed(args.rows)
+
+    print(f"📊 Page size {args.limit}")
+    measure("users (hydrated)", hydrated_users, args.limit, args.iterations)
+    measure("users (projected)", projected_users, args.limit, args.iterations)
+    measure("videos (hydrated)", hydrated_videos, args.limit, args.iterations)
+    measure("videos (projected)", projected_videos, args.limit, args.iterations)
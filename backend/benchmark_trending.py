@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trending score recompute against a large video_content table
+
+Seeds synthetic videos and engagement events from the last week into the
+configured DATABASE_URL (only when --seed is given) and reports how long a
+full recompute of the trending scores takes, split into aggregating/decaying
+the events and writing the scores back.
+
+    python benchmark_trending.py --seed --videos 1000000 --events 5000000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base, VideoContent, VideoEngagementEvent
+from app.services.engagement_event_service import ensure_event_partitions
+from app.services.trending_service import TRENDING_ACTION_WEIGHTS, recompute_trending_scores
+
+ACTIONS = list(TRENDING_ACTION_WEIGHTS)
+ACTION_FREQUENCIES = [20, 4, 1, 1]
+
+
+def seed(videos: int, events: int, batch_size: int = 20000):
+    """Insert synthetic videos and engagement events spread over the last week"""
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+    print(f"Seeding {videos} videos and {events} engagement events...")
+
+    with engine.begin() as conn:
+        first_id = (conn.execute(select(func.max(VideoContent.id))).scalar() or 0) + 1
+        for offset in range(0, videos, batch_size):
+            conn.execute(insert(VideoContent), [
+                {
+                    "title": f"Benchmark video {offset + i}",
+                    "file_url": f"/videos/benchmark_{offset + i}.mp4",
+                    "sport": "football",
+                    "category": "tutorial",
+                    "created_at": now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60)),
+                }
+                for i in range(min(batch_size, videos - offset))
+            ])
+
+    db = SessionLocal()
+    try:
+        ensure_event_partitions(db, [now - timedelta(days=8), now])
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.begin() as conn:
+        for offset in range(0, events, batch_size):
+            count = min(batch_size, events - offset)
+            actions = rnd.choices(ACTIONS, ACTION_FREQUENCIES, k=count)
+            conn.execute(insert(VideoEngagementEvent), [
+                {
+                    "id": uuid.uuid4(),
+                    # Half spread over all videos, half on a few popular ones
+                    "video_id": first_id + (
+                        rnd.randrange(videos) if rnd.random() < 0.5
+                        else min(int(rnd.paretovariate(0.6)) - 1, videos - 1)
+                    ),
+                    "user_id": None,
+                    "action": action,
+                    "created_at": now - timedelta(seconds=rnd.randint(0, 7 * 24 * 3600)),
+                }
+                for action in actions
+            ])
+
+
+def run_benchmark(iterations: int, batch_size: int):
+    db = SessionLocal()
+    try:
+        total_videos = db.query(VideoContent).count()
+        total_events = db.query(VideoEngagementEvent).count()
+        print(f"📊 Videos in table:     {total_videos}")
+        print(f"📊 Events in table:     {total_events}")
+
+        for run in range(1, iterations + 1):
+            started = time.perf_counter()
+            result = recompute_trending_scores(db, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            print(
+                f"⏱️  Run {run}: {elapsed:.1f} s "
+                f"(aggregate + decay {result['compute_seconds']:.1f} s, "
+                f"write {result['write_seconds']:.1f} s) - "
+                f"{result['scored_videos']} scored, {result['reset_videos']} reset"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic videos and events before benchmarking")
+    parser.add_argument("--videos", type=int, default=1000000, help="Number of videos to seed")
+    parser.add_argument("--events", type=int, default=5000000, help="Number of engagement events to seed")
+    parser.add_argument("--iterations", type=int, default=3, help="Number of timed recomputes")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Videos written per transaction")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.seed:
+        seed(args.videos, args.events)
+    run_benchmark(args.iterations, args.batch_size)
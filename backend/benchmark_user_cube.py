@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark user analytics from SQL against the in-memory user dimension cube
+
+Seeds synthetic users into the configured DATABASE_URL (only when --seed is
+given), then reports how long the cube takes to load and to refresh
+incrementally, and the latency of user analytics and of dashboard slices
+(filter + group by) computed with SQL and from the cube.
+
+    python benchmark_user_cube.py --seed --users 1000000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, update
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base, User
+from app.services.analytics_service import get_user_analytics, get_user_breakdown
+from app.services.user_cube import user_cube
+
+SPORTS = ["football", "cricket", "tennis", "badminton", "swimming", "athletics", "hockey", "kabaddi"]
+CITIES = [f"City {i}" for i in range(200)]
+STATES = [f"State {i}" for i in range(30)]
+LEVELS = ["beginner", "intermediate", "advanced", "professional"]
+
+# (group_by, filters) of the timed dashboard slices
+SLICES = [
+    (["city"], {}),
+    (["sport", "experience"], {"is_active": [True]}),
+    (["state", "gender"], {"sport": ["tennis", "hockey"]}),
+    (["created_at"], {"city": ["City 1", "City 2"], "profile_completed": [True]}),
+]
+
+
+def seed(users: int, batch_size: int = 20000):
+    """Insert synthetic users registered over the last two years"""
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+    print(f"Seeding {users} users...")
+
+    with engine.begin() as conn:
+        first_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        for offset in range(0, users, batch_size):
+            conn.execute(insert(User), [
+                {
+                    "email": f"benchmark_{first_id + offset + i}@example.com",
+                    "full_name": f"Benchmark user {offset + i}",
+                    "is_active": rnd.random() < 0.9,
+                    "profile_completed": rnd.random() < 0.6,
+                    "gender": rnd.choice(["male", "female", "other", None]),
+                    "city": rnd.choice(CITIES),
+                    "state": rnd.choice(STATES),
+                    "primary_sport": rnd.choice(SPORTS),
+                    "secondary_sports": json.dumps(rnd.sample(SPORTS, 2)),
+                    "experience_level": rnd.choice(LEVELS),
+                    "created_at": now - timedelta(minutes=rnd.randint(0, 2 * 365 * 24 * 60)),
+                }
+                for i in range(min(batch_size, users - offset))
+            ])
+
+
+def timed(function, iterations: int) -> float:
+    """Median duration of a call in milliseconds"""
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def run_benchmark(iterations: int, changed: int):
+    db = SessionLocal()
+    try:
+        total_users = db.query(User).count()
+        print(f"📊 Users in table:      {total_users}")
+
+        # SQL, before the cube is loaded
+        sql_analytics = timed(lambda: get_user_analytics(db, sports=["tennis"]), iterations)
+        sql_slices = [timed(lambda: get_user_breakdown(db, group_by, filters), iterations) for group_by, filters in SLICES]
+
+        stats = user_cube.refresh(full=True)
+        print(
+            f"⏱️  Cube full load:     {stats['last_refresh_ms']:.0f} ms "
+            f"({stats['rows']} rows, {stats['memory_bytes'] / 1024 / 1024:.1f} MiB)"
+        )
+
+        ids = [user_id for (user_id,) in db.query(User.id).order_by(func.random()).limit(changed)]
+        db.execute(update(User).where(User.id.in_(ids)).values(city=CITIES[0], updated_at=func.now()))
+        db.commit()
+        stats = user_cube.refresh()
+        print(f"⏱️  Cube refresh:       {stats['last_refresh_ms']:.0f} ms ({stats['last_changed_rows']} changed rows)")
+
+        cube_analytics = timed(lambda: get_user_analytics(db, sports=["tennis"]), iterations)
+        print(f"⏱️  User analytics:     SQL {sql_analytics:.1f} ms, cube {cube_analytics:.2f} ms")
+        for (group_by, filters), sql_ms in zip(SLICES, sql_slices):
+            cube_ms = timed(lambda: get_user_breakdown(db, group_by, filters), iterations)
+            print(f"⏱️  Slice {'/'.join(group_by)} {sorted(filters)}: SQL {sql_ms:.1f} ms, cube {cube_ms:.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic users before benchmarking")
+    parser.add_argument("--users", type=int, default=1000000, help="Number of users to seed")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed calls per measurement")
+    parser.add_argument("--changed", type=int, default=1000, help="Users updated before the incremental refresh")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.seed:
+        seed(args.users)
+    run_benchmark(args.iterations, args.changed)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark get_video_analytics against a large video_content table
+
+Seeds synthetic videos into the configured DATABASE_URL (only when --seed is
+given) and reports the latency and number of database round trips of the
+video analytics summary.
+
+    python benchmark_video_analytics.py --seed --rows 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base, VideoContent
+from app.services.video_content_service import get_video_analytics
+from app.services.video_stats_service import rebuild_video_daily_stats
+
+SPORTS = ["football", "basketball", "tennis", "cricket", "swimming", "athletics", "badminton", "hockey"]
+CATEGORIES = ["tutorial", "workout", "technique", "match", "training"]
+STATUSES = ["pending", "approved", "rejected", "flagged"]
+MODERATION_STATUSES = ["unreviewed", "approved", "rejected"]
+
+
+def seed_videos(rows: int, batch_size: int = 10000):
+    """Insert synthetic videos spread over the last year"""
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+    print(f"Seeding {rows} videos...")
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            conn.execute(insert(VideoContent), [
+                {
+                    "title": f"Benchmark video {offset + i}",
+                    "file_url": f"/videos/benchmark_{offset + i}.mp4",
+                    "sport": rnd.choice(SPORTS),
+                    "category": rnd.choice(CATEGORIES),
+                    "status": rnd.choice(STATUSES),
+                    "moderation_status": rnd.choice(MODERATION_STATUSES),
+                    "duration": rnd.randint(30, 3600),
+                    "view_count": rnd.randint(0, 10000),
+                    "like_count": rnd.randint(0, 500),
+                    "dislike_count": rnd.randint(0, 50),
+                    "share_count": rnd.randint(0, 100),
+                    "created_at": now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60)),
+                }
+                for i in range(min(batch_size, rows - offset))
+            ])
+
+    # Rows inserted directly bypass the incremental rollup
+    db = SessionLocal()
+    try:
+        rebuild_video_daily_stats(db)
+    finally:
+        db.close()
+
+
+def run_benchmark(iterations: int, days: int):
+    round_trips = 0
+
+    def count_round_trip(*args):
+        nonlocal round_trips
+        round_trips += 1
+
+    event.listen(engine, "before_cursor_execute", count_round_trip)
+
+    db = SessionLocal()
+    try:
+        total_videos = db.query(VideoContent).count()
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+
+        timings = []
+        for _ in range(iterations):
+            round_trips = 0
+            started = time.perf_counter()
+            analytics = get_video_analytics(db, start_date, end_date)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count_round_trip)
+
+    print(f"📊 Videos in table:     {total_videos}")
+    print(f"📊 Videos in range:     {analytics.total_videos} (last {days} days)")
+    print(f"📊 Round trips:         {round_trips}")
+    print(f"⏱️  Median latency:      {statistics.median(timings):.1f} ms")
+    print(f"⏱️  Min / max latency:   {min(timings):.1f} / {max(timings):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic videos before benchmarking")
+    parser.add_argument("--rows", type=int, default=1000000, help="Number of videos to seed")
+    parser.add_argument("--iterations", type=int, default=10, help="Number of timed runs")
+    parser.add_argument("--days", type=int, default=30, help="Size of the analytics date range")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.seed:
+        seed_videos(args.rows)
+    run_benchmark(args.iterations, args.days)
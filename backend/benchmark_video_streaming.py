@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark ranged video streaming under concurrent seeks
+
+Serves one synthetic video file through Starlette's FileResponse and through
+RangeFileResponse, then fires concurrent random Range requests at both (the
+pattern of the mobile player scrubbing through a video) and reports throughput.
+
+    python benchmark_video_streaming.py --size-mb 256 --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import FileResponse
+from starlette.routing import Route
+
+from app.core.range_response import RangeFileResponse
+
+
+def build_app(path: str) -> Starlette:
+    async def naive(request):
+        return FileResponse(path, media_type="video/mp4")
+
+    async def ranged(request):
+        return RangeFileResponse(path, media_type="video/mp4")
+
+    return Starlette(routes=[Route("/naive", naive), Route("/ranged", ranged)])
+
+
+async def run_seeks(app: Starlette, route: str, file_size: int, requests: int, concurrency: int, range_size: int):
+    rnd = random.Random(7)
+    offsets = [rnd.randrange(0, file_size - range_size) for _ in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+    received = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def seek(offset: int):
+            nonlocal received
+            async with semaphore:
+                response = await client.get(route, headers={"Range": f"bytes={offset}-{offset + range_size - 1}"})
+                assert response.status_code == 206, response.status_code
+                received += len(response.content)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(seek(offset) for offset in offsets))
+        elapsed = time.perf_counter() - started
+
+    return elapsed, received
+
+
+async def main(args):
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+        path = f.name
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            f.write(block)
+
+    try:
+        file_size = os.path.getsize(path)
+        app = build_app(path)
+        range_size = args.range_kb * 1024
+        print(f"📼 {args.size_mb} MB file, {args.requests} seeks of {args.range_kb} KB, concurrency {args.concurrency}")
+
+        for label, route in (("FileResponse", "/naive"), ("RangeFileResponse", "/ranged")):
+            elapsed, received = await run_seeks(app, route, file_size, args.requests, args.concurrency, range_size)
+            print(
+                f"⏱️  {label:<18} {elapsed:6.2f} s  "
+                f"{args.requests / elapsed:8.1f} req/s  "
+                f"{received / elapsed / 1024 / 1024:8.1f} MB/s"
+            )
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the synthetic video file")
+    parser.add_argument("--requests", type=int, default=2000, help="Number of Range requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    parser.add_argument("--range-kb", type=int, default=512, help="Bytes requested per seek, in KB")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,31 @@
+"""
+Script to rebuild the related videos ("more like this") index
+Run this periodically (e.g. nightly); new and re-tagged videos are refreshed
+incrementally in between
+"""
+
+import time
+
+from app.models.database import SessionLocal, engine
+from app.models.models import Base
+from app.services.related_video_service import rebuild_related_videos
+
+
+def build_related_videos():
+    """Recompute the neighbor lists of every video"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        videos = rebuild_related_videos(db)
+        print(f"✅ Rebuilt related videos for {videos} videos in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"❌ Error rebuilding related videos: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    build_related_videos()
@@ -0,0 +1,88 @@
+"""
+Script to bulk import a video catalog from a CSV or NDJSON file
+Each row is a video record with the fields of VideoContentCreate; rejected rows
+are listed at the end. An interrupted import continues where it stopped with
+--resume <job_id>.
+
+    python import_videos.py catalog.csv --admin-email admin@sportsplatform.com
+    python import_videos.py --resume 0f0c6f7e-...
+"""
+
+import argparse
+import os
+import time
+
+from app.models.database import SessionLocal, engine
+from app.models.models import AdminUser, Base
+from app.services.related_video_service import rebuild_related_videos
+from app.services.video_import_service import (
+    create_video_import,
+    get_video_import,
+    get_video_import_errors,
+    import_format_for,
+    run_video_import
+)
+
+# Rejected rows printed after the import
+SHOWN_ERRORS = 20
+
+
+def import_videos(path=None, format=None, admin_email=None, resume=None, rebuild_related=False):
+    """Import (or resume importing) a video catalog file"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    job = None
+
+    try:
+        if resume:
+            job = get_video_import(db, resume)
+            if not job:
+                print(f"❌ Import {resume} not found")
+                return
+        else:
+            admin_id = None
+            if admin_email:
+                admin = db.query(AdminUser).filter(AdminUser.email == admin_email).first()
+                if not admin:
+                    print(f"❌ Admin user {admin_email} not found")
+                    return
+                admin_id = admin.id
+            job = create_video_import(db, os.path.abspath(path), import_format_for(path, format), admin_id)
+
+        print(f"📥 Importing {job.source_path} (job {job.id}, from row {job.rows_processed + 1})...")
+        started = time.perf_counter()
+        job = run_video_import(db, job.id)
+        print(
+            f"✅ Imported {job.rows_imported} videos, {job.rows_failed} rows rejected "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        for error in get_video_import_errors(db, job.id, limit=SHOWN_ERRORS):
+            print(f"   row {error.row_number}: {'; '.join(error.errors)}")
+        if job.rows_failed > SHOWN_ERRORS:
+            print(f"   ... and {job.rows_failed - SHOWN_ERRORS} more")
+
+        if rebuild_related:
+            videos = rebuild_related_videos(db)
+            print(f"✅ Rebuilt related videos for {videos} videos")
+    except Exception as e:
+        print(f"❌ Error importing videos: {e}")
+        if job is not None:
+            print(f"💡 Resume with: python import_videos.py --resume {job.id}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", help="CSV or NDJSON file to import")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="File format, taken from the extension if omitted")
+    parser.add_argument("--admin-email", help="Admin recorded as uploader of the imported videos")
+    parser.add_argument("--resume", metavar="JOB_ID", help="Resume an interrupted import")
+    parser.add_argument("--rebuild-related", action="store_true", help="Rebuild the related videos index afterwards")
+    args = parser.parse_args()
+
+    if not args.path and not args.resume:
+        parser.error("a file to import or --resume JOB_ID is required")
+    import_videos(args.path, args.format, args.admin_email, args.resume, args.rebuild_related)
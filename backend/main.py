@@ -3,15 +3,24 @@ FastAPI Main Application
 Modern FastAPI setup with PostgreSQL database (2024)
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import secrets
 import uvicorn
 
 from app.api.routes import api_router
 from app.core.config import settings
+from app.core.prometheus import CONTENT_TYPE, render_metrics
+from app.core.request_metrics import RequestMetricsMiddleware, request_metrics
 from app.models.database import engine
 from app.models.models import Base
+from app.services.analytics_export_service import analytics_export_runner
+from app.services.engagement_buffer import engagement_buffer
+from app.services.related_video_service import related_video_updater
+from app.services.trending_service import trending_updater
+from app.services.user_cube import user_cube
 
 
 @asynccontextmanager
@@ -29,10 +38,31 @@ async def lifespan(app: FastAPI):
         print(f"❌ Database connection failed: {e}")
         print("💡 Please check your PostgreSQL connection and credentials")
     
+    # Periodically flush buffered video engagement events
+    engagement_buffer.start()
+    
+    # Periodically recompute trending video scores
+    trending_updater.start()
+    
+    # Apply related video refreshes queued by video writes
+    related_video_updater.start()
+    
+    # Periodically remove expired analytics exports
+    analytics_export_runner.start()
+    
+    # Keep the in-memory user dimension cube for analytics up to date
+    user_cube.start()
+    
     yield
     
     # Shutdown
     print("🛑 Shutting down FastAPI application...")
+    await user_cube.stop()
+    await analytics_export_runner.stop()
+    await related_video_updater.stop()
+    await trending_updater.stop()
+    await engagement_buffer.stop()
+    print("✅ Engagement events flushed")
 
 
 # Create FastAPI app with modern configuration
@@ -54,6 +84,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record latency and status of every request for the system metrics
+app.add_middleware(RequestMetricsMiddleware, metrics=request_metrics)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -75,6 +108,24 @@ async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Request and connection pool metrics in the Prometheus text format
+
+    Only served when METRICS_TOKEN is set, to scrapers sending it as a bearer token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     # Run on all interfaces (0.0.0.0) to accept connections from mobile devices
     # This allows Expo Go on your phone to connect to the backend
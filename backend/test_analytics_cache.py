@@ -0,0 +1,135 @@
+"""
+Test script for the analytics summary cache
+
+Runs without a server: python test_analytics_cache.py
+"""
+
+import asyncio
+import threading
+import time
+
+from app.services.analytics_cache import AnalyticsCache
+
+
+class _Computation:
+    """Blocking compute() that counts its calls and can be held until released"""
+
+    def __init__(self, hold: bool = False):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {"call": self.calls}
+
+
+def test_single_flight():
+    """Concurrent misses of a key share one computation"""
+    async def run():
+        cache = AnalyticsCache(max_entries=8, ttl_seconds=60, stale_seconds=60)
+        compute = _Computation(hold=True)
+        requests = [asyncio.create_task(cache.get("key", compute)) for _ in range(10)]
+        await asyncio.to_thread(compute.started.wait, 5)
+        compute.release.set()
+        results = await asyncio.gather(*requests)
+        assert compute.calls == 1
+        assert all(result == {"call": 1} for result in results)
+        stats = cache.stats()
+        assert stats["misses"] == 1 and stats["coalesced"] == 9 and stats["in_flight"] == 0
+        # Later requests are served from the entry
+        assert await cache.get("key", compute) == {"call": 1} and compute.calls == 1
+        assert cache.stats()["hits"] == 1
+
+    asyncio.run(run())
+
+
+def test_errors_are_shared_and_not_cached():
+    async def run():
+        cache = AnalyticsCache(max_entries=8, ttl_seconds=60, stale_seconds=60)
+
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError("database down")
+
+        results = await asyncio.gather(*(cache.get("key", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.stats()["errors"] == 1 and cache.stats()["entries"] == 0
+        assert await cache.get("key", _Computation()) == {"call": 1}
+
+    asyncio.run(run())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def run():
+        cache = AnalyticsCache(max_entries=8, ttl_seconds=0.05, stale_seconds=60)
+        compute = _Computation()
+        assert await cache.get("key", compute) == {"call": 1}
+        await asyncio.sleep(0.1)
+
+        compute.release.clear()
+        compute.started.clear()
+        # Stale: both requests get the old result at once, one refresh starts
+        assert await cache.get("key", compute) == {"call": 1}
+        assert await cache.get("key", compute) == {"call": 1}
+        await asyncio.to_thread(compute.started.wait, 5)
+        stats = cache.stats()
+        assert stats["stale_hits"] == 2 and stats["refreshes"] == 1 and stats["in_flight"] == 1
+
+        compute.release.set()
+        while cache.stats()["in_flight"]:
+            await asyncio.sleep(0.01)
+        assert compute.calls == 2
+        assert await cache.get("key", compute) == {"call": 2}
+
+    asyncio.run(run())
+
+
+def test_expired_entry_is_recomputed():
+    async def run():
+        cache = AnalyticsCache(max_entries=8, ttl_seconds=0.05, stale_seconds=0.05)
+        compute = _Computation()
+        await cache.get("key", compute)
+        await asyncio.sleep(0.15)
+        assert await cache.get("key", compute) == {"call": 2}
+        assert cache.stats()["misses"] == 2 and cache.stats()["stale_hits"] == 0
+
+    asyncio.run(run())
+
+
+def test_clear_discards_running_computation():
+    async def run():
+        cache = AnalyticsCache(max_entries=8, ttl_seconds=60, stale_seconds=60)
+        compute = _Computation(hold=True)
+        request = asyncio.create_task(cache.get("key", compute))
+        await asyncio.to_thread(compute.started.wait, 5)
+        cache.clear()
+        compute.release.set()
+        assert await request == {"call": 1}
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(run())
+
+
+def test_uncacheable_results_are_returned_but_not_stored():
+    async def run():
+        cache = AnalyticsCache(max_entries=8, ttl_seconds=60, stale_seconds=60)
+        compute = _Computation()
+        assert await cache.get("key", compute, cacheable=lambda result: False) == {"call": 1}
+        assert await cache.get("key", compute, cacheable=lambda result: False) == {"call": 2}
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing analytics summary cache...")
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
+    print("🎉 All analytics cache tests passed!")
@@ -0,0 +1,92 @@
+"""
+Test script for the request latency histograms
+
+Runs without a server: python test_request_metrics.py
+"""
+
+import math
+
+from app.core.request_metrics import (
+    HISTOGRAM_BUCKETS,
+    LATENCY_RELATIVE_ERROR,
+    RequestMetrics,
+    bucket_latency_ms,
+    histogram_percentiles,
+    latency_bucket
+)
+
+
+def _histogram(durations_us):
+    histogram = [0] * HISTOGRAM_BUCKETS
+    for duration_us in durations_us:
+        histogram[latency_bucket(duration_us)] += 1
+    return histogram
+
+
+def _assert_close(actual_ms, expected_ms):
+    assert abs(actual_ms - expected_ms) <= expected_ms * LATENCY_RELATIVE_ERROR, (actual_ms, expected_ms)
+
+
+def test_bucket_bounds():
+    """Every duration falls in a bucket whose midpoint is within the relative error"""
+    assert latency_bucket(0) == 0
+    assert latency_bucket(0.5) == 0
+    assert latency_bucket(10 ** 12) == HISTOGRAM_BUCKETS - 1
+    for duration_us in (1, 7, 250, 1_000, 33_333, 1_000_000, 59_000_000):
+        _assert_close(bucket_latency_ms(latency_bucket(duration_us)), duration_us / 1000)
+
+
+def test_empty_histogram():
+    assert histogram_percentiles([0] * HISTOGRAM_BUCKETS) == {"p50": None, "p95": None, "p99": None}
+
+
+def test_percentiles_of_uniform_durations():
+    """1..1000 ms: the pN is the ceil(N%)-th smallest duration"""
+    durations_ms = list(range(1, 1001))
+    result = histogram_percentiles(_histogram(ms * 1000 for ms in durations_ms))
+    for p in (50, 95, 99):
+        _assert_close(result[f"p{p}"], durations_ms[math.ceil(len(durations_ms) * p / 100) - 1])
+
+
+def test_percentiles_of_skewed_durations():
+    """A slow tail only moves the percentiles it reaches"""
+    durations_us = [2_000] * 960 + [500_000] * 40
+    result = histogram_percentiles(_histogram(durations_us))
+    _assert_close(result["p50"], 2)
+    _assert_close(result["p95"], 2)
+    _assert_close(result["p99"], 500)
+
+
+def test_snapshot_per_route_and_last_day():
+    metrics = RequestMetrics()
+    now = 1_700_000_000.0
+    # Two days old: its hourly slot is reused by the current hour, so it is
+    # only kept in the per-route stats
+    metrics.request_started()
+    metrics.request_finished("GET /health", 200, 1_000, now - 2 * 86400)
+    for _ in range(99):
+        metrics.request_started()
+        metrics.request_finished("GET /api/v1/videos", 200, 10_000, now)
+    metrics.request_started()
+    metrics.request_finished("GET /api/v1/videos", 503, 900_000, now)
+
+    snapshot = metrics.snapshot(now)
+    assert snapshot["total_requests"] == 101
+    assert snapshot["in_flight_requests"] == 0
+    route = snapshot["routes"]["GET /api/v1/videos"]
+    assert route["requests"] == 100 and route["errors"] == 1
+    assert route["status_codes"]["2xx"] == 99 and route["status_codes"]["5xx"] == 1
+    _assert_close(route["p50"], 10)
+    _assert_close(route["p99"], 10)
+    assert snapshot["last_24h"]["requests"] == 100
+    assert snapshot["hourly"][-1]["requests"] == 100
+    assert sum(hour["requests"] for hour in snapshot["hourly"]) == 100
+
+
+if __name__ == "__main__":
+    print("🧪 Testing request metrics histograms...")
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
+    print("🎉 All request metrics tests passed!")
@@ -0,0 +1,173 @@
+"""
+Test script for the user dimension cube
+
+Runs without a server against an in-memory SQLite database:
+python test_user_cube.py
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base
+from app.models.models import User
+from app.services.user_cube import UserCube, secondary_sport_condition
+
+# 2024-01-01 was a Monday
+MONDAY = datetime(2024, 1, 1, 12, 0)
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _add_users(session_factory, users):
+    db = session_factory()
+    try:
+        for index, (created_at, sport, city, secondary) in enumerate(users):
+            db.add(User(
+                email=f"cube_{created_at.isoformat()}_{index}@example.com",
+                full_name="Cube user",
+                primary_sport=sport,
+                city=city,
+                secondary_sports=json.dumps(secondary) if secondary is not None else None,
+                is_active=True,
+                created_at=created_at,
+                updated_at=created_at
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _loaded_cube(users):
+    session_factory = _session_factory()
+    _add_users(session_factory, users)
+    cube = UserCube(session_factory=session_factory, refresh_interval=0)
+    cube.refresh(full=True)
+    return cube, session_factory
+
+
+def test_week_buckets_start_on_monday():
+    cube, _ = _loaded_cube([
+        (MONDAY, "tennis", "Pune", None),
+        (MONDAY + timedelta(days=6, hours=11), "tennis", "Pune", None),
+        (MONDAY + timedelta(days=7), "tennis", "Pune", None),
+        (MONDAY - timedelta(hours=12, minutes=1), "tennis", "Pune", None),
+    ])
+    snapshot = cube._snapshot
+    counts = dict(snapshot.group_counts(["created_at"], snapshot.mask(), "week"))
+    assert counts == {
+        (datetime(2024, 1, 1),): 2,
+        (datetime(2024, 1, 8),): 1,
+        (datetime(2023, 12, 25),): 1,
+    }, counts
+
+
+def test_month_buckets_with_other_dimension():
+    cube, _ = _loaded_cube([
+        (datetime(2024, 1, 31, 23, 59), "tennis", "Pune", None),
+        (datetime(2024, 2, 1), "tennis", "Delhi", None),
+        (datetime(2024, 2, 29, 10), "football", "Delhi", None),
+        (datetime(2024, 3, 1), "tennis", "Delhi", None),
+        (datetime(2023, 12, 1), "tennis", "Pune", None),
+    ])
+    snapshot = cube._snapshot
+    mask = snapshot.mask({"sport": ["tennis"]})
+    counts = dict(snapshot.group_counts(["created_at", "city"], mask, "month"))
+    assert counts == {
+        (datetime(2024, 1, 1), "Pune"): 1,
+        (datetime(2024, 2, 1), "Delhi"): 1,
+        (datetime(2024, 3, 1), "Delhi"): 1,
+        (datetime(2023, 12, 1), "Pune"): 1,
+    }, counts
+    assert dict(snapshot.group_counts(["created_at"], snapshot.mask(), "month"))[(datetime(2024, 2, 1),)] == 2
+
+
+def test_secondary_sports_match_exact_sport():
+    """The cube and the SQL fallback agree on who plays a sport"""
+    cube, session_factory = _loaded_cube([
+        (MONDAY, "football", "Pune", ["tennis"]),
+        (MONDAY, "football", "Pune", ["table tennis"]),
+        (MONDAY, "tennis", "Pune", ["tennis"]),
+        (MONDAY, "hockey", "Pune", ["tennis_100%"]),
+    ])
+    snapshot = cube._snapshot
+    db = session_factory()
+    try:
+        for sport, expected in (("tennis", 2), ("table tennis", 1), ("tennis_100%", 1), ("tennis_", 0)):
+            assert snapshot.count(snapshot.mask({"sport": [sport]})) == expected, sport
+            sql_count = db.query(User).filter(
+                or_(User.primary_sport == sport, secondary_sport_condition(sport))
+            ).count()
+            assert sql_count == expected, sport
+    finally:
+        db.close()
+
+
+def test_merge_applies_changed_users():
+    cube, session_factory = _loaded_cube([
+        (MONDAY, "tennis", "Pune", None),
+        (MONDAY, "tennis", "Pune", None),
+        (MONDAY, "football", "Delhi", None),
+    ])
+    previous = cube._snapshot
+    since = MONDAY + timedelta(days=1)
+
+    db = session_factory()
+    try:
+        first = db.query(User).order_by(User.id).first()
+        first.city = "Mumbai"
+        first.updated_at = since + timedelta(hours=1)
+        db.commit()
+    finally:
+        db.close()
+    _add_users(session_factory, [(since + timedelta(hours=2), "hockey", "Pune", ["tennis"])])
+
+    db = session_factory()
+    try:
+        rows = cube._merge(db, previous._rows, since)
+    finally:
+        db.close()
+    assert rows is not None
+    assert list(rows.ids) == sorted(rows.ids) and len(rows.ids) == 4
+    assert cube._last_changed_rows == 2
+
+    cube.refresh()
+    snapshot = cube._snapshot
+    assert dict(snapshot.group_counts(["city"], snapshot.mask())) == {("Pune",): 2, ("Mumbai",): 1, ("Delhi",): 1}
+    assert snapshot.count(snapshot.mask({"sport": ["tennis"]})) == 3
+
+
+def test_merge_detects_deleted_users():
+    cube, session_factory = _loaded_cube([
+        (MONDAY, "tennis", "Pune", None),
+        (MONDAY, "football", "Delhi", None),
+    ])
+    db = session_factory()
+    try:
+        db.query(User).filter(User.city == "Delhi").delete()
+        db.commit()
+        assert cube._merge(db, cube._snapshot._rows, MONDAY + timedelta(days=1)) is None
+    finally:
+        db.close()
+
+    cube.refresh()
+    assert len(cube._snapshot) == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing user dimension cube...")
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
+    print("🎉 All user cube tests passed!")